@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+The five editions aligned token by token in archive/data/aligned.txt.
+
+Each row of aligned.txt gives the token identifier (like 0009a2: line 9,
+on half-line, token 2) of one aligned token in each of five editions,
+followed by that token's form in each. '_' joins several of an edition's
+words into one aligned unit, and '@' marks an edition with nothing to
+align; see archive/data/alignment.md.
+
+Alignment reads the file in one pass. Token identifiers are interned as
+ints in one array per edition and the forms are packed into one
+TextColumn per edition rather than kept as 173,020 separate strings. An
+int array per edition, indexed by interned identifier, finds the row of
+any token, including the words inside a '_' join, and an edition's text
+is put back together only for the lines asked for.
+
+Editions break lines in different places, so the same passage can carry
+different line numbers. ebeowulf, for instance, joins Heorot's lines 389
+and 390 and runs behind it up to line 1166 (Heorot 909 is its 908), then
+splits lines of its own and runs one to three ahead from 1167 to the end
+(Heorot 3182 is its 3184). NumberingMapper turns the alignment into one
+int array per edition and direction, so translating a line number is a
+single array lookup.
+
+    alignment = get_alignment()
+    alignment.lookup("heorot", "0009a2").forms["mit"]  # 'oðþæt'
+    alignment.text("perseus", 9, 10)  # {9: 'oð þæt him ǣghwylc     ymbsittendra'}
+    get_mapper().from_heorot("ebeowulf", 909)  # 908
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from linestore import TextColumn
+
+ALIGNED_FILE = "archive/data/aligned.txt"
+
+# Column order of aligned.txt
+EDITIONS = ("mit", "mcmaster", "heorot", "ebeowulf", "perseus")
+HEOROT = EDITIONS.index("heorot")
+
+# Form of an edition with nothing aligned to the other editions' token
+GAP = "@"
+
+# Joins an edition's words aligned as one unit
+JOIN = "_"
+
+# Separates the half-lines, as in the edition text files
+CAESURA = "     "
+
+# Array entries for a line with no counterpart and a token with no row
+NO_LINE = -1
+NO_ROW = -1
+
+TOKEN_ID = re.compile(r"(\d{4})([ab])(\d)")
+
+# Interned identifiers are line * LINE_CODES + half * 10 + token, which
+# keeps them in file order
+LINE_CODES = 20
+
+
+def token_code(token_id: str) -> int:
+    """
+    Intern a token identifier as an int.
+
+    Args:
+        token_id: Identifier like '0009a2'
+
+    Returns:
+        The identifier's code; codes sort in the same order as identifiers
+
+    Raises:
+        ValueError: If the identifier is malformed
+    """
+    match = TOKEN_ID.fullmatch(token_id)
+    if match is None:
+        raise ValueError(f"Not a token identifier: '{token_id}'")
+    line, half, token = match.groups()
+    return int(line) * LINE_CODES + (half == "b") * 10 + int(token)
+
+
+def token_id(code: int) -> str:
+    """
+    Turn a code from token_code back into a token identifier.
+
+    Args:
+        code: Interned identifier
+
+    Returns:
+        Identifier like '0009a2'
+    """
+    line, rest = divmod(code, LINE_CODES)
+    half, token = divmod(rest, 10)
+    return f"{line:04d}{'ab'[half]}{token}"
+
+
+def read_aligned(path: str = ALIGNED_FILE) -> Iterator[List[str]]:
+    """
+    Read the rows of aligned.txt.
+
+    Args:
+        path: File to read
+
+    Yields:
+        Five token identifiers and five forms per row, in file order
+
+    Raises:
+        ValueError: If a row does not have ten columns
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for number, text in enumerate(f, 1):
+            row = text.split()
+            if len(row) != 2 * len(EDITIONS):
+                raise ValueError(f"{path}:{number}: expected 10 columns")
+            yield row
+
+
+class AlignedRow(NamedTuple):
+    """One token alignment: each edition's identifier and form."""
+
+    ids: Dict[str, str]
+    forms: Dict[str, Optional[str]]  # None where the edition has a gap
+
+
+class Alignment:
+    """Token alignments of the five editions, stored column by column."""
+
+    def __init__(self, rows: Iterable[Sequence[str]]) -> None:
+        """
+        Intern and pack the rows.
+
+        Args:
+            rows: Rows of aligned.txt, as yielded by read_aligned
+
+        Raises:
+            ValueError: If a token identifier is malformed
+        """
+        codes = [array("i") for _ in EDITIONS]
+        forms: List[List[Optional[str]]] = [[] for _ in EDITIONS]
+        interned: Dict[str, int] = {}
+        for row in rows:
+            for column in range(len(EDITIONS)):
+                code = interned.get(row[column])
+                if code is None:
+                    code = interned[row[column]] = token_code(row[column])
+                codes[column].append(code)
+                form = row[len(EDITIONS) + column]
+                forms[column].append(None if form == GAP else form)
+
+        self._codes = codes
+        self._gaps = [bytearray(form is None for form in column) for column in forms]
+        self._forms = [TextColumn(column) for column in forms]
+        # row of each token by code, NO_ROW where there is none; every word
+        # of a '_' join is found at the join's row
+        self._rows: List[array] = []
+        for column in range(len(EDITIONS)):
+            size = codes[column][-1] + 10 if codes[column] else 0
+            index = array("i", [NO_ROW]) * size
+            for row, (code, form) in enumerate(zip(codes[column], forms[column])):
+                if form is not None:
+                    for offset in range(form.count(JOIN) + 1):
+                        if index[code + offset] == NO_ROW:
+                            index[code + offset] = row
+            self._rows.append(index)
+
+    @classmethod
+    def from_file(cls, path: str = ALIGNED_FILE) -> "Alignment":
+        """
+        Load an aligned.txt file.
+
+        Args:
+            path: File to read
+
+        Returns:
+            The alignment
+        """
+        return cls(read_aligned(path))
+
+    def __len__(self) -> int:
+        return len(self._codes[0])
+
+    @staticmethod
+    def _column(edition: str) -> int:
+        """Find an edition's column."""
+        try:
+            return EDITIONS.index(edition)
+        except ValueError:
+            raise ValueError(
+                f"Unknown edition '{edition}'; choose from {', '.join(EDITIONS)}"
+            ) from None
+
+    def line_count(self, edition: str) -> int:
+        """
+        Find the last line number an edition's identifiers use.
+
+        Args:
+            edition: One of EDITIONS
+
+        Returns:
+            The highest line number
+        """
+        codes = self._codes[self._column(edition)]
+        return codes[-1] // LINE_CODES if codes else 0
+
+    def row(self, index: int) -> AlignedRow:
+        """
+        Fetch one token alignment.
+
+        Args:
+            index: Row number, from 0
+
+        Returns:
+            The identifiers and forms of every edition
+        """
+        return AlignedRow(
+            {
+                edition: token_id(self._codes[column][index])
+                for column, edition in enumerate(EDITIONS)
+            },
+            {
+                edition: self._forms[column][index]
+                for column, edition in enumerate(EDITIONS)
+            },
+        )
+
+    def find(self, edition: str, token: str) -> Optional[int]:
+        """
+        Find the row holding an edition's token.
+
+        Args:
+            edition: One of EDITIONS
+            token: The edition's token identifier, like '0009a2'
+
+        Returns:
+            Row number, or None if the edition has no such token
+        """
+        rows = self._rows[self._column(edition)]
+        code = token_code(token)
+        row = rows[code] if code < len(rows) else NO_ROW
+        return None if row == NO_ROW else row
+
+    def lookup(self, edition: str, token: str) -> Optional[AlignedRow]:
+        """
+        Find what an edition's token is aligned with in every edition.
+
+        A word inside a '_' join, like þæt in Heorot's oð_þæt (0009a1) at
+        0009a2, is found at the join's row.
+
+        Args:
+            edition: One of EDITIONS
+            token: The edition's token identifier, like '0009a2'
+
+        Returns:
+            The aligned row, or None if the edition has no such token
+
+        Raises:
+            ValueError: If the edition or identifier is not valid
+        """
+        row = self.find(edition, token)
+        return None if row is None else self.row(row)
+
+    def rows(self, edition: str, start: int, stop: int) -> range:
+        """
+        Find the rows of an edition's lines, by bisecting its identifiers.
+
+        Args:
+            edition: One of EDITIONS
+            start: First line number, inclusive
+            stop: Last line number, exclusive
+
+        Returns:
+            Row numbers whose identifier in the edition is on those lines
+        """
+        codes = self._codes[self._column(edition)]
+        return range(
+            bisect_left(codes, start * LINE_CODES),
+            bisect_left(codes, stop * LINE_CODES),
+        )
+
+    def place(self, edition: str, row: int) -> Tuple[int, int]:
+        """
+        Find where a row falls in an edition.
+
+        Args:
+            edition: One of EDITIONS
+            row: Row number
+
+        Returns:
+            (line number, half-line), with half-line 0 for on and 1 for off
+        """
+        line, rest = divmod(self._codes[self._column(edition)][row], LINE_CODES)
+        return line, rest // 10
+
+    def form(self, edition: str, row: int) -> Optional[str]:
+        """
+        Get an edition's form in a row.
+
+        Args:
+            edition: One of EDITIONS
+            row: Row number
+
+        Returns:
+            The form, or None where the edition has a gap
+        """
+        return self._forms[self._column(edition)][row]
+
+    def text(self, edition: str, start: int, stop: int) -> Dict[int, str]:
+        """
+        Put an edition's lines back together from its aligned forms.
+
+        Joins become spaces, gaps are skipped and the half-lines are
+        separated as in the edition text files. Only the rows for the lines
+        asked for are read.
+
+        Args:
+            edition: One of EDITIONS
+            start: First line number, inclusive
+            stop: Last line number, exclusive
+
+        Returns:
+            Text by line number, for the lines in the range with any tokens
+        """
+        column = self._column(edition)
+        codes, forms = self._codes[column], self._forms[column]
+        halves: Dict[int, List[List[str]]] = {}
+        for row in self.rows(edition, start, stop):
+            form = forms[row]
+            if form is None:
+                continue
+            line, rest = divmod(codes[row], LINE_CODES)
+            halves.setdefault(line, [[], []])[rest // 10].append(
+                form.replace(JOIN, " ")
+            )
+        lines = {}
+        for line, (on, off) in halves.items():
+            text = " ".join(on)
+            if off:
+                text += CAESURA + " ".join(off)
+            lines[line] = text
+        return lines
+
+
+def _line_map(alignment: Alignment, source: int, target: int, size: int) -> array:
+    """
+    Map each line of one edition to the line of another where it starts.
+
+    A line maps to the target line of its first token that both editions
+    have; failing that, of its first token in the source edition; failing
+    that, of any row naming the line. Lines no row names map to NO_LINE.
+    """
+    lines = array("i", [NO_LINE]) * size
+    # how good the current mapping is: 0 none, 1 any row, 2 source token,
+    # 3 token in both
+    ranks = bytearray(size)
+    for source_code, target_code, source_gap, target_gap in zip(
+        alignment._codes[source],
+        alignment._codes[target],
+        alignment._gaps[source],
+        alignment._gaps[target],
+    ):
+        line = source_code // LINE_CODES
+        rank = 1 if source_gap else 2 if target_gap else 3
+        if rank > ranks[line]:
+            ranks[line] = rank
+            lines[line] = target_code // LINE_CODES
+    return lines
+
+
+class NumberingMapper:
+    """Translate line numbers between Heorot and the other editions."""
+
+    def __init__(self, alignment: Alignment) -> None:
+        """
+        Build the translation arrays.
+
+        Args:
+            alignment: The aligned editions
+        """
+        self.line_counts: Dict[str, int] = {
+            edition: alignment.line_count(edition) for edition in EDITIONS
+        }
+        heorot_size = self.line_counts["heorot"] + 1
+        self._from_heorot: Dict[str, array] = {}
+        self._to_heorot: Dict[str, array] = {}
+        for column, edition in enumerate(EDITIONS):
+            if column == HEOROT:
+                continue
+            size = self.line_counts[edition] + 1
+            self._from_heorot[edition] = _line_map(
+                alignment, HEOROT, column, heorot_size
+            )
+            self._to_heorot[edition] = _line_map(alignment, column, HEOROT, size)
+
+    @staticmethod
+    def _lookup(lines: array, line: int) -> Optional[int]:
+        """Read one entry of a translation array."""
+        if not 0 <= line < len(lines):
+            return None
+        number = lines[line]
+        return None if number == NO_LINE else number
+
+    def _edition(self, edition: str, table: Dict[str, array]) -> array:
+        """Find an edition's translation array."""
+        try:
+            return table[edition]
+        except KeyError:
+            raise ValueError(
+                f"Unknown edition '{edition}'; choose from {', '.join(EDITIONS)}"
+            ) from None
+
+    def from_heorot(self, edition: str, line: int) -> Optional[int]:
+        """
+        Find where a Heorot line starts in another edition.
+
+        Args:
+            edition: One of EDITIONS other than 'heorot'
+            line: Heorot line number
+
+        Returns:
+            The edition's line number, or None if the line is not aligned
+
+        Raises:
+            ValueError: If the edition is unknown
+        """
+        if edition == "heorot":
+            return line if 1 <= line <= self.line_counts["heorot"] else None
+        return self._lookup(self._edition(edition, self._from_heorot), line)
+
+    def to_heorot(self, edition: str, line: int) -> Optional[int]:
+        """
+        Find where another edition's line starts in Heorot.
+
+        Args:
+            edition: One of EDITIONS other than 'heorot'
+            line: The edition's line number
+
+        Returns:
+            The Heorot line number, or None if the line is not aligned
+
+        Raises:
+            ValueError: If the edition is unknown
+        """
+        if edition == "heorot":
+            return self.from_heorot("heorot", line)
+        return self._lookup(self._edition(edition, self._to_heorot), line)
+
+    def translate(self, line: int, source: str, target: str) -> Optional[int]:
+        """
+        Translate a line number between any two editions, by way of Heorot.
+
+        Args:
+            line: Line number in the source edition
+            source: Edition the number comes from
+            target: Edition to translate it to
+
+        Returns:
+            The target edition's line number, or None if either step fails
+
+        Raises:
+            ValueError: If either edition is unknown
+        """
+        heorot_line = self.to_heorot(source, line)
+        if heorot_line is None:
+            return None
+        return self.from_heorot(target, heorot_line)
+
+
+@lru_cache(maxsize=None)
+def get_alignment(path: str = ALIGNED_FILE) -> Alignment:
+    """
+    Get the alignment in an aligned.txt file, loading it on first use.
+
+    Args:
+        path: File to read
+
+    Returns:
+        An Alignment shared by every caller
+    """
+    return Alignment.from_file(path)
+
+
+@lru_cache(maxsize=None)
+def get_mapper(path: str = ALIGNED_FILE) -> NumberingMapper:
+    """
+    Get the numbering mapper for an aligned.txt file, building it on first use.
+
+    Args:
+        path: File to read
+
+    Returns:
+        A NumberingMapper shared by every caller
+    """
+    return NumberingMapper(get_alignment(path))
@@ -0,0 +1,677 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the heorot pipeline.
+
+Times each stage of the pipeline against the committed data and reports
+median and 95th percentile wall time plus traced memory allocation. Results
+can be saved as a baseline and later runs compared against it.
+
+    python benchmark.py --save benchmarks/baseline.json
+    python benchmark.py --compare benchmarks/baseline.json
+
+With --memory each stage instead runs once for its peak resident memory and
+its largest tracemalloc allocation sites, and is checked against the budget
+committed in benchmarks/memory_budget.json; the run fails if any stage has
+outgrown it.
+
+    python benchmark.py --memory
+    python benchmark.py --memory --save-budget
+"""
+
+import argparse
+import gc
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from unittest import mock
+
+import heorot
+from normalize import Normalizer, clean_cell
+from search import SearchIndex
+
+DEFAULT_REPEAT = 7
+BASELINE_FILE = "benchmarks/baseline.json"
+HTML_FILE = "data/fitts/maintext.html"
+
+# Memory mode: the committed budget, how many allocation sites to keep per
+# stage, and the headroom given to measured usage when saving a new budget
+MEMORY_BUDGET_FILE = "benchmarks/memory_budget.json"
+MEMORY_TOP = 5
+BUDGET_HEADROOM = 1.5
+BUDGET_GRANULARITY = 256 * 1024  # budgets are rounded up to this many bytes
+BUDGET_FLOOR = 4 * 1024 * 1024  # below this, RSS growth is allocator noise
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and allocation statistics for one benchmark."""
+
+    name: str
+    runs: int
+    median: float
+    p95: float
+    minimum: float
+    peak_bytes: int
+    allocated_blocks: int
+
+
+@dataclass
+class Allocation:
+    """Memory still held at one source line when a stage returns."""
+
+    location: str
+    size: int
+    count: int
+
+
+@dataclass
+class MemoryResult:
+    """Peak memory of one benchmark's single run."""
+
+    name: str
+    # growth of peak RSS over RSS at the start; memory the process already
+    # held, such as heap freed by the warm-up run, is reused without growth
+    rss_bytes: Optional[int]
+    traced_bytes: int  # tracemalloc peak
+    top: List[Allocation] = field(default_factory=list)
+
+
+@dataclass
+class Benchmark:
+    """A named operation to time, with optional per-run preparation."""
+
+    name: str
+    func: Callable[[], Any]
+    reset: Optional[Callable[[], None]] = None
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of samples.
+
+    Args:
+        samples: Measured values
+        fraction: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        The sample at that rank
+    """
+    ordered = sorted(samples)
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def measure(benchmark: Benchmark, repeat: int = DEFAULT_REPEAT) -> BenchmarkResult:
+    """
+    Time a benchmark and trace the memory of one extra run.
+
+    Args:
+        benchmark: Operation to measure
+        repeat: Number of timed runs, after one untimed warm-up
+
+    Returns:
+        Statistics for the benchmark
+    """
+    if benchmark.reset:
+        benchmark.reset()
+    benchmark.func()  # warm-up: imports, caches, first-touch page faults
+
+    samples = []
+    for _ in range(repeat):
+        if benchmark.reset:
+            benchmark.reset()
+        started = time.perf_counter()
+        benchmark.func()
+        samples.append(time.perf_counter() - started)
+
+    if benchmark.reset:
+        benchmark.reset()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    benchmark.func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(
+        stat.count_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.count_diff > 0
+    )
+
+    return BenchmarkResult(
+        name=benchmark.name,
+        runs=repeat,
+        median=statistics.median(samples),
+        p95=percentile(samples, 0.95),
+        minimum=min(samples),
+        peak_bytes=peak,
+        allocated_blocks=blocks,
+    )
+
+
+def current_rss() -> Optional[int]:
+    """
+    Read the process's resident set size.
+
+    Returns:
+        Bytes resident now, or None where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as file:
+            pages = int(file.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Read the process's resident set high-water mark.
+
+    Returns:
+        Peak bytes resident since start or the last reset_peak_rss(), or
+        None where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as file:
+            status = file.read()
+    except OSError:
+        return None
+    found = re.search(r"^VmHWM:\s+(\d+) kB", status, re.MULTILINE)
+    return int(found.group(1)) * 1024 if found else None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Restart the high-water mark from the current RSS, as Linux allows.
+
+    Returns:
+        Whether the mark was reset; if not, peak_rss() spans the process
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as file:
+            file.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def measure_memory(benchmark: Benchmark, top: int = MEMORY_TOP) -> MemoryResult:
+    """
+    Measure the peak memory of a benchmark.
+
+    One run measures RSS, which needs the high-water mark to be resettable;
+    a second run under tracemalloc finds the traced peak and the source
+    lines holding the most memory when the run returns.
+
+    Args:
+        benchmark: Operation to measure
+        top: Number of allocation sites to keep
+
+    Returns:
+        Memory statistics for the benchmark
+    """
+    if benchmark.reset:
+        benchmark.reset()
+    benchmark.func()  # warm-up: imports and caches are not the stage's cost
+
+    if benchmark.reset:
+        benchmark.reset()
+    gc.collect()
+    rss_bytes = None
+    start = current_rss()
+    if start is not None and reset_peak_rss():
+        benchmark.func()
+        peak = peak_rss()
+        rss_bytes = None if peak is None else max(0, peak - start)
+
+    if benchmark.reset:
+        benchmark.reset()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = benchmark.func()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return MemoryResult(
+        name=benchmark.name,
+        rss_bytes=rss_bytes,
+        traced_bytes=traced_peak,
+        top=[
+            Allocation(str(stat.traceback), stat.size, stat.count)
+            for stat in snapshot.statistics("lineno")[:top]
+        ],
+    )
+
+
+@contextmanager
+def scratch_tree() -> Iterator[str]:
+    """
+    Work in a temporary copy of the data directory.
+
+    The pipeline writes relative to the working directory, so benchmarks
+    that write output run here instead of over the committed files. The
+    HTTP session is replaced so nothing can reach the network.
+
+    Yields:
+        Path of the temporary working directory
+    """
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="voxbeowulf-bench-") as scratch:
+        os.makedirs(os.path.join(scratch, "data", "fitts"))
+        os.makedirs(os.path.join(scratch, "data", "subtitles"))
+        shutil.copy(HTML_FILE, os.path.join(scratch, HTML_FILE))
+        shutil.copy(
+            heorot.ASS_PARAMS["blank_template"],
+            os.path.join(scratch, heorot.ASS_PARAMS["blank_template"]),
+        )
+        os.chdir(scratch)
+        try:
+            with mock.patch.object(
+                heorot, "get_session", side_effect=RuntimeError("network disabled")
+            ):
+                yield scratch
+        finally:
+            os.chdir(original)
+
+
+def _reset_build() -> None:
+    """Forget cached parses and the build manifest so run() starts cold."""
+    shutil.rmtree("data/cache", ignore_errors=True)
+    for name in os.listdir("data/fitts"):
+        if name.endswith(".manifest.json"):
+            os.remove(os.path.join("data/fitts", name))
+
+
+def pipeline_benchmarks(html: str) -> List[Benchmark]:
+    """
+    Build the benchmarks for every stage of the pipeline.
+
+    Must be called inside scratch_tree(), since several stages write files.
+
+    Args:
+        html: Contents of the committed maintext.html
+
+    Returns:
+        Benchmarks in pipeline order
+    """
+    raw_cells = [
+        "Hwæt!   Wé\nGárdena &nbsp;&nbsp;&nbsp;&nbsp; in géardagum",
+        "Listen!  We --of the Spear-Danes &nbsp;&nbsp;&nbsp;&nbsp;\nin the days",
+    ] * 3200
+    lines = heorot.parse(html, heorot.available_backends()[-1])
+    records = lines.to_records()
+    index = SearchIndex.build(lines)
+
+    benchmarks = [
+        Benchmark(
+            "normalize_text", lambda: [heorot.normalize_text(c) for c in raw_cells]
+        ),
+        Benchmark("clean_cell", lambda: [clean_cell(c) for c in raw_cells]),
+        Benchmark("fold[match]", lambda: Normalizer("match").column(lines.oe)),
+    ]
+    for backend in heorot.available_backends():
+        benchmarks.append(
+            Benchmark(f"parse[{backend}]", lambda b=backend: heorot.parse(html, b))
+        )
+    benchmarks.append(
+        Benchmark(
+            "parse_parallel",
+            lambda: heorot.parse_parallel(
+                html, heorot.DEFAULT_PARSER_BACKEND, workers=0
+            ),
+        )
+    )
+    benchmarks += [
+        Benchmark(
+            "get_fitt",
+            lambda: [
+                heorot.get_fitt(fitt_id, lines)
+                for fitt_id in heorot.FITT_INDEX.fitt_ids
+            ],
+        ),
+        Benchmark("write_json", lambda: heorot.write_json(lines, "bench.json")),
+        Benchmark("write_csv", lambda: heorot.write_csv(lines, "bench.csv")),
+        Benchmark(
+            "dialogue",
+            lambda: [
+                heorot.dialogue(
+                    record["OE"], "0:00:00.00", "0:00:04.00", "original_style"
+                )
+                for record in records
+            ],
+        ),
+        Benchmark("write_ass", lambda: heorot.write_ass(lines, workers=1)),
+        Benchmark("search[rare]", lambda: index.search("gardena")),
+        Benchmark("search[common]", lambda: index.search("the")),
+        Benchmark("search[limit]", lambda: index.search("the", limit=10)),
+        Benchmark("run[cold]", lambda: heorot.run([]), reset=_reset_build),
+        Benchmark("run[warm]", lambda: heorot.run([])),
+    ]
+    return benchmarks
+
+
+def run_benchmarks(
+    repeat: int = DEFAULT_REPEAT, only: Optional[Sequence[str]] = None
+) -> List[BenchmarkResult]:
+    """
+    Measure the pipeline benchmarks.
+
+    Args:
+        repeat: Number of timed runs per benchmark
+        only: Names of benchmarks to run; defaults to all of them
+
+    Returns:
+        Results in pipeline order
+    """
+    with open(HTML_FILE, "r", encoding="utf-8") as file:
+        html = file.read()
+
+    results = []
+    with scratch_tree():
+        for benchmark in pipeline_benchmarks(html):
+            if only and benchmark.name not in only:
+                continue
+            results.append(measure(benchmark, repeat))
+    return results
+
+
+def run_memory_benchmarks(
+    only: Optional[Sequence[str]] = None, top: int = MEMORY_TOP
+) -> List[MemoryResult]:
+    """
+    Measure the peak memory of the pipeline benchmarks.
+
+    Args:
+        only: Names of benchmarks to run; defaults to all of them
+        top: Number of allocation sites to keep per benchmark
+
+    Returns:
+        Results in pipeline order
+    """
+    with open(HTML_FILE, "r", encoding="utf-8") as file:
+        html = file.read()
+
+    results = []
+    with scratch_tree():
+        for benchmark in pipeline_benchmarks(html):
+            if only and benchmark.name not in only:
+                continue
+            results.append(measure_memory(benchmark, top))
+    return results
+
+
+def save_baseline(results: List[BenchmarkResult], path: str = BASELINE_FILE) -> None:
+    """
+    Record results as a baseline for later comparison.
+
+    Args:
+        results: Benchmark results
+        path: File to write
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    data = {
+        "python": sys.version.split()[0],
+        "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=4)
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Dict[str, Dict[str, Any]]:
+    """
+    Read a saved baseline.
+
+    Args:
+        path: File written by save_baseline
+
+    Returns:
+        Recorded results keyed by benchmark name
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def save_budget(
+    results: List[MemoryResult],
+    path: str = MEMORY_BUDGET_FILE,
+    headroom: float = BUDGET_HEADROOM,
+) -> None:
+    """
+    Record memory budgets from measured usage plus headroom.
+
+    Budgets of benchmarks that were not measured are kept.
+
+    Args:
+        results: Memory results
+        path: File to write
+        headroom: Factor applied to each measurement
+    """
+
+    def allowance(measured: Optional[int]) -> Optional[int]:
+        if measured is None:
+            return None
+        steps = math.ceil(measured * headroom / BUDGET_GRANULARITY)
+        return max(BUDGET_FLOOR, steps * BUDGET_GRANULARITY)
+
+    budget = load_budget(path) if os.path.exists(path) else {}
+    for result in results:
+        budget[result.name] = {
+            "rss_bytes": allowance(result.rss_bytes),
+            "traced_bytes": allowance(result.traced_bytes),
+        }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(budget, file, indent=4, sort_keys=True)
+        file.write("\n")
+
+
+def load_budget(path: str = MEMORY_BUDGET_FILE) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the memory budgets.
+
+    Args:
+        path: File written by save_budget
+
+    Returns:
+        Byte limits keyed by benchmark name, then by measurement
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def check_budget(
+    results: List[MemoryResult], budget: Dict[str, Dict[str, Any]]
+) -> List[str]:
+    """
+    Compare memory results with their budgets.
+
+    Benchmarks without a budget, and RSS where it could not be measured,
+    are not checked.
+
+    Args:
+        results: Memory results
+        budget: Limits from load_budget
+
+    Returns:
+        A message for each measurement over its budget
+    """
+    failures = []
+    for result in results:
+        limits = budget.get(result.name, {})
+        for key in ("rss_bytes", "traced_bytes"):
+            measured, limit = getattr(result, key), limits.get(key)
+            if measured is not None and limit is not None and measured > limit:
+                failures.append(
+                    f"{result.name}: {key} {measured / 1024:.0f} KiB "
+                    f"is over its budget of {limit / 1024:.0f} KiB"
+                )
+    return failures
+
+
+def format_report(
+    results: List[BenchmarkResult],
+    baseline: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> str:
+    """
+    Render results as a text table.
+
+    Args:
+        results: Benchmark results
+        baseline: Recorded results to compare medians against
+
+    Returns:
+        The table
+    """
+    header = f"{'benchmark':<22}{'median ms':>11}{'p95 ms':>10}{'peak KiB':>11}"
+    header += f"{'blocks':>9}"
+    if baseline is not None:
+        header += f"{'vs base':>9}"
+    rows = [header, "-" * len(header)]
+    for result in results:
+        row = (
+            f"{result.name:<22}{result.median * 1000:>11.2f}{result.p95 * 1000:>10.2f}"
+            f"{result.peak_bytes / 1024:>11.0f}{result.allocated_blocks:>9}"
+        )
+        if baseline is not None:
+            recorded = baseline.get(result.name)
+            if recorded and recorded["median"] > 0:
+                row += f"{result.median / recorded['median']:>8.2f}x"
+            else:
+                row += f"{'new':>9}"
+        rows.append(row)
+    return "\n".join(rows)
+
+
+def format_memory_report(
+    results: List[MemoryResult],
+    budget: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> str:
+    """
+    Render memory results as a text table with each stage's top allocators.
+
+    Args:
+        results: Memory results
+        budget: Limits to show beside the measurements
+
+    Returns:
+        The report
+    """
+
+    def kib(value: Optional[int]) -> str:
+        return "-" if value is None else f"{value / 1024:.0f}"
+
+    header = f"{'benchmark':<22}{'RSS KiB':>11}"
+    header += f"{'budget':>9}" if budget is not None else ""
+    header += f"{'traced KiB':>12}"
+    header += f"{'budget':>9}" if budget is not None else ""
+    rows = [header, "-" * len(header)]
+    for result in results:
+        row = f"{result.name:<22}"
+        limits = None if budget is None else budget.get(result.name, {})
+        for key, width in (("rss_bytes", 11), ("traced_bytes", 12)):
+            row += f"{kib(getattr(result, key)):>{width}}"
+            if limits is not None:
+                row += f"{kib(limits.get(key)):>9}"
+        rows.append(row)
+
+    for result in results:
+        if result.top:
+            rows += ["", f"{result.name}: held on return, before garbage collection"]
+            rows += [
+                f"  {allocation.size / 1024:>9.0f} KiB {allocation.count:>8} blocks"
+                f"  {allocation.location}"
+                for allocation in result.top
+            ]
+    return "\n".join(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command-line entry point for the benchmark suite.
+
+    Returns:
+        Process exit status; 1 if a stage is over its memory budget
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--only", nargs="+", metavar="NAME")
+    parser.add_argument("--save", nargs="?", const=BASELINE_FILE, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_FILE, metavar="PATH")
+    parser.add_argument(
+        "--memory", action="store_true", help="measure peak memory per stage"
+    )
+    parser.add_argument(
+        "--budget",
+        default=MEMORY_BUDGET_FILE,
+        metavar="PATH",
+        help=f"memory budget to check (default {MEMORY_BUDGET_FILE})",
+    )
+    parser.add_argument(
+        "--save-budget",
+        action="store_true",
+        help=f"write measured usage times {BUDGET_HEADROOM} as the new budget",
+    )
+    args = parser.parse_args(argv)
+
+    # the pipeline logs every stage; keep the report readable
+    heorot.configure_logging(logging.ERROR)
+    if args.memory:
+        return memory_main(args.only, args.budget, args.save_budget)
+
+    results = run_benchmarks(args.repeat, args.only)
+    baseline = load_baseline(args.compare) if args.compare else None
+    print(format_report(results, baseline))
+    if args.save:
+        save_baseline(results, args.save)
+    return 0
+
+
+def memory_main(
+    only: Optional[Sequence[str]], budget_path: str, save: bool = False
+) -> int:
+    """
+    Run the memory benchmarks and check or save the budget.
+
+    Args:
+        only: Names of benchmarks to run; defaults to all of them
+        budget_path: Budget file to check, or to write with save
+        save: Write a new budget instead of checking the old one
+
+    Returns:
+        Process exit status; 1 if a stage is over its budget
+    """
+    results = run_memory_benchmarks(only)
+    if save:
+        save_budget(results, budget_path)
+        print(format_memory_report(results, load_budget(budget_path)))
+        return 0
+
+    budget = load_budget(budget_path) if os.path.exists(budget_path) else None
+    print(format_memory_report(results, budget))
+    failures = check_budget(results, budget or {})
+    for failure in failures:
+        print(f"over budget: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
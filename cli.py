@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Command-line interface for voxbeowulf.
+
+Subcommands import only what they need: a lookup reads the binary corpus
+through corpus.py alone, while the pipeline commands import heorot, which in
+turn loads bs4, requests and pysubs2 only for the stages that use them.
+
+    voxbeowulf                      fetch, parse and write every output
+    voxbeowulf fetch [--refresh]    download the Heorot HTML
+    voxbeowulf parse                parse the HTML and warm the parse cache
+    voxbeowulf export json|csv      write the combined JSON or CSV file
+    voxbeowulf export sqlite        write the SQLite database of lines and fitts
+    voxbeowulf ass [--fitt N ...]   write the per-fitt subtitle files
+    voxbeowulf stream               write JSON Lines, CSV and ASS to data/stream
+    voxbeowulf diff OLD NEW         list changed lines and the fitts to rebuild
+    voxbeowulf lookup line 1066     print a line from the corpus
+    voxbeowulf lookup fitt 12       print a fitt from the corpus
+    voxbeowulf variants 9 [12]      print the editions' variant readings
+    voxbeowulf search gardena       find a word or phrase, accents ignored
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, Optional, Sequence
+
+FILESTEM = "maintext"
+URL = "https://heorot.dk/beowulf-rede-text.html"
+PROFILE_DIR = "profile"  # matches timing.PROFILE_DIR, which is not imported here
+
+# Width of the line number column in lookup output
+NUMBER_WIDTH = 6
+
+
+def html_path(filestem: str) -> str:
+    """Path of the stored HTML for a file stem."""
+    return f"data/fitts/{filestem}.html"
+
+
+def corpus_path(filestem: str) -> str:
+    """Path of the binary corpus for a file stem."""
+    return f"data/fitts/{filestem}.corpus"
+
+
+def search_path(filestem: str) -> str:
+    """Path of the search index for a file stem."""
+    return f"data/fitts/{filestem}.search"
+
+
+def editions_search_path(filestem: str) -> str:
+    """Path of the search index that includes the editions, for a file stem."""
+    return f"data/fitts/{filestem}.editions.search"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for every subcommand.
+
+    Returns:
+        The top-level parser; parsed arguments carry the handler as 'func'
+    """
+    parser = argparse.ArgumentParser(
+        prog="voxbeowulf", description="Process the Heorot Beowulf text."
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_DIR,
+        metavar="DIR",
+        help=f"write cProfile and timing reports to DIR (default {PROFILE_DIR})",
+    )
+    parser.add_argument(
+        "--filestem", default=FILESTEM, help="base name of the data files"
+    )
+    parser.set_defaults(
+        func=cmd_build,
+        backend=None,
+        no_cache=False,
+        no_notes=False,
+        parse_workers=None,
+        force=False,
+        refresh=False,
+        sqlite=False,
+    )
+
+    # options shared by the commands that parse the HTML
+    parsing = argparse.ArgumentParser(add_help=False)
+    parsing.add_argument(
+        "--backend", help="HTML parser backend (default $VOXBEOWULF_PARSER)"
+    )
+    parsing.add_argument(
+        "--no-cache", action="store_true", help="parse even if a cached result exists"
+    )
+    parsing.add_argument(
+        "--no-notes", action="store_true", help="skip editorial note extraction"
+    )
+    parsing.add_argument(
+        "--parse-workers",
+        type=int,
+        metavar="N",
+        help="processes to parse with, 0 for one per CPU "
+        "(default $VOXBEOWULF_PARSE_WORKERS)",
+    )
+
+    commands = parser.add_subparsers(title="commands", metavar="COMMAND")
+
+    build = commands.add_parser(
+        "build", parents=[parsing], help="write every output (the default)"
+    )
+    build.add_argument("--force", action="store_true", help="ignore the manifest")
+    build.add_argument(
+        "--refresh", action="store_true", help="check heorot.dk for a newer copy"
+    )
+    build.add_argument(
+        "--sqlite", action="store_true", help="also write the SQLite database"
+    )
+    build.set_defaults(func=cmd_build)
+
+    fetch = commands.add_parser("fetch", help="download the Heorot HTML")
+    fetch.add_argument(
+        "--refresh", action="store_true", help="check heorot.dk for a newer copy"
+    )
+    fetch.set_defaults(func=cmd_fetch)
+
+    parse = commands.add_parser(
+        "parse", parents=[parsing], help="parse the HTML and cache the result"
+    )
+    parse.set_defaults(func=cmd_parse)
+
+    export = commands.add_parser(
+        "export", parents=[parsing], help="write the combined JSON, CSV or database"
+    )
+    export.add_argument("format", choices=("json", "csv", "sqlite"))
+    export.add_argument("-o", "--output", help="output path (default data/fitts/)")
+    export.set_defaults(func=cmd_export)
+
+    ass = commands.add_parser(
+        "ass", parents=[parsing], help="write the per-fitt subtitle files"
+    )
+    ass.add_argument(
+        "--fitt", type=int, nargs="+", metavar="N", help="only these fitts"
+    )
+    ass.add_argument(
+        "--workers", type=int, help="processes to use (default $VOXBEOWULF_ASS_WORKERS)"
+    )
+    ass.set_defaults(func=cmd_ass)
+
+    stream = commands.add_parser(
+        "stream",
+        help="write JSON Lines, CSV and ASS to data/stream as lines are parsed",
+    )
+    stream.add_argument(
+        "--backend", help="HTML parser backend (default $VOXBEOWULF_PARSER)"
+    )
+    stream.add_argument(
+        "--no-notes", action="store_true", help="skip editorial note extraction"
+    )
+    stream.add_argument(
+        "--fitt", type=int, nargs="+", metavar="N", help="only these fitts' ASS"
+    )
+    stream.set_defaults(func=cmd_stream)
+
+    diff = commands.add_parser(
+        "diff", help="compare two versions of the HTML, table by table"
+    )
+    diff.add_argument("old", help="earlier HTML file")
+    diff.add_argument("new", help="later HTML file")
+    diff.add_argument(
+        "--backend", help="HTML parser backend (default $VOXBEOWULF_PARSER)"
+    )
+    diff.add_argument(
+        "--no-notes", action="store_true", help="skip editorial note extraction"
+    )
+    diff.add_argument("--json", action="store_true", help="print the diff as JSON")
+    diff.set_defaults(func=cmd_diff)
+
+    lookup = commands.add_parser("lookup", help="print a line or fitt from the corpus")
+    lookup.add_argument("kind", choices=("line", "fitt"))
+    lookup.add_argument("number", type=int)
+    lookup.add_argument("--json", action="store_true", help="print JSON records")
+    lookup.add_argument("--corpus", help="corpus file (default data/fitts/)")
+    lookup.set_defaults(func=cmd_lookup)
+
+    variants = commands.add_parser(
+        "variants", help="print the variant readings of lines across editions"
+    )
+    variants.add_argument("start", type=int, metavar="LINE", help="first line")
+    variants.add_argument(
+        "stop", type=int, nargs="?", metavar="LAST", help="last line (default LINE)"
+    )
+    variants.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="processes to compare with, 0 for one per CPU "
+        "(default $VOXBEOWULF_VARIANT_WORKERS)",
+    )
+    variants.add_argument(
+        "--no-cache", action="store_true", help="compare even if a cached result exists"
+    )
+    variants.add_argument("--json", action="store_true", help="print JSON records")
+    variants.set_defaults(func=cmd_variants)
+
+    search = commands.add_parser(
+        "search", help="find a word or phrase, ignoring accents and case"
+    )
+    search.add_argument("query", nargs="+", metavar="WORD", help="words to find")
+    search.add_argument(
+        "--prefix",
+        action="store_true",
+        help="let the last word be the start of a longer word",
+    )
+    search.add_argument(
+        "--thorn", action="store_true", help="treat ð and þ as the same letter"
+    )
+    search.add_argument(
+        "--editions",
+        action="store_true",
+        help="also search the editions in archive/data",
+    )
+    search.add_argument(
+        "--field",
+        nargs="+",
+        metavar="NAME",
+        help="only search these: OE, ME or, with --editions, an edition",
+    )
+    search.add_argument("--limit", type=int, metavar="N", help="print at most N lines")
+    search.add_argument(
+        "--index",
+        help="index file (default data/fitts/maintext.search, or "
+        "maintext.editions.search with --editions)",
+    )
+    search.add_argument("--json", action="store_true", help="print JSON records")
+    search.set_defaults(func=cmd_search)
+
+    return parser
+
+
+def _load_lines(args: argparse.Namespace) -> Any:
+    """
+    Fetch and parse the HTML for a pipeline command.
+
+    Args:
+        args: Parsed arguments with filestem, backend, no_cache, no_notes and
+            parse_workers
+
+    Returns:
+        The parsed line store
+
+    Raises:
+        ValidationError: If the parsed lines break an integrity rule
+    """
+    import heorot
+    from timing import stage
+    from validation import check
+
+    backend = args.backend or heorot.DEFAULT_PARSER_BACKEND
+    workers = parse_worker_count(args)
+    notes = not args.no_notes
+    with stage("fetch", refresh=False) as span:
+        html = heorot.fetch_and_store(URL, html_path(args.filestem))
+        span.fields["chars"] = len(html)
+    with stage("parse", backend=backend, cached=not args.no_cache) as span:
+        if not args.no_cache:
+            lines = heorot.parse_cached(html, backend, notes=notes, workers=workers)
+        elif workers != 1:
+            lines = heorot.parse_parallel(html, backend, notes, workers)
+        else:
+            lines = heorot.parse(html, backend, notes)
+        span.fields["lines"] = len(lines)
+    check(lines)
+    return lines
+
+
+def parse_worker_count(args: argparse.Namespace) -> int:
+    """The --parse-workers option, or the heorot default when it is absent."""
+    import heorot
+
+    return heorot.PARSE_WORKERS if args.parse_workers is None else args.parse_workers
+
+
+def cmd_build(args: argparse.Namespace) -> int:
+    """Run the whole pipeline, rebuilding only stale outputs."""
+    import heorot
+
+    heorot.do_file(
+        args.filestem,
+        URL,
+        backend=args.backend or heorot.DEFAULT_PARSER_BACKEND,
+        use_cache=not args.no_cache,
+        force=args.force,
+        refresh=args.refresh,
+        notes=not args.no_notes,
+        workers=parse_worker_count(args),
+        sqlite=args.sqlite,
+    )
+    return 0
+
+
+def cmd_fetch(args: argparse.Namespace) -> int:
+    """Download the HTML, or revalidate the stored copy with --refresh."""
+    import heorot
+
+    path = html_path(args.filestem)
+    html = heorot.fetch_and_store(URL, path, refresh=args.refresh)
+    print(f"{path}: {len(html)} characters")
+    return 0
+
+
+def cmd_parse(args: argparse.Namespace) -> int:
+    """Parse the HTML, storing the result in the parse cache."""
+    lines = _load_lines(args)
+    print(f"{len(lines)} lines")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Write the combined JSON or CSV file, or the SQLite database."""
+    import heorot
+    from timing import stage
+
+    lines = _load_lines(args)
+    path = args.output or f"data/fitts/{args.filestem}.{args.format}"
+    if args.format == "sqlite":
+        from database import write_database as writer
+    else:
+        writer = {"json": heorot.write_json, "csv": heorot.write_csv}[args.format]
+    with stage(f"write_{args.format}", lines=len(lines)):
+        writer(lines, path)
+    print(path)
+    return 0
+
+
+def cmd_ass(args: argparse.Namespace) -> int:
+    """Write the subtitle files for every fitt, or just the chosen ones."""
+    import heorot
+
+    fitt_ids = args.fitt
+    if fitt_ids is not None:
+        unknown = [fitt_id for fitt_id in fitt_ids if fitt_id not in heorot.FITT_INDEX]
+        if unknown:
+            print(f"voxbeowulf: no such fitt: {unknown[0]}", file=sys.stderr)
+            return 2
+
+    lines = _load_lines(args)
+    workers = heorot.ASS_WORKERS if args.workers is None else args.workers
+    heorot.write_ass(lines, workers=workers, fitt_ids=fitt_ids)
+    return 0
+
+
+def cmd_stream(args: argparse.Namespace) -> int:
+    """Parse and write the line outputs in one streaming pass."""
+    import heorot
+    from streaming import stream_file
+
+    count = stream_file(
+        args.filestem,
+        URL,
+        backend=args.backend or heorot.DEFAULT_PARSER_BACKEND,
+        fitt_ids=args.fitt,
+        notes=not args.no_notes,
+    )
+    print(f"{count} lines")
+    return 0
+
+
+def cmd_diff(args: argparse.Namespace) -> int:
+    """Print the lines that differ between two HTML files."""
+    from dataclasses import asdict
+
+    import heorot
+    from incremental import TableSnapshot, reparse
+
+    backend = args.backend or heorot.DEFAULT_PARSER_BACKEND
+    with open(args.old, "r", encoding="utf-8") as file:
+        previous = TableSnapshot.build(file.read(), backend, not args.no_notes)
+    with open(args.new, "r", encoding="utf-8") as file:
+        _, diff = reparse(file.read(), previous, backend)
+
+    if args.json:
+        print(json.dumps(asdict(diff), ensure_ascii=False, indent=4))
+        return 0
+
+    for change in diff.changes:
+        if change.old is not None:
+            print(f"-{format_record(change.old)}")
+        if change.new is not None:
+            print(f"+{format_record(change.new)}")
+    if diff.renumbered_from is not None:
+        print(f"lines from {diff.renumbered_from} on are renumbered")
+    fitts = " ".join(map(str, diff.fitts)) or "none"
+    print(f"fitts to rebuild: {fitts}")
+    return 0
+
+
+def cmd_lookup(args: argparse.Namespace) -> int:
+    """Print a line or a fitt straight from the binary corpus."""
+    from corpus import CorpusReader
+    from numbering import FITT_INDEX
+
+    if args.kind == "fitt" and args.number not in FITT_INDEX:
+        print(f"voxbeowulf: no such fitt: {args.number}", file=sys.stderr)
+        return 2
+
+    path = args.corpus or corpus_path(args.filestem)
+    try:
+        reader = CorpusReader(path)
+    except FileNotFoundError:
+        print(
+            f"voxbeowulf: {path} not found; run 'voxbeowulf build' first",
+            file=sys.stderr,
+        )
+        return 1
+
+    with reader:
+        try:
+            if args.kind == "line":
+                records = [reader.line(args.number)]
+            else:
+                records = reader.fitt(args.number)
+        except IndexError:
+            print(f"voxbeowulf: no such {args.kind}: {args.number}", file=sys.stderr)
+            return 1
+
+    if args.json:
+        output = records[0] if args.kind == "line" else records
+        print(json.dumps(output, ensure_ascii=False, indent=4))
+    else:
+        print("\n".join(format_record(record) for record in records))
+    return 0
+
+
+def cmd_variants(args: argparse.Namespace) -> int:
+    """Print the variant readings of a run of lines."""
+    from alignment import GAP
+    from parse_cache import ParseCache
+    from variants import VARIANT_WORKERS, variant_readings
+
+    workers = VARIANT_WORKERS if args.workers is None else args.workers
+    cache = None if args.no_cache else ParseCache()
+    variants = variant_readings(workers=workers, cache=cache)
+    stop = args.start if args.stop is None else args.stop
+    found = [
+        variant
+        for line in range(args.start, stop + 1)
+        for variant in variants.get(line, [])
+    ]
+
+    if args.json:
+        print(
+            json.dumps(
+                [variant._asdict() for variant in found], ensure_ascii=False, indent=4
+            )
+        )
+        return 0
+
+    indent = " " * NUMBER_WIDTH
+    for variant in found:
+        print(
+            f"{variant.line:<{NUMBER_WIDTH}}{variant.token} {' '.join(variant.kinds)}"
+        )
+        for edition, form in variant.readings.items():
+            print(f"{indent}{edition:<20}{GAP if form is None else form}")
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    """Print the lines matching a word or phrase, with the matches marked."""
+    from search import LINE_FIELDS, SearchIndex, highlight
+
+    default_path = editions_search_path if args.editions else search_path
+    path = args.index or default_path(args.filestem)
+    try:
+        index = SearchIndex.load(path)
+    except FileNotFoundError as error:
+        print(
+            f"voxbeowulf: {error.filename} not found; run 'voxbeowulf build' first",
+            file=sys.stderr,
+        )
+        return 1
+    except ValueError as error:
+        print(f"voxbeowulf: {error}", file=sys.stderr)
+        return 1
+    if args.editions and index.fields == LINE_FIELDS:
+        print(f"voxbeowulf: {path} does not index the editions", file=sys.stderr)
+        return 2
+
+    try:
+        hits = index.search(
+            " ".join(args.query),
+            prefix=args.prefix,
+            thorn=args.thorn,
+            fields=args.field,
+            limit=args.limit,
+        )
+    except ValueError as error:
+        print(f"voxbeowulf: {error}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps([hit._asdict() for hit in hits], ensure_ascii=False, indent=4))
+        return 0
+
+    width = max(map(len, index.fields)) + 1
+    for hit in hits:
+        print(
+            f"{hit.line:<{NUMBER_WIDTH}}{hit.field:<{width}}"
+            f"{highlight(hit.text, hit.spans)}"
+        )
+    return 0
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    """
+    Render a line record for the terminal.
+
+    Args:
+        record: Line data dictionary
+
+    Returns:
+        The line number and OE text, with the ME text and any notes below
+    """
+    indent = " " * NUMBER_WIDTH
+    rows = [f"{record['line']:<{NUMBER_WIDTH}}{record['OE']}"]
+    rows += [f"{indent}{record['ME']}"] if record["ME"] else []
+    rows += [f"{indent}[{record['notes']}]"] if record.get("notes") else []
+    return "\n".join(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Command-line arguments; defaults to sys.argv[1:]
+
+    Returns:
+        Process exit status
+    """
+    args = build_parser().parse_args(argv)
+    handler: Callable[[argparse.Namespace], int] = args.func
+    if handler is cmd_lookup:
+        return handler(args)
+
+    import heorot
+
+    heorot.configure_logging()
+    try:
+        if args.profile:
+            from timing import profiled
+
+            with profiled(args.profile):
+                return handler(args)
+        return handler(args)
+    except Exception as error:
+        # only the commands that validate need the validation module
+        from validation import ValidationError
+
+        if not isinstance(error, ValidationError):
+            raise
+        print(f"voxbeowulf: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
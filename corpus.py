@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Memory-mappable binary corpus of parsed Beowulf lines.
+
+The file starts with a fixed header, followed by a fixed-width entry per
+line and then the UTF-8 text of every column. Because line N's entry sits
+at a known position, a reader can fetch any line or fitt straight out of
+the mapped file without decoding the rest of it.
+
+Layout (little-endian):
+
+    header   magic b"VXBC", version u16, flags u16, line count u32,
+             text offset u32
+    entries  per line: line number i32, then (offset u32, length u32)
+             for OE, ME and, if FLAG_NOTES is set, notes
+    text     concatenated UTF-8 column values; offsets are relative to
+             the start of this section
+"""
+
+import mmap
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+from linestore import LineRecords
+from numbering import FITT_INDEX
+
+MAGIC = b"VXBC"
+FORMAT_VERSION = 1
+FLAG_NOTES = 0x1
+
+# Length recorded for a missing (None) value, as opposed to an empty one
+MISSING = 0xFFFFFFFF
+
+HEADER = struct.Struct("<4sHHII")
+
+
+def _entry_struct(columns: int) -> struct.Struct:
+    """Entry layout for a corpus with the given number of text columns."""
+    return struct.Struct("<i" + "II" * columns)
+
+
+def write_corpus(lines: LineRecords, path: str) -> None:
+    """
+    Write line data as a binary corpus file.
+
+    Args:
+        lines: Line data numbered 0, 1, 2, ... with 'OE', 'ME' and optional 'notes'
+        path: Output file path
+
+    Raises:
+        ValueError: If the lines are not numbered sequentially from 0
+    """
+    with_notes = len(lines) > 0 and "notes" in lines[0]
+    keys = ("OE", "ME", "notes") if with_notes else ("OE", "ME")
+    entry = _entry_struct(len(keys))
+
+    entries = bytearray()
+    text = bytearray()
+    for index, line in enumerate(lines):
+        if line["line"] != index:
+            raise ValueError(f"Line {index} is numbered {line['line']}")
+
+        fields: List[int] = [index]
+        for key in keys:
+            value = line[key]
+            if value is None:
+                fields.extend((len(text), MISSING))
+                continue
+            encoded = value.encode("utf-8")
+            fields.extend((len(text), len(encoded)))
+            text += encoded
+        entries += entry.pack(*fields)
+
+    flags = FLAG_NOTES if with_notes else 0
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, flags, len(lines), HEADER.size + len(entries)
+    )
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        file.write(entries)
+        file.write(text)
+    os.replace(temp_path, path)
+
+
+class CorpusReader:
+    """Random access to a binary corpus file through a memory map."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Map a corpus file and read its header.
+
+        Args:
+            path: Corpus file written by write_corpus
+
+        Raises:
+            ValueError: If the file is not a corpus of a supported version
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, count, text_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} corpus")
+
+        self.has_notes = bool(flags & FLAG_NOTES)
+        self.keys: Tuple[str, ...] = (
+            ("OE", "ME", "notes") if self.has_notes else ("OE", "ME")
+        )
+        self._count = count
+        self._text_offset = text_offset
+        self._entry = _entry_struct(len(self.keys))
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+    def __enter__(self) -> "CorpusReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def line(self, number: int) -> Dict[str, Any]:
+        """
+        Fetch one line.
+
+        Args:
+            number: Line number, 0 to len - 1
+
+        Returns:
+            Line data dictionary like those in maintext.json
+
+        Raises:
+            IndexError: If the line number is out of range
+        """
+        if not 0 <= number < self._count:
+            raise IndexError(f"line {number} is not in the corpus")
+
+        fields = self._entry.unpack_from(
+            self._map, HEADER.size + number * self._entry.size
+        )
+        record: Dict[str, Any] = {"line": fields[0]}
+        for column, key in enumerate(self.keys):
+            offset, length = fields[1 + 2 * column], fields[2 + 2 * column]
+            record[key] = self._decode(offset, length)
+        return record
+
+    def _decode(self, offset: int, length: int) -> Optional[str]:
+        """Decode one column value from the text section."""
+        if length == MISSING:
+            return None
+        start = self._text_offset + offset
+        return self._map[start : start + length].decode("utf-8")
+
+    def __getitem__(self, number: int) -> Dict[str, Any]:
+        return self.line(number)
+
+    def range(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """
+        Fetch a run of lines.
+
+        Args:
+            start: First line number, inclusive
+            stop: Last line number, exclusive; clipped to the corpus length
+
+        Returns:
+            Line data dictionaries in order
+        """
+        return [self.line(number) for number in range(start, min(stop, self._count))]
+
+    def fitt(self, fitt_num: int) -> List[Dict[str, Any]]:
+        """
+        Fetch the lines of one fitt.
+
+        Args:
+            fitt_num: Index of the fitt in FITT_BOUNDARIES
+
+        Returns:
+            Line data dictionaries for the fitt
+
+        Raises:
+            IndexError: If there is no such fitt
+        """
+        fitt = FITT_INDEX.lines_of(fitt_num)
+        return self.range(fitt.start, fitt.stop)
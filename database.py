@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+SQLite database of parsed Beowulf lines, fitts and line number markers.
+
+One file holds everything a downstream tool needs to look lines up by
+number, fitt or marker, with indexed point and range queries, so no process
+has to load the whole of maintext.json. Each line also carries a search
+column, its OE and ME folded with the normalize 'match' profile; where
+SQLite has FTS5 it is indexed for full-text search.
+
+Schema:
+
+    meta     key, value        schema version, whether notes were captured
+    fitts    fitt, name, first_line, last_line
+    lines    line, fitt, oe, me, notes, search
+    markers  line, number      the line numbers printed beside the text
+    lines_fts                  FTS5 index over lines.search, if available
+
+    with CorpusDatabase("data/fitts/maintext.sqlite") as db:
+        db.fitt(12)
+        db.search("gardena")
+"""
+
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from linestore import LineRecords
+from normalize import get_normalizer
+from numbering import FITT_BOUNDARIES, FITT_INDEX, LINE_NUMBER_MARKERS
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE fitts (
+    fitt INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    first_line INTEGER NOT NULL,
+    last_line INTEGER NOT NULL
+);
+CREATE TABLE lines (
+    line INTEGER PRIMARY KEY,
+    fitt INTEGER REFERENCES fitts (fitt),
+    oe TEXT NOT NULL,
+    me TEXT NOT NULL,
+    notes TEXT,
+    search TEXT NOT NULL
+);
+CREATE INDEX lines_by_fitt ON lines (fitt, line);
+CREATE TABLE markers (
+    line INTEGER PRIMARY KEY REFERENCES lines (line),
+    number INTEGER NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE lines_fts USING fts5 (
+    search, content='lines', content_rowid='line'
+);
+INSERT INTO lines_fts (lines_fts) VALUES ('rebuild');
+"""
+
+
+def _fitt_of_lines(count: int) -> List[Optional[int]]:
+    """Map every line number below count to its fitt, or None."""
+    fitts: List[Optional[int]] = [None] * count
+    for fitt_id, start, stop in FITT_INDEX.split(0, count):
+        fitts[start:stop] = [fitt_id] * (stop - start)
+    return fitts
+
+
+def write_database(lines: LineRecords, path: str) -> bool:
+    """
+    Write line data, fitts and markers as a SQLite database.
+
+    The database is built beside the target and moved into place, so
+    readers never see a partial file.
+
+    Args:
+        lines: Line data numbered 0, 1, 2, ... with 'OE', 'ME' and optional 'notes'
+        path: Output file path
+
+    Returns:
+        Whether the full-text index was built
+
+    Raises:
+        ValueError: If the lines are not numbered sequentially from 0
+    """
+    with_notes = len(lines) > 0 and "notes" in lines[0]
+    fitts = _fitt_of_lines(len(lines))
+    match = get_normalizer("match")
+    rows = []
+    for index, line in enumerate(lines):
+        if line["line"] != index:
+            raise ValueError(f"Line {index} is numbered {line['line']}")
+        oe, me = line["OE"], line["ME"]
+        search = f"{match(oe)} {match(me)}".strip()
+        rows.append(
+            (
+                index,
+                fitts[index],
+                oe,
+                me,
+                line.get("notes") if with_notes else None,
+                search,
+            )
+        )
+
+    temp_path = f"{path}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    connection = sqlite3.connect(temp_path)
+    try:
+        with connection:
+            connection.executescript(SCHEMA)
+            connection.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    ("schema_version", str(SCHEMA_VERSION)),
+                    ("notes", str(int(with_notes))),
+                ],
+            )
+            connection.executemany(
+                "INSERT INTO fitts VALUES (?, ?, ?, ?)",
+                [
+                    (fitt_id, name, start, end)
+                    for fitt_id, (start, end, name) in enumerate(FITT_BOUNDARIES)
+                    if fitt_id in FITT_INDEX
+                ],
+            )
+            connection.executemany("INSERT INTO lines VALUES (?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany(
+                "INSERT INTO markers VALUES (?, ?)",
+                sorted(
+                    (line, number)
+                    for line, number in LINE_NUMBER_MARKERS.items()
+                    if line < len(lines)
+                ),
+            )
+        try:
+            with connection:
+                connection.executescript(FTS_SCHEMA)
+            full_text = True
+        except sqlite3.OperationalError:
+            full_text = False  # SQLite built without FTS5; search falls back to LIKE
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    finally:
+        connection.close()
+    os.replace(temp_path, path)
+    return full_text
+
+
+class CorpusDatabase:
+    """Read-only queries against a database written by write_database."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a database.
+
+        Args:
+            path: Database file written by write_database
+
+        Raises:
+            FileNotFoundError: If there is no such file
+            ValueError: If the file is not a database of a supported version
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                raise ValueError(f"{path} is not a version {SCHEMA_VERSION} database")
+            meta = dict(self._connection.execute("SELECT key, value FROM meta"))
+            self.full_text = (
+                self._connection.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'lines_fts'"
+                ).fetchone()
+                is not None
+            )
+        except (sqlite3.DatabaseError, ValueError):
+            self.close()
+            raise
+        self.has_notes = meta.get("notes") == "1"
+        self.keys: Tuple[str, ...] = (
+            ("OE", "ME", "notes") if self.has_notes else ("OE", "ME")
+        )
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._connection.close()
+
+    def __enter__(self) -> "CorpusDatabase":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM lines").fetchone()[0]
+
+    def _records(
+        self, where: str, *params: Any, limit: int = -1
+    ) -> List[Dict[str, Any]]:
+        """Fetch line records in line order."""
+        cursor = self._connection.execute(
+            f"SELECT line, oe, me, notes FROM lines WHERE {where} "
+            "ORDER BY line LIMIT ?",
+            (*params, limit),
+        )
+        return [self._record(row) for row in cursor]
+
+    def _record(self, row: Tuple[Any, ...]) -> Dict[str, Any]:
+        """Turn a lines row into a record like those in maintext.json."""
+        record = {"line": row[0], "OE": row[1], "ME": row[2]}
+        if self.has_notes:
+            record["notes"] = row[3]
+        return record
+
+    def line(self, number: int) -> Dict[str, Any]:
+        """
+        Fetch one line.
+
+        Args:
+            number: Line number
+
+        Returns:
+            Line data dictionary like those in maintext.json
+
+        Raises:
+            IndexError: If there is no such line
+        """
+        records = self._records("line = ?", number)
+        if not records:
+            raise IndexError(f"line {number} is not in the database")
+        return records[0]
+
+    def range(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """
+        Fetch a run of lines.
+
+        Args:
+            start: First line number, inclusive
+            stop: Last line number, exclusive
+
+        Returns:
+            Line data dictionaries in order
+        """
+        return self._records("line >= ? AND line < ?", start, stop)
+
+    def fitt(self, fitt_num: int) -> List[Dict[str, Any]]:
+        """
+        Fetch the lines of one fitt.
+
+        Args:
+            fitt_num: Index of the fitt in FITT_BOUNDARIES
+
+        Returns:
+            Line data dictionaries for the fitt
+
+        Raises:
+            IndexError: If there is no such fitt
+        """
+        records = self._records("fitt = ?", fitt_num)
+        if not records:
+            raise IndexError(f"fitt {fitt_num} is not in the database")
+        return records
+
+    def fitt_of(self, number: int) -> Optional[int]:
+        """
+        Find the fitt a line belongs to.
+
+        Args:
+            number: Line number
+
+        Returns:
+            The fitt's index in FITT_BOUNDARIES, or None for line 0
+
+        Raises:
+            IndexError: If there is no such line
+        """
+        row = self._connection.execute(
+            "SELECT fitt FROM lines WHERE line = ?", (number,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(f"line {number} is not in the database")
+        return row[0]
+
+    def fitts(self) -> List[Tuple[int, str, int, int]]:
+        """
+        List the fitts.
+
+        Returns:
+            (fitt, name, first line, last line) for each fitt in order
+        """
+        return list(self._connection.execute("SELECT * FROM fitts ORDER BY fitt"))
+
+    def markers(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        List the line number markers in a range of lines.
+
+        Args:
+            start: First line number, inclusive
+            stop: Last line number, exclusive; defaults to the end
+
+        Returns:
+            (line, printed number) pairs in line order
+        """
+        if stop is None:
+            cursor = self._connection.execute(
+                "SELECT line, number FROM markers WHERE line >= ? ORDER BY line",
+                (start,),
+            )
+        else:
+            cursor = self._connection.execute(
+                "SELECT line, number FROM markers WHERE line >= ? AND line < ? "
+                "ORDER BY line",
+                (start, stop),
+            )
+        return list(cursor)
+
+    def search(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Find lines whose OE or ME contains a phrase of whole words.
+
+        The phrase is folded like the search column, so accents, case and
+        punctuation do not matter.
+
+        Args:
+            text: Phrase to look for
+            limit: Most lines to return
+
+        Returns:
+            Matching line data dictionaries in line order
+        """
+        phrase = get_normalizer("match")(text)
+        if not phrase:
+            return []
+        if self.full_text:
+            where = "line IN (SELECT rowid FROM lines_fts WHERE lines_fts MATCH ?)"
+            query = '"' + phrase.replace('"', '""') + '"'
+        else:
+            where = "instr(' ' || search || ' ', ?) > 0"
+            query = f" {phrase} "
+        return self._records(where, query, limit=limit)
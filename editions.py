@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+The Old English editions in archive/data, loaded into line stores.
+
+Each edition file has one line per verse line, "N on-half     off-half",
+with the half-lines separated by five spaces. Like aligned.txt, the files
+mark words aligned as one unit with '_' and missing words with '@'; the
+loader turns the first into spaces and drops the second, so the text is
+the edition's own. Edition.words() still lists the joined units.
+
+Every edition becomes an Edition: a LineStore, the structure heorot.parse
+returns, with the whole line as its OE text (ME is empty), plus the
+caesura position of each line so the half-lines can be split out again.
+load_editions() reads the files in a process pool and keeps the result in
+the cache under a hash of the files.
+
+    corpus = load_editions()
+    corpus["ebeowulf"].line(3184)["OE"]
+    corpus.halves("perseus", 909)  # ('sē þe him bealwa tō', 'bōte gelȳfde,')
+"""
+
+import os
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from alignment import CAESURA, GAP, JOIN
+from linestore import LineRecord, LineStore, LineStoreBuilder, TextColumn
+from manifest import digest, file_digest
+from parse_cache import ParseCache
+from timing import stage
+
+# Bump when the loading rules change, so cached corpora are rebuilt
+EDITIONS_VERSION = "2"
+
+EDITION_WORKERS = int(os.environ.get("VOXBEOWULF_EDITION_WORKERS", "1"))
+
+EDITION_DIR = "archive/data"
+EDITION_NAMES = (
+    "heorot",
+    "mit",
+    "mcmaster",
+    "perseus",
+    "ebeowulf",
+    "oldenglishaerobics",
+)
+
+# Position entry for a line number the edition does not have
+NO_LINE = -1
+
+
+def edition_path(name: str) -> str:
+    """Path of an edition's text file."""
+    return os.path.join(EDITION_DIR, f"{name}.txt")
+
+
+def _drop_gaps(text: str) -> str:
+    """Drop a half-line's gaps, leaving single spaces between its words."""
+    return " ".join(word for word in text.split() if word != GAP)
+
+
+class Edition:
+    """One edition's lines, found by line number, with their caesuras."""
+
+    def __init__(
+        self, name: str, lines: LineStore, caesuras: array, units: TextColumn
+    ) -> None:
+        """
+        Index an edition's lines.
+
+        Args:
+            name: Edition name, e.g. 'perseus'
+            lines: The edition's lines, in line number order
+            caesuras: For each line, the length of its on-half in the OE text
+            units: For each line, the OE text with the edition's joins kept
+                as '_', which only ever stands where the text has a space
+        """
+        self.name = name
+        self.lines = lines
+        self.caesuras = caesuras
+        self.units = units
+        last = max(lines.numbers, default=-1)
+        self._positions = array("i", [NO_LINE]) * (last + 1)
+        for index, number in enumerate(lines.numbers):
+            self._positions[number] = index
+
+    def __reduce__(self) -> Tuple[type, Tuple[str, LineStore, array, TextColumn]]:
+        return (Edition, (self.name, self.lines, self.caesuras, self.units))
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __contains__(self, number: object) -> bool:
+        return self._index(number) != NO_LINE
+
+    def __repr__(self) -> str:
+        return f"<Edition {self.name}: {len(self)} lines>"
+
+    def _index(self, number: object) -> int:
+        """Position of a line number in the store, or NO_LINE."""
+        if not isinstance(number, int) or not 0 <= number < len(self._positions):
+            return NO_LINE
+        return self._positions[number]
+
+    def line(self, number: int) -> LineRecord:
+        """
+        Fetch one line.
+
+        Args:
+            number: Line number in the edition's numbering
+
+        Returns:
+            Read-only line record with 'line', 'OE' and 'ME' keys
+
+        Raises:
+            IndexError: If the edition has no such line
+        """
+        index = self._index(number)
+        if index == NO_LINE:
+            raise IndexError(f"{self.name} has no line {number}")
+        return self.lines[index]
+
+    def halves(self, number: int) -> Tuple[str, str]:
+        """
+        Split a line at its caesura.
+
+        Args:
+            number: Line number in the edition's numbering
+
+        Returns:
+            The on-half and off-half; either may be empty
+
+        Raises:
+            IndexError: If the edition has no such line
+        """
+        text = self.line(number)["OE"]
+        caesura = self.caesuras[self._index(number)]
+        return text[:caesura], text[caesura:].lstrip(" ")
+
+    def words(self, number: int) -> List[Tuple[str, int]]:
+        """
+        List a line's words as the edition divides them.
+
+        Args:
+            number: Line number in the edition's numbering
+
+        Returns:
+            (word, half-line) for each word, half-line 0 or 1; words the
+            edition joins into one unit stay together, as 'oð_þæt'
+
+        Raises:
+            IndexError: If the edition has no such line
+        """
+        index = self._index(number)
+        if index == NO_LINE:
+            raise IndexError(f"{self.name} has no line {number}")
+        units = self.units[index]
+        caesura = self.caesuras[index]
+        return [
+            (word, half)
+            for half, text in enumerate((units[:caesura], units[caesura:]))
+            for word in text.split()
+        ]
+
+
+def parse_edition(name: str, text: str) -> Edition:
+    """
+    Parse the text of an edition file.
+
+    Args:
+        name: Edition name
+        text: File contents, lines like '9 oð_þæt him ǣghwylc     ymbsittendra'
+
+    Returns:
+        The edition
+
+    Raises:
+        ValueError: If a line does not start with its number
+    """
+    builder = LineStoreBuilder()
+    caesuras = array("i")
+    units = []
+    for row in text.splitlines():
+        number, _, rest = row.partition(" ")
+        if not number.isdigit():
+            raise ValueError(f"{name}: line without a number: {row!r}")
+        on, _, off = rest.partition(CAESURA)
+        on, off = _drop_gaps(on), _drop_gaps(off)
+        line_units = f"{on} {off}".strip(" ")
+        builder.append(int(number), line_units.replace(JOIN, " "), "")
+        caesuras.append(len(on))
+        units.append(line_units)
+    return Edition(name, builder.build(), caesuras, TextColumn(units))
+
+
+def load_edition(name: str, path: Optional[str] = None) -> Edition:
+    """
+    Read and parse one edition file.
+
+    Args:
+        name: Edition name
+        path: File to read; defaults to the edition's file in EDITION_DIR
+
+    Returns:
+        The edition
+    """
+    with open(path or edition_path(name), "r", encoding="utf-8") as f:
+        return parse_edition(name, f.read())
+
+
+class EditionCorpus(Mapping):
+    """Editions by name, with lookups by edition and line number."""
+
+    def __init__(self, editions: Sequence[Edition]) -> None:
+        """
+        Collect loaded editions.
+
+        Args:
+            editions: The editions, in the order to list them
+        """
+        self._editions: Dict[str, Edition] = {
+            edition.name: edition for edition in editions
+        }
+
+    def __getitem__(self, name: str) -> Edition:
+        return self._editions[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._editions)
+
+    def __len__(self) -> int:
+        return len(self._editions)
+
+    def line(self, name: str, number: int) -> LineRecord:
+        """
+        Fetch one line of one edition.
+
+        Args:
+            name: Edition name
+            number: Line number in that edition's numbering
+
+        Returns:
+            Read-only line record
+
+        Raises:
+            KeyError: If there is no such edition
+            IndexError: If the edition has no such line
+        """
+        return self._editions[name].line(number)
+
+    def halves(self, name: str, number: int) -> Tuple[str, str]:
+        """
+        Split one line of one edition at its caesura.
+
+        Args:
+            name: Edition name
+            number: Line number in that edition's numbering
+
+        Returns:
+            The on-half and off-half
+
+        Raises:
+            KeyError: If there is no such edition
+            IndexError: If the edition has no such line
+        """
+        return self._editions[name].halves(number)
+
+
+def load_editions(
+    names: Sequence[str] = EDITION_NAMES,
+    workers: int = EDITION_WORKERS,
+    cache: Optional[ParseCache] = None,
+) -> EditionCorpus:
+    """
+    Load several editions at once, one per job in a process pool.
+
+    Args:
+        names: Editions to load from EDITION_DIR
+        workers: Number of processes to use; 0 means one per CPU
+        cache: Where to look up and store the corpus; None to always load
+
+    Returns:
+        The editions, in the order named
+    """
+    paths = [edition_path(name) for name in names]
+    key = digest(EDITIONS_VERSION, list(names), [file_digest(path) for path in paths])
+    if cache is not None:
+        cached = cache.get_entry("editions", key)
+        if cached is not None:
+            return EditionCorpus(cached)
+
+    processes = workers or os.cpu_count() or 1
+    with stage("load_editions", editions=len(names), workers=processes) as span:
+        if processes == 1 or len(names) < 2:
+            editions = [load_edition(name, path) for name, path in zip(names, paths)]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                editions = list(pool.map(load_edition, names, paths))
+        span.fields["lines"] = sum(map(len, editions))
+
+    if cache is not None:
+        cache.put_entry("editions", key, editions)
+    return EditionCorpus(editions)
@@ -6,19 +6,47 @@ This module handles fetching, parsing, and processing Beowulf text data
 from heorot.dk, including conversion to various formats (JSON, CSV, ASS subtitles).
 """
 
+import codecs
 import csv
+import importlib.util
+import itertools
 import json
 import logging
 import os
 import re
-from typing import Dict, List, Optional, Self, Tuple, TypedDict
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Self,
+    Sequence,
+    Tuple,
+    TypedDict,
+)
 
-import pysubs2
-import requests
 import structlog
-from bs4 import BeautifulSoup
 
-from numbering import FITT_BOUNDARIES, LINE_NUMBER_MARKERS
+from linestore import LineRecords, LineStore, LineStoreBuilder
+from normalize import clean_cell, collapse_whitespace
+from numbering import FITT_BOUNDARIES, FITT_INDEX, LINE_NUMBER_MARKERS
+from timing import Span, record_span, stage
+
+# bs4, requests and pysubs2 are slow to import, so each is imported inside
+# the functions that use it; the CLI only pays for the ones its command needs.
+# The build's outputs (corpus, database, search index, editions, manifest) and
+# the parse cache are imported the same way, by do_file and parse_cached
+if TYPE_CHECKING:
+    import requests
+
+    from manifest import BuildManifest
+    from parse_cache import ParseCache
 
 
 # Type definitions
@@ -31,6 +59,19 @@ class LineData(TypedDict):
     notes: Optional[str]
 
 
+# A parsed line: (line number, OE text, ME text, note text or None)
+Row = Tuple[int, str, str, Optional[str]]
+
+# A line as parsed from one table, before numbering: (OE, ME, note or None)
+TableRow = Tuple[str, str, Optional[str]]
+
+# A line as a parser backend finds it: (OE, ME, note or None, number of
+# text columns in its row)
+ParsedRow = Tuple[str, str, Optional[str], int]
+
+# A long row of a table: (index of its line in the table, number of columns)
+LongRow = Tuple[int, int]
+
 # Constants
 SECONDS_PER_LINE = 4
 
@@ -44,27 +85,66 @@ ASS_PARAMS = {
     "output_file": "data/subtitles/fitt_{fitt_id}.ass",
 }
 
-# Configure logging
-logging.basicConfig(
-    format="%(message)s",
-    level=logging.INFO,
-)
+# HTML parser backends, slowest to fastest; all produce identical lines
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+DEFAULT_PARSER_BACKEND = os.environ.get("VOXBEOWULF_PARSER", "html.parser")
 
-# Configure structlog
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.JSONRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+# Processes used by write_ass; 1 writes sequentially, 0 uses every CPU
+ASS_WORKERS = int(os.environ.get("VOXBEOWULF_ASS_WORKERS", "1"))
+
+# Processes used to parse tables; 1 parses sequentially, 0 uses every CPU
+PARSE_WORKERS = int(os.environ.get("VOXBEOWULF_PARSE_WORKERS", "1"))
+
+# HTTP fetch settings
+FETCH_TIMEOUT = 30  # seconds
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5  # seconds, doubled on each retry
+FETCH_CHUNK_SIZE = 64 * 1024
+
+# Bump whenever the parse rules change, so cached results are not reused
+PARSER_VERSION = "4"
 
 # Get a logger
 logger = structlog.get_logger()
 
+# Shared HTTP session, created by get_session()
+_session: Optional["requests.Session"] = None
+
+
+def _route_to_stdlib() -> None:
+    """Render structlog events as timestamped JSON lines for stdlib logging."""
+    structlog.configure(
+        processors=[
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(),
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Send structlog events to stdlib logging as timestamped JSON lines.
+
+    Args:
+        level: Minimum stdlib logging level to emit
+    """
+    logging.basicConfig(
+        format="%(message)s",
+        level=level,
+    )
+    _route_to_stdlib()
+
+
+# Until an application calls configure_logging, events go to stdlib logging
+# without a handler, so a library caller sees only warnings instead of
+# structlog's default of printing every debug event to stdout
+if not structlog.is_configured():
+    _route_to_stdlib()
+
 
 def normalize_text(text: str) -> str:
     """
@@ -76,25 +156,57 @@ def normalize_text(text: str) -> str:
     Returns:
         Normalized text with consistent spacing
     """
-    # Convert HTML entities to spaces (like &nbsp;)
-    text = text.replace("&nbsp;", " ")
+    return collapse_whitespace(text)
 
-    # Convert line breaks and other whitespace to single spaces
-    text = re.sub(r"\s+", " ", text)
 
-    # Remove leading/trailing whitespace
-    text = text.strip()
-
-    return text
+def get_session() -> "requests.Session":
+    """
+    Get the shared HTTP session, creating it on first use.
 
+    The session pools connections and retries transient failures with
+    exponential backoff.
 
-def fetch_and_store(url: str, filename: str) -> str:
+    Returns:
+        The module's requests session
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retries = Retry(
+            total=FETCH_RETRIES,
+            backoff_factor=FETCH_BACKOFF,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(max_retries=retries)
+        _session = requests.Session()
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+        _session.headers["Accept-Encoding"] = "gzip, deflate"
+    return _session
+
+
+def fetch_and_store(
+    url: str,
+    filename: str,
+    refresh: bool = False,
+    session: Optional["requests.Session"] = None,
+) -> str:
     """
     Fetch HTML content from URL and store locally if not already present.
 
+    With refresh, a stored copy is revalidated with If-None-Match and
+    If-Modified-Since from its metadata file, and only replaced when the
+    server sends a new version.
+
     Args:
         url: The URL to fetch content from
         filename: Local file path to store the content
+        refresh: Check the server for a newer version of a stored copy
+        session: HTTP session to use; defaults to get_session()
 
     Returns:
         The HTML content as a string
@@ -102,37 +214,464 @@ def fetch_and_store(url: str, filename: str) -> str:
     Raises:
         requests.RequestException: If the HTTP request fails
     """
-    if not os.path.exists(filename):
-        logger.warning("Fetching HTML from heorot.dk")
-        response = requests.get(url)
-        response.raise_for_status()  # Ensure we got a valid response
-
-        with open(filename, "w", encoding="utf-8") as file:
-            file.write(response.text)
-            return response.text
-    else:
+    if os.path.exists(filename) and not refresh:
         logger.warning("HTML is already stored locally, skipping HTTP fetch")
         with open(filename, "r", encoding="utf-8") as file:
             return file.read()
 
+    if session is None:
+        session = get_session()
+
+    headers = {}
+    meta = _load_fetch_meta(filename) if os.path.exists(filename) else {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    logger.warning("Fetching HTML from heorot.dk", url=url, conditional=bool(headers))
+    with session.get(
+        url, headers=headers, stream=True, timeout=FETCH_TIMEOUT
+    ) as response:
+        if response.status_code == 304:
+            logger.info("HTML not modified upstream, keeping stored copy", url=url)
+            with open(filename, "r", encoding="utf-8") as file:
+                return file.read()
+        response.raise_for_status()  # Ensure we got a valid response
+
+        html = _stream_to_file(response, filename)
+        _save_fetch_meta(
+            filename,
+            {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            },
+        )
+    return html
+
 
-def parse(html: str) -> List[Dict[str, str]]:
+def _stream_to_file(response: "requests.Response", filename: str) -> str:
+    """
+    Stream a response body to a temporary file and move it into place.
+
+    Args:
+        response: Streaming response with a successful status
+        filename: Final path of the stored content
+
+    Returns:
+        The decoded content as a string
+    """
+    directory = os.path.dirname(filename) or "."
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            # iter_content undoes any gzip or deflate transfer encoding
+            for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+                file.write(chunk)
+
+        encoding = response.encoding or "utf-8"
+        with open(temp_path, "rb") as file:
+            html = file.read().decode(encoding)
+        # Stored copies are always UTF-8, whatever the server sent
+        if codecs.lookup(encoding).name != "utf-8":
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(html)
+
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return html
+
+
+def _load_fetch_meta(filename: str) -> Dict[str, Optional[str]]:
+    """
+    Read the HTTP validators stored alongside a fetched file.
+
+    Args:
+        filename: Path of the fetched file
+
+    Returns:
+        The stored metadata, or an empty dict if there is none
+    """
+    try:
+        with open(f"{filename}.meta.json", "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_fetch_meta(filename: str, meta: Dict[str, Optional[str]]) -> None:
+    """
+    Store the HTTP validators for a fetched file.
+
+    Args:
+        filename: Path of the fetched file
+        meta: URL, ETag and Last-Modified of the response
+    """
+    with open(f"{filename}.meta.json", "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=4)
+
+
+def available_backends() -> List[str]:
+    """
+    List the parser backends that can run in this environment.
+
+    Returns:
+        Names from PARSER_BACKENDS whose libraries are installed
+    """
+    backends = ["html.parser"]
+    if importlib.util.find_spec("lxml") is not None:
+        backends.append("lxml")
+    if importlib.util.find_spec("selectolax") is not None:
+        backends.append("selectolax")
+    return backends
+
+
+def parse(
+    html: str, backend: str = DEFAULT_PARSER_BACKEND, notes: bool = True
+) -> LineStore:
     """
     Parse HTML content and extract Beowulf text lines.
 
+    Every backend walks the same rows with the same rules and produces
+    identical lines; they differ only in speed.
+
     Args:
         html: HTML content to parse
+        backend: One of PARSER_BACKENDS
+        notes: Capture each row's editorial note references; without them
+            the lines have no 'notes' key
 
     Returns:
-        List of dictionaries containing line data with 'line', 'OE', and 'ME' keys
+        LineStore of the parsed lines, whose records have 'line', 'OE', 'ME'
+        and, with notes, 'notes' keys
+
+    Raises:
+        ValueError: If the backend is unknown
     """
-    current_line_number = 0
-    soup = BeautifulSoup(html, "html.parser")
+    lines = LineStoreBuilder(with_notes=notes)
+    for number, oe, me, note in _iter_rows(html, backend, notes):
+        lines.append(number, oe, me, note)
+    return lines.build()
 
-    # Extract table or divs containing the two columns
-    # Use natural 1-based numbering in the array of lines, to make lining up with the original text easier
-    lines = [{"line": 0, "OE": "", "ME": ""}]
 
+def parse_stream(
+    html: str, backend: str = DEFAULT_PARSER_BACKEND, notes: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parse HTML content, yielding each line as its table row is processed.
+
+    Yields the same records, in the same order, as iterating over parse(),
+    without holding them all; feed them to the sinks in streaming.py.
+
+    Args:
+        html: HTML content to parse
+        backend: One of PARSER_BACKENDS
+        notes: Capture each row's editorial note references
+
+    Yields:
+        Line data dictionaries with 'line', 'OE', 'ME' and, with notes,
+        'notes' keys
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    for number, oe, me, note in _iter_rows(html, backend, notes):
+        if notes:
+            yield {"line": number, "OE": oe, "ME": me, "notes": note}
+        else:
+            yield {"line": number, "OE": oe, "ME": me}
+
+
+def _iter_rows(html: str, backend: str, notes: bool) -> Iterator[Row]:
+    """
+    Parse the document one table at a time, starting with the empty line 0.
+
+    Only one table's markup and parse tree are held at once, and each
+    table's rows are yielded before the next table is parsed.
+
+    Args:
+        html: HTML content to parse
+        backend: One of PARSER_BACKENDS
+        notes: Capture note text; otherwise every row's note is None
+
+    Yields:
+        (line number, OE text, ME text, note text) for each line
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+
+    # Use natural 1-based numbering in the array of lines, to make lining up
+    # with the original text easier
+    yield 0, "", "", None
+    number = 1
+    for table in iter_tables(html):
+        for oe, me, note in parse_table(table, backend, notes, first_line=number):
+            yield number, oe, me, note
+            number += 1
+
+
+def _parse_markup(html: str, backend: str, notes: bool) -> Iterator[ParsedRow]:
+    """
+    Run a parser backend over a document or a single table.
+
+    Args:
+        html: HTML content to parse
+        backend: One of PARSER_BACKENDS
+        notes: Capture note text; otherwise every row's note is None
+
+    Yields:
+        (OE text, ME text, note text, column count) for each line, in order
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == "selectolax":
+        return _parse_selectolax(html, notes)
+    if backend in ("html.parser", "lxml"):
+        return _parse_soup(html, backend, notes)
+    raise ValueError(f"Unknown parser backend: {backend}")
+
+
+# Opening and closing table tags, and the class attribute of an opening tag
+TABLE_TAG = re.compile(r"<(/?)table\b[^>]*>", re.IGNORECASE)
+CLASS_ATTR = re.compile(
+    r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE
+)
+
+
+def iter_tables(html: str) -> Iterator[str]:
+    """
+    Cut the source of every top-level table.c15 out of the HTML, in order.
+
+    Every line of the poem comes from one of these tables, and each table
+    parses on its own exactly as it does inside the whole document, so the
+    pieces can be fingerprinted, cached or parsed independently.
+
+    Args:
+        html: HTML content to split
+
+    Yields:
+        The markup of each table.c15, nested tables included
+    """
+    depth = 0
+    start = 0
+    wanted = False
+    for tag in TABLE_TAG.finditer(html):
+        if not tag.group(1):
+            if depth == 0:
+                start = tag.start()
+                classes = CLASS_ATTR.search(tag.group(0))
+                wanted = (
+                    classes is not None
+                    and "c15"
+                    in "".join(value or "" for value in classes.groups()).split()
+                )
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0 and wanted:
+                yield html[start : tag.end()]
+
+
+def split_tables(html: str) -> List[str]:
+    """
+    List the source of every top-level table.c15 in the HTML.
+
+    Args:
+        html: HTML content to split
+
+    Returns:
+        The markup of each table.c15, nested tables included, in order
+    """
+    return list(iter_tables(html))
+
+
+def _parse_table(
+    table: str, backend: str, notes: bool
+) -> Tuple[List[TableRow], List[LongRow]]:
+    """
+    Parse one table without logging, so it can run in a worker process.
+
+    A table does not know where it starts in the poem, so its long rows
+    are returned for the caller to log once the lines are numbered.
+
+    Args:
+        table: Markup of a single table.c15
+        backend: One of PARSER_BACKENDS
+        notes: Capture each row's editorial note references
+
+    Returns:
+        (OE, ME, note) for each line of the table, and the long rows
+    """
+    rows: List[TableRow] = []
+    long_rows: List[LongRow] = []
+    for oe, me, note, columns in _parse_markup(table, backend, notes):
+        if columns > 2:
+            long_rows.append((len(rows), columns))
+        rows.append((oe, me, note))
+    return rows, long_rows
+
+
+def _log_long_rows(first_line: int, long_rows: Iterable[LongRow]) -> None:
+    """Log a table's rows with more than two text columns by poem line."""
+    for index, columns in long_rows:
+        logger.debug("long row found", line=first_line + index, cols=columns)
+
+
+def parse_table(
+    table: str,
+    backend: str = DEFAULT_PARSER_BACKEND,
+    notes: bool = True,
+    first_line: int = 1,
+) -> List[TableRow]:
+    """
+    Parse the lines of one table from split_tables.
+
+    Args:
+        table: Markup of a single table.c15
+        backend: One of PARSER_BACKENDS
+        notes: Capture each row's editorial note references
+        first_line: Line number of the table's first line, for the log
+
+    Returns:
+        (OE, ME, note) for each line of the table, in order
+    """
+    rows, long_rows = _parse_table(table, backend, notes)
+    _log_long_rows(first_line, long_rows)
+    return rows
+
+
+def parse_tables(
+    tables: Sequence[str],
+    backend: str = DEFAULT_PARSER_BACKEND,
+    notes: bool = True,
+    workers: int = PARSE_WORKERS,
+    first_line: int = 1,
+) -> List[List[TableRow]]:
+    """
+    Parse several tables from split_tables, optionally in a process pool.
+
+    Args:
+        tables: Markup of each table.c15, consecutive in the document
+        backend: One of PARSER_BACKENDS
+        notes: Capture each row's editorial note references
+        workers: Number of processes to use; 0 means one per CPU
+        first_line: Line number of the first table's first line, for the log
+
+    Returns:
+        The rows of each table, in the order of the tables
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+
+    processes = workers or os.cpu_count() or 1
+    if processes == 1 or len(tables) < 2:
+        parsed = []
+        for table in tables:
+            parsed.append(parse_table(table, backend, notes, first_line))
+            first_line += len(parsed[-1])
+        return parsed
+
+    # a few chunks per process evens out tables of different lengths
+    chunksize = max(1, len(tables) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = list(
+            pool.map(
+                _parse_table,
+                tables,
+                itertools.repeat(backend),
+                itertools.repeat(notes),
+                chunksize=chunksize,
+            )
+        )
+    # the workers cannot number their lines, so their long rows are logged
+    # here once each table's first line is known
+    for rows, long_rows in results:
+        _log_long_rows(first_line, long_rows)
+        first_line += len(rows)
+    return [rows for rows, _ in results]
+
+
+def parse_parallel(
+    html: str,
+    backend: str = DEFAULT_PARSER_BACKEND,
+    notes: bool = True,
+    workers: int = PARSE_WORKERS,
+) -> LineStore:
+    """
+    Parse HTML content table by table across a process pool.
+
+    Each table.c15 is parsed on its own, which keeps the rule that a row
+    repeating the previous row's OE text is dropped, since that state never
+    crosses a table. The tables' rows are then numbered in order, so the
+    result is identical to parse().
+
+    Args:
+        html: HTML content to parse
+        backend: One of PARSER_BACKENDS
+        notes: Capture each row's editorial note references
+        workers: Number of processes to use; 0 means one per CPU
+
+    Returns:
+        LineStore of the parsed lines
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    lines = LineStoreBuilder(with_notes=notes)
+    lines.append(0, "", "", None)
+    number = 1
+    for rows in parse_tables(split_tables(html), backend, notes, workers):
+        for oe, me, note in rows:
+            lines.append(number, oe, me, note)
+            number += 1
+    return lines.build()
+
+
+def _clean_note(raw: str) -> str:
+    """
+    Normalize the text of one editorial note reference.
+
+    Args:
+        raw: Text content of the note's div, e.g. '**26-52**'
+
+    Returns:
+        The referenced line range without its asterisks, e.g. '26-52'
+    """
+    return collapse_whitespace(raw).strip("* ")
+
+
+def _join_notes(texts: List[str]) -> Optional[str]:
+    """Combine the notes found in one row, or None if there were none."""
+    return "; ".join(texts) if texts else None
+
+
+def _parse_soup(html: str, features: str, notes: bool) -> Iterator[ParsedRow]:
+    """
+    Parse the Heorot HTML with BeautifulSoup.
+
+    Args:
+        html: HTML content to parse
+        features: BeautifulSoup tree builder, 'html.parser' or 'lxml'
+        notes: Capture note text before removing the note divs
+
+    Yields:
+        (OE text, ME text, note text, column count) for each line, in order
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, features)
+
+    # Extract table or divs containing the two columns
     tables = soup.find_all("table", class_="c15")
 
     if len(tables) > 0:
@@ -141,25 +680,29 @@ def parse(html: str) -> List[Dict[str, str]]:
             last_oe = None
 
             for row in table_rows:
-                note_divs = row.find_all("div")
-                if len(note_divs) > 0:
-                    for note_div in note_divs:
-                        if note_div.get("class") != [
-                            "c35"
-                        ]:  # malformation at line 1066 of the Heorot HTML
-                            note_div.decompose()
-
-                # Find all span elements with class 'c7' in this row
+                # A stray <tbody> in the first row of the Heorot HTML leaves
+                # html.parser with a row wrapping the whole table; its own
+                # rows carry the text and the notes
+                first_span = row.find("span", class_="c7")
+                if first_span is not None and first_span.find_parent("tr") is not row:
+                    continue
+
+                row_notes = []
+                for note_div in row.find_all("div"):
+                    if note_div.decomposed:
+                        continue  # nested in a note removed just before
+                    if note_div.get("class") != [
+                        "c35"
+                    ]:  # malformation at line 1066 of the Heorot HTML
+                        if notes:
+                            row_notes.append(_clean_note(note_div.get_text()))
+                        note_div.decompose()
+
+                # Find all span elements with class 'c7' in this row; some
+                # note divs wrap a span, so only look once they are gone
                 columns = row.find_all("span", class_="c7")
 
                 if len(columns) >= 2:
-                    if len(columns) > 2:
-                        logger.debug(
-                            "long row found",
-                            line=current_line_number + 1,
-                            cols=len(columns),
-                        )
-
                     # Take the first and last span with class 'c7' to ensure we get OE and ME
                     # The middle column might have different structure
                     oe_text = columns[0]
@@ -176,158 +719,646 @@ def parse(html: str) -> List[Dict[str, str]]:
                     for tag in me_text.find_all("a"):
                         tag.unwrap()
 
-                    current_line_number += 1
+                    yield (
+                        clean_cell(oe_text.get_text(strip=False)),
+                        clean_cell(me_text.get_text(strip=False)),
+                        _join_notes(row_notes),
+                        len(columns),
+                    )
 
-                    # Get raw text and normalize it
-                    oe_raw = oe_text.get_text(strip=False)
-                    me_raw = me_text.get_text(strip=False)
 
-                    # Normalize the text to handle line breaks and whitespace
-                    oe_normalized = normalize_text(oe_raw)
-                    me_normalized = normalize_text(me_raw)
+def _parse_selectolax(html: str, notes: bool) -> Iterator[ParsedRow]:
+    """
+    Parse the Heorot HTML with selectolax's lexbor engine.
 
-                    # Handle the special case of '--' which should be preserved as a single space
-                    oe_final = oe_normalized.replace("--", " ")
-                    me_final = me_normalized.replace("--", " ")
+    Mirrors _parse_soup rule for rule; spans are compared by their markup
+    since lexbor nodes have no structural equality.
 
-                    lines.append(
-                        {"line": current_line_number, "OE": oe_final, "ME": me_final}
-                    )
+    Args:
+        html: HTML content to parse
+        notes: Capture note text before removing the note divs
+
+    Yields:
+        (OE text, ME text, note text, column count) for each line, in order
+    """
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+
+    for table in tree.css("table.c15"):
+        last_oe = None
+
+        for row in table.css("tr"):
+            first_span = row.css_first("span.c7")
+            if first_span is not None:
+                parent_row = first_span.parent
+                while parent_row is not None and parent_row.tag != "tr":
+                    parent_row = parent_row.parent
+                if parent_row is None or parent_row.mem_id != row.mem_id:
+                    continue
+
+            row_notes = []
+            for note_div in row.css("div"):
+                if note_div.attributes.get("class") != "c35":
+                    if notes:
+                        row_notes.append(_clean_note(note_div.text(deep=True)))
+                    note_div.decompose()
+
+            columns = row.css("span.c7")
+            if len(columns) < 2:
+                continue
+
+            oe_text = columns[0]
+            me_text = columns[-1]
+
+            if oe_text.html == last_oe:  # skip dupes
+                continue
+
+            for tag in oe_text.css("a"):
+                tag.unwrap()
+            for tag in me_text.css("a"):
+                tag.unwrap()
+            last_oe = oe_text.html
+
+            yield (
+                clean_cell(oe_text.text(deep=True)),
+                clean_cell(me_text.text(deep=True)),
+                _join_notes(row_notes),
+                len(columns),
+            )
+
+
+def parse_cached(
+    html: str,
+    backend: str = DEFAULT_PARSER_BACKEND,
+    cache: Optional["ParseCache"] = None,
+    notes: bool = True,
+    workers: int = PARSE_WORKERS,
+) -> LineStore:
+    """
+    Parse HTML content, reusing an earlier result for identical input.
+
+    On a cache miss only the tables that changed since the last parse are
+    parsed again, using the table snapshot kept beside the cache entries.
+
+    Args:
+        html: HTML content to parse
+        backend: One of PARSER_BACKENDS, used only on a cache miss
+        cache: Cache to consult; defaults to one in data/cache
+        notes: Capture editorial note references, as for parse()
+        workers: Processes used to parse the tables; 0 means one per CPU
 
+    Returns:
+        LineStore of the parsed lines
+    """
+    from incremental import parse_incremental
+    from parse_cache import ParseCache
+
+    if cache is None:
+        cache = ParseCache()
+
+    # results with and without notes are cached separately
+    stamp = PARSER_VERSION if notes else f"{PARSER_VERSION}-nonotes"
+    lines = cache.get(html, stamp)
+    if lines is None:
+        snapshot_path = os.path.join(cache.directory, f"tables-{stamp}.snapshot")
+        lines, diff = parse_incremental(html, snapshot_path, backend, notes, workers)
+        if diff is not None:
+            logger.info(
+                "upstream HTML changed",
+                changed_lines=len(diff.changes),
+                fitts=diff.fitts,
+            )
+        cache.put(html, stamp, lines)
     return lines
 
 
-def get_fitt(fitt_num: int, lines: List[Dict[str, str]]) -> List[Dict[str, str]]:
+def compare_backends(html: str) -> Dict[str, float]:
     """
-    Extract lines for a specific fitt.
+    Time every available backend and check that they agree.
 
     Args:
-        fitt_num: The fitt number to extract
-        lines: List of all line data
+        html: HTML content to parse
 
     Returns:
-        List of line data for the specified fitt
+        Seconds taken by each backend, keyed by backend name
+
+    Raises:
+        ValueError: If any backend's lines differ from html.parser's
     """
-    start = FITT_BOUNDARIES[fitt_num][0]
-    end = FITT_BOUNDARIES[fitt_num][1] + 1
-    return lines[start:end]
+    timings = {}
+    reference = None
+    for backend in available_backends():
+        started = time.perf_counter()
+        lines = parse(html, backend)
+        timings[backend] = time.perf_counter() - started
+
+        if reference is None:
+            reference = lines
+        elif lines != reference:
+            mismatches = [
+                left["line"] for left, right in zip(reference, lines) if left != right
+            ]
+            raise ValueError(
+                f"Backend {backend} disagrees with html.parser "
+                f"({len(lines)} vs {len(reference)} lines, "
+                f"first mismatches: {mismatches[:10]})"
+            )
+        logger.info(
+            "timed parser backend",
+            backend=backend,
+            seconds=round(timings[backend], 3),
+            linecount=len(lines),
+        )
+    return timings
+
+
+def get_fitt(fitt_num: int, lines: LineRecords) -> LineRecords:
+    """
+    Extract lines for a specific fitt.
+
+    Args:
+        fitt_num: The fitt number to extract
+        lines: Every line, numbered from 0, such as the LineStore from parse()
 
+    Returns:
+        The fitt's lines; a LineView of the store when lines is a LineStore
 
-def do_file(filestem: str, url: str) -> None:
+    Raises:
+        IndexError: If there is no such fitt
+    """
+    fitt = FITT_INDEX.lines_of(fitt_num)
+    return lines[fitt.start : fitt.stop]
+
+
+def _fitt_bounds(fitt_id: int) -> Tuple[int, int, str]:
+    """A fitt's (start_line, end_line, fitt_name), from FITT_INDEX."""
+    fitt = FITT_INDEX.lines_of(fitt_id)
+    return fitt.start, fitt.stop - 1, FITT_INDEX.name_of(fitt_id)
+
+
+def do_file(
+    filestem: str,
+    url: str,
+    backend: str = DEFAULT_PARSER_BACKEND,
+    use_cache: bool = True,
+    force: bool = False,
+    refresh: bool = False,
+    notes: bool = True,
+    workers: int = PARSE_WORKERS,
+    sqlite: bool = False,
+) -> "BuildManifest":
     """
     Process a file by fetching, parsing, and saving in multiple formats.
 
+    The parsed lines are validated before anything is written. Outputs
+    whose inputs are unchanged since the last build, according to
+    data/fitts/<filestem>.manifest.json, are skipped. When the editions in
+    archive/data are present, a search index that includes them is written
+    to data/fitts/<filestem>.editions.search.
+
     Args:
         filestem: Base name for output files
         url: URL to fetch HTML content from
+        backend: HTML parser backend, one of PARSER_BACKENDS
+        use_cache: Reuse the parse result for unchanged HTML from data/cache
+        force: Rebuild every output regardless of the manifest
+        refresh: Check the server for a newer version of the stored HTML
+        notes: Include editorial note references in the line outputs
+        workers: Processes used to parse the HTML; 0 means one per CPU
+        sqlite: Also write the lines, fitts and markers to
+            data/fitts/<filestem>.sqlite
+
+    Returns:
+        The saved build manifest, listing the built and skipped outputs
+
+    Raises:
+        ValidationError: If the parsed lines break an integrity rule
     """
-    html = fetch_and_store(url, f"data/fitts/{filestem}.html")
-    parsed_lines = parse(html)
+    from corpus import write_corpus
+    from database import SCHEMA_VERSION as DATABASE_SCHEMA
+    from database import write_database
+    from editions import (
+        EDITION_DIR,
+        EDITION_NAMES,
+        EDITIONS_VERSION,
+        edition_path,
+        load_editions,
+    )
+    from manifest import BuildManifest, digest, file_digest
+    from parse_cache import ParseCache
+    from search import SEARCH_VERSION, SearchIndex
+    from validation import check as check_lines
+
+    with stage("fetch", refresh=refresh) as span:
+        html = fetch_and_store(url, f"data/fitts/{filestem}.html", refresh=refresh)
+        span.fields["chars"] = len(html)
+
+    with stage("parse", backend=backend, cached=use_cache, workers=workers) as span:
+        if use_cache:
+            parsed_lines = parse_cached(html, backend, notes=notes, workers=workers)
+        elif workers != 1:
+            parsed_lines = parse_parallel(html, backend, notes, workers)
+        else:
+            parsed_lines = parse(html, backend, notes)
+        span.fields["lines"] = len(parsed_lines)
+    check_lines(parsed_lines)
     logger.info(
-        "parsed the file", filestem=filestem, url=url, linecount=len(parsed_lines)
+        "parsed the file",
+        filestem=filestem,
+        url=url,
+        backend=backend,
+        linecount=len(parsed_lines),
     )
 
-    # Save to JSON file
-    with open(f"data/fitts/{filestem}.json", "w", encoding="utf-8") as json_file:
-        json.dump(parsed_lines, json_file, indent=4, ensure_ascii=False)
+    manifest = BuildManifest.load(f"data/fitts/{filestem}.manifest.json")
+    if force:
+        manifest.clear()
+    manifest.inputs = build_inputs(html)
+
+    lines_digest = digest(PARSER_VERSION, parsed_lines)
+
+    json_path = f"data/fitts/{filestem}.json"
+    if manifest.needs_build(json_path, lines_digest):
+        with stage("write_json", lines=len(parsed_lines)):
+            write_json(parsed_lines, json_path)
+        manifest.record(json_path, lines_digest)
+
+    csv_path = f"data/fitts/{filestem}.csv"
+    if manifest.needs_build(csv_path, lines_digest):
+        with stage("write_csv", lines=len(parsed_lines)):
+            write_csv(parsed_lines, csv_path)
+        manifest.record(csv_path, lines_digest)
+
+    corpus_path = f"data/fitts/{filestem}.corpus"
+    if manifest.needs_build(corpus_path, lines_digest):
+        with stage("write_corpus", lines=len(parsed_lines)):
+            write_corpus(parsed_lines, corpus_path)
+        manifest.record(corpus_path, lines_digest)
+
+    search_path = f"data/fitts/{filestem}.search"
+    search_digest = digest(lines_digest, SEARCH_VERSION)
+    if manifest.needs_build(search_path, search_digest):
+        with stage("write_search", lines=len(parsed_lines)) as span:
+            index = SearchIndex.build(parsed_lines)
+            index.save(search_path)
+            span.fields["trigrams"] = len(index.trigrams)
+        manifest.record(search_path, search_digest)
+
+    if os.path.isdir(EDITION_DIR):
+        editions_search_path = f"data/fitts/{filestem}.editions.search"
+        editions_search_digest = digest(
+            search_digest,
+            EDITIONS_VERSION,
+            [file_digest(edition_path(name)) for name in EDITION_NAMES],
+        )
+        if manifest.needs_build(editions_search_path, editions_search_digest):
+            with stage("write_editions_search", lines=len(parsed_lines)) as span:
+                editions = load_editions(cache=ParseCache() if use_cache else None)
+                index = SearchIndex.build(parsed_lines, editions)
+                index.save(editions_search_path)
+                span.fields["trigrams"] = len(index.trigrams)
+            manifest.record(editions_search_path, editions_search_digest)
+
+    if sqlite:
+        database_path = f"data/fitts/{filestem}.sqlite"
+        database_digest = digest(
+            lines_digest, DATABASE_SCHEMA, FITT_BOUNDARIES, LINE_NUMBER_MARKERS
+        )
+        if manifest.needs_build(database_path, database_digest):
+            with stage("write_database", lines=len(parsed_lines)) as span:
+                span.fields["full_text"] = write_database(parsed_lines, database_path)
+            manifest.record(database_path, database_digest)
+
+    template_digest = file_digest(ASS_PARAMS["blank_template"])
+    fitt_digests = {
+        fitt_id: fitt_input_digest(fitt_id, parsed_lines, template_digest)
+        for fitt_id in FITT_INDEX.fitt_ids
+    }
+    stale_fitts = [
+        fitt_id
+        for fitt_id, fitt_digest in fitt_digests.items()
+        if manifest.needs_build(
+            ASS_PARAMS["output_file"].format(fitt_id=fitt_id), fitt_digest
+        )
+    ]
+    with stage("write_ass", fitts=len(stale_fitts)):
+        write_ass(parsed_lines, fitt_ids=stale_fitts)
+    for fitt_id in stale_fitts:
+        manifest.record(
+            ASS_PARAMS["output_file"].format(fitt_id=fitt_id), fitt_digests[fitt_id]
+        )
 
-    with open(f"data/fitts/{filestem}.csv", mode="w", newline="") as file:
-        fieldnames = parsed_lines[0].keys()
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(parsed_lines)
+    manifest.save()
+    logger.info(
+        "build complete",
+        filestem=filestem,
+        built=manifest.built,
+        skipped=manifest.skipped,
+    )
+    return manifest
 
-    write_ass(parsed_lines)
 
+def build_inputs(html: str) -> Dict[str, Optional[str]]:
+    """
+    Digest each upstream input of a build, for the manifest.
+
+    Args:
+        html: HTML content the build parsed
 
-def write_ass(lines: List[Dict[str, str]]) -> None:
+    Returns:
+        Digests keyed by input name
     """
-    Generate ASS subtitle files for each fitt.
+    from manifest import digest, file_digest
+
+    return {
+        "html": digest(html),
+        "parser_version": PARSER_VERSION,
+        "fitt_boundaries": digest(FITT_BOUNDARIES),
+        "line_number_markers": digest(sorted(LINE_NUMBER_MARKERS.items())),
+        "blank_template": file_digest(ASS_PARAMS["blank_template"]),
+        "ass_params": digest(ASS_PARAMS, SECONDS_PER_LINE),
+    }
+
+
+def fitt_input_digest(
+    fitt_id: int, lines: LineRecords, template_digest: Optional[str]
+) -> str:
+    """
+    Digest everything one fitt's subtitle file is built from.
+
+    Only the fitt's own lines, boundaries and markers are included, so an
+    upstream change rebuilds just the fitts it touches.
+
+    Args:
+        fitt_id: Index of the fitt in FITT_BOUNDARIES
+        lines: Every line, such as the LineStore from parse()
+        template_digest: Digest of the blank ASS template file
+
+    Returns:
+        Hex digest of the fitt's inputs
+    """
+    from manifest import digest
+
+    fitt = get_fitt(fitt_id, lines)
+    markers = [LINE_NUMBER_MARKERS.get(line["line"]) for line in fitt]
+    return digest(
+        _fitt_bounds(fitt_id),
+        fitt,
+        markers,
+        template_digest,
+        ASS_PARAMS,
+        SECONDS_PER_LINE,
+    )
+
+
+def write_json(lines: LineRecords, path: str) -> None:
+    """
+    Save line data as an indented JSON array.
 
     Args:
-        lines: List of all line data
+        lines: Every line, such as the LineStore from parse()
+        path: Output file path
     """
-    for fitt_id, fitt_bounds in enumerate(FITT_BOUNDARIES):
-        logger.info(
-            "Writing .ass file for fitt", fitt_id=fitt_id, fitt_bounds=fitt_bounds
+    with open(path, "w", encoding="utf-8") as json_file:
+        json.dump(
+            [dict(line) for line in lines], json_file, indent=4, ensure_ascii=False
         )
-        if fitt_id == 24:
-            continue  # there's no 24 in Beowulf
-
-        fitt = get_fitt(fitt_id, lines)
-
-        # init our subtitle file based on the blank template
-        subs = pysubs2.load(ASS_PARAMS["blank_template"], encoding="UTF-8")
-        subs.clear()
-        subs.info["Fitt"] = str(fitt_id)
-        subs.info["First Line"] = fitt[0]["line"]
-        subs.info["Last Line"] = fitt[-1]["line"]
-
-        line_number = -1
-        start_time = 0
-        end_time = start_time + SECONDS_PER_LINE
-        subtitle = None
-
-        for line in fitt:
-            # Old English
-            subs.append(make_sub(line["OE"], start_time, end_time, "original_style"))
-            subs.append(make_sub(line["ME"], start_time, end_time, "modern_style"))
-            subs.append(
-                make_sub(line["line"], start_time, end_time, "all_number_style")
-            )
-            try:
-                if LINE_NUMBER_MARKERS[line["line"]]:
-                    subs.append(
-                        make_sub(
-                            LINE_NUMBER_MARKERS[line["line"]],
-                            start_time,
-                            end_time,
-                            "big_number_style",
-                        )
-                    )
-            except KeyError:
-                pass  # no big number for this line
 
-            if line["line"] == fitt_bounds[0]:
-                subs.append(
-                    make_sub(fitt_bounds[2], start_time, end_time, "fitt_heading_style")
-                )
 
-            # increment for next subtitle
-            start_time += SECONDS_PER_LINE
-            end_time += SECONDS_PER_LINE
-        subs.save(ASS_PARAMS["output_file"].format(fitt_id=fitt_id), encoding="UTF-8")
+def write_csv(lines: LineRecords, path: str) -> None:
+    """
+    Save line data as CSV with a header row.
+
+    Args:
+        lines: Every line, such as the LineStore from parse()
+        path: Output file path
+    """
+    with open(path, mode="w", newline="") as file:
+        fieldnames = lines[0].keys()
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(lines)
+
+
+def write_ass(
+    lines: LineRecords,
+    workers: int = ASS_WORKERS,
+    output_file: Optional[str] = None,
+    fitt_ids: Optional[Iterable[int]] = None,
+) -> None:
+    """
+    Generate ASS subtitle files for each fitt.
 
+    The blank template is parsed once and shared; with more than one worker
+    the fitts are spread across a process pool. Output is byte-identical
+    either way.
 
-def make_sub(
-    text: str, start_time: float, end_time: float, style: str
-) -> pysubs2.SSAEvent:
+    Args:
+        lines: Every line, such as the LineStore from parse()
+        workers: Number of processes to use; 0 means one per CPU
+        output_file: Path template with a {fitt_id} field; defaults to
+            ASS_PARAMS["output_file"]
+        fitt_ids: Fitts to write; defaults to all of them
+    """
+    if output_file is None:
+        output_file = ASS_PARAMS["output_file"]
+    if fitt_ids is None:
+        fitt_ids = FITT_INDEX.fitt_ids
+
+    jobs = [
+        (fitt_id, _fitt_bounds(fitt_id), get_fitt(fitt_id, lines), output_file)
+        for fitt_id in fitt_ids
+        if fitt_id in FITT_INDEX
+    ]
+    if not jobs:
+        return
+
+    header = load_ass_header()
+
+    if workers == 1:
+        for job in jobs:
+            with stage("ass_fitt", fitt_id=job[0], lines=len(job[2])) as span:
+                span.fields["events"] = write_fitt_ass(header, *job)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers or None,
+        initializer=_init_ass_worker,
+        initargs=(header,),
+    ) as pool:
+        # consuming the results also raises any worker exception here
+        for span in pool.map(_write_fitt_ass_job, jobs):
+            record_span(span)
+
+
+def load_ass_header(template_file: Optional[str] = None) -> Tuple[str, str]:
     """
-    Create a subtitle event.
+    Render the blank template's sections that precede the events.
+
+    The template goes through pysubs2 once, so the header is exactly what
+    pysubs2 would save, and is then reused verbatim for every fitt.
 
     Args:
-        text: The subtitle text
-        start_time: Start time in seconds
-        end_time: End time in seconds
-        style: Style name for the subtitle
+        template_file: ASS template path; defaults to
+            ASS_PARAMS["blank_template"]
 
     Returns:
-        SSAEvent object for the subtitle
+        The [Script Info] entries, and everything from the blank line before
+        [V4+ Styles] through the [Events] Format line
     """
-    subtitle = pysubs2.SSAEvent(
-        start=pysubs2.make_time(s=start_time),
-        end=pysubs2.make_time(s=end_time),
-        style=ASS_PARAMS[style],
+    import pysubs2
+
+    template = pysubs2.load(
+        template_file or ASS_PARAMS["blank_template"], encoding="UTF-8"
     )
-    subtitle.name = style
-    subtitle.text = text
-    return subtitle
+    template.clear()
+    text = template.to_string("ass")
+    split = text.index("\n[V4+ Styles]")
+    return text[:split], text[split:]
+
+
+# Header shared with each pool worker by _init_ass_worker
+_worker_header: Tuple[str, str] = ("", "")
+
+
+def _init_ass_worker(header: Tuple[str, str]) -> None:
+    """
+    Receive the rendered template header once per worker process.
 
+    Args:
+        header: Sections from load_ass_header
+    """
+    global _worker_header
+    _worker_header = header
+
+
+def _write_fitt_ass_job(
+    job: Tuple[int, Tuple[int, int, str], LineRecords, str],
+) -> Span:
+    """
+    Write one fitt from a pool worker using the shared header.
+
+    Args:
+        job: Arguments for write_fitt_ass after the header
+
+    Returns:
+        The fitt's timing span, for the parent process to record
+    """
+    with stage("ass_fitt", record=False, fitt_id=job[0], lines=len(job[2])) as span:
+        span.fields["events"] = write_fitt_ass(_worker_header, *job)
+    return span
+
+
+def write_fitt_ass(
+    header: Tuple[str, str],
+    fitt_id: int,
+    fitt_bounds: Tuple[int, int, str],
+    fitt: LineRecords,
+    output_file: str,
+) -> int:
+    """
+    Generate the ASS subtitle file for a single fitt.
+
+    Dialogue lines are formatted straight from the line data, without
+    building pysubs2 events.
+
+    Args:
+        header: Template sections from load_ass_header
+        fitt_id: Index of the fitt in FITT_BOUNDARIES
+        fitt_bounds: The fitt's (start_line, end_line, fitt_name)
+        fitt: Line data for the fitt
+        output_file: Path template with a {fitt_id} field
+
+    Returns:
+        Number of subtitle events written
+    """
+    logger.info("Writing .ass file for fitt", fitt_id=fitt_id, fitt_bounds=fitt_bounds)
+
+    script_info, styles = header
+    events = []
+
+    start_time = 0
+    end_time = start_time + SECONDS_PER_LINE
+
+    for line in fitt:
+        start, end = ass_timestamp(start_time), ass_timestamp(end_time)
+
+        # Old English
+        events.append(dialogue(line["OE"], start, end, "original_style"))
+        events.append(dialogue(line["ME"], start, end, "modern_style"))
+        events.append(dialogue(line["line"], start, end, "all_number_style"))
+        marker = LINE_NUMBER_MARKERS.get(line["line"])
+        if marker:
+            events.append(dialogue(marker, start, end, "big_number_style"))
+
+        if line["line"] == fitt_bounds[0]:
+            events.append(dialogue(fitt_bounds[2], start, end, "fitt_heading_style"))
+
+        # increment for next subtitle
+        start_time += SECONDS_PER_LINE
+        end_time += SECONDS_PER_LINE
+
+    with open(output_file.format(fitt_id=fitt_id), "w", encoding="UTF-8") as file:
+        file.write(script_info)
+        file.write(f"Fitt: {fitt_id}\n")
+        file.write(f"First Line: {fitt[0]['line']}\n")
+        file.write(f"Last Line: {fitt[-1]['line']}\n")
+        file.write(styles)
+        file.writelines(events)
+    return len(events)
+
+
+def ass_timestamp(seconds: float) -> str:
+    """
+    Format a time as an ASS timestamp, rounding as pysubs2 and Aegisub do.
+
+    Args:
+        seconds: Time from the start of the file
+
+    Returns:
+        Timestamp as H:MM:SS.cc
+    """
+    ms = max(0, int(round(seconds * 1000)))
+    centiseconds = (ms + 5) // 10
+    minutes, cs = divmod(centiseconds, 6000)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:01d}:{minutes:02d}:{cs // 100:02d}.{cs % 100:02d}"
+
+
+def dialogue(text: object, start: str, end: str, style: str) -> str:
+    """
+    Format one subtitle event as an ASS Dialogue line.
+
+    Args:
+        text: The subtitle text; numbers are written with str()
+        start: Start timestamp from ass_timestamp
+        end: End timestamp from ass_timestamp
+        style: Key of the style in ASS_PARAMS, also written as the event name
+
+    Returns:
+        The Dialogue line, with its newline
+    """
+    return f"Dialogue: 0,{start},{end},{ASS_PARAMS[style]},{style},0,0,0,,{text}\n"
+
+
+def run(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Main function to process the Beowulf text.
+
+    With no arguments this runs the whole pipeline; see cli.py for the
+    subcommands.
+
+    Args:
+        argv: Command-line arguments; defaults to sys.argv[1:]
+
+    Returns:
+        Process exit status
+    """
+    from cli import main
 
-def run() -> None:
-    """Main function to process the Beowulf text."""
-    do_file("maintext", "https://heorot.dk/beowulf-rede-text.html")
+    return main(argv)
 
 
 if __name__ == "__main__":
-    run()
+    raise SystemExit(run())
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Table-level incremental reparsing of the Heorot HTML.
+
+Every line of the poem comes from one table.c15, and the tables parse
+independently; only the line counter runs across them. A TableSnapshot
+keeps each table's fingerprint and parsed rows. When a new version of the
+HTML arrives, only the tables whose fingerprints changed are parsed again,
+the lines after them are renumbered, and the result comes with a diff of
+the changed lines and the fitts they fall in.
+"""
+
+import hashlib
+import os
+import pickle
+import zlib
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import structlog
+
+from heorot import (
+    DEFAULT_PARSER_BACKEND,
+    PARSE_WORKERS,
+    PARSER_VERSION,
+    TableRow,
+    parse_table,
+    parse_tables,
+    split_tables,
+)
+from linestore import LineStore, LineStoreBuilder
+from numbering import FITT_INDEX
+from parse_cache import UNREADABLE_ERRORS
+
+SNAPSHOT_VERSION = 1
+
+logger = structlog.get_logger()
+
+
+def fingerprint(table: str) -> str:
+    """
+    Hash the source of one table.
+
+    Args:
+        table: Markup from split_tables
+
+    Returns:
+        Hex digest identifying the table's content
+    """
+    return hashlib.blake2b(table.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class TableResult:
+    """Parsed rows of one table, keyed by the fingerprint of its source."""
+
+    fingerprint: str
+    rows: List[TableRow]
+
+
+@dataclass
+class TableSnapshot:
+    """Per-table parse results for one version of the HTML."""
+
+    tables: List[TableResult]
+    notes: bool = True
+    parser_version: str = PARSER_VERSION
+
+    @classmethod
+    def build(
+        cls,
+        html: str,
+        backend: str = DEFAULT_PARSER_BACKEND,
+        notes: bool = True,
+        workers: int = PARSE_WORKERS,
+    ) -> "TableSnapshot":
+        """
+        Parse every table of a document.
+
+        Args:
+            html: HTML content to parse
+            backend: One of PARSER_BACKENDS
+            notes: Capture editorial note references
+            workers: Number of processes to use; 0 means one per CPU
+
+        Returns:
+            Snapshot of the document
+        """
+        tables = split_tables(html)
+        rows = parse_tables(tables, backend, notes, workers)
+        return cls(
+            [TableResult(fingerprint(table), r) for table, r in zip(tables, rows)],
+            notes,
+        )
+
+    def offsets(self) -> List[int]:
+        """
+        Number the tables' first lines.
+
+        Returns:
+            The line number of each table's first line, then one past the
+            last line of the poem
+        """
+        offsets = [1]
+        for table in self.tables:
+            offsets.append(offsets[-1] + len(table.rows))
+        return offsets
+
+    def lines(self) -> LineStore:
+        """
+        Assemble the numbered lines, as parse() would return them.
+
+        Returns:
+            LineStore starting with the empty line 0
+        """
+        builder = LineStoreBuilder(with_notes=self.notes)
+        builder.append(0, "", "", None)
+        number = 1
+        for table in self.tables:
+            for oe, me, note in table.rows:
+                builder.append(number, oe, me, note)
+                number += 1
+        return builder.build()
+
+    def save(self, path: str) -> None:
+        """
+        Write the snapshot atomically.
+
+        Args:
+            path: File to write
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = zlib.compress(
+            pickle.dumps((SNAPSHOT_VERSION, self), pickle.HIGHEST_PROTOCOL)
+        )
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(payload)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TableSnapshot"]:
+        """
+        Read a saved snapshot.
+
+        Args:
+            path: File written by save
+
+        Returns:
+            The snapshot, or None if it is missing, unreadable or was made
+            by other parse rules; an unreadable snapshot is removed
+        """
+        try:
+            with open(path, "rb") as file:
+                version, snapshot = pickle.loads(zlib.decompress(file.read()))
+        except FileNotFoundError:
+            return None
+        except UNREADABLE_ERRORS:
+            logger.warning("discarding unreadable table snapshot", path=path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        if version != SNAPSHOT_VERSION or snapshot.parser_version != PARSER_VERSION:
+            return None
+        return snapshot
+
+
+@dataclass
+class LineChange:
+    """One line added, removed or changed between two versions."""
+
+    kind: str  # 'added', 'removed' or 'changed'
+    old_line: Optional[int]
+    new_line: Optional[int]
+    old: Optional[Dict[str, Any]] = None
+    new: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class TableDiff:
+    """What a reparse changed, and which fitts need rebuilding."""
+
+    changes: List[LineChange] = field(default_factory=list)
+    reparsed: List[int] = field(default_factory=list)
+    reused: int = 0
+    renumbered_from: Optional[int] = None
+    fitts: List[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+
+def reparse(
+    html: str,
+    previous: TableSnapshot,
+    backend: str = DEFAULT_PARSER_BACKEND,
+) -> Tuple[TableSnapshot, TableDiff]:
+    """
+    Parse a new version of a document, reusing unchanged tables.
+
+    Tables are matched by fingerprint in order, so edits, insertions and
+    deletions of whole tables are all found. Only unmatched tables are
+    parsed, and their rows are diffed against the rows they replace.
+
+    Args:
+        html: New HTML content
+        previous: Snapshot of an earlier version
+        backend: One of PARSER_BACKENDS, used for the changed tables
+
+    Returns:
+        The new snapshot, and the diff from the previous one
+    """
+    sources = split_tables(html)
+    fingerprints = [fingerprint(table) for table in sources]
+    old_offsets = previous.offsets()
+    matcher = SequenceMatcher(
+        None, [table.fingerprint for table in previous.tables], fingerprints, False
+    )
+
+    tables: List[TableResult] = []
+    diff = TableDiff()
+    touched: Set[int] = set()
+    offset = 1
+    for tag, old_start, old_stop, new_start, new_stop in matcher.get_opcodes():
+        if tag == "equal":
+            if diff.renumbered_from is None and offset != old_offsets[old_start]:
+                diff.renumbered_from = offset
+            block = previous.tables[old_start:old_stop]
+            diff.reused += len(block)
+        else:
+            block = []
+            first_line = offset
+            for index in range(new_start, new_stop):
+                rows = parse_table(sources[index], backend, previous.notes, first_line)
+                block.append(TableResult(fingerprints[index], rows))
+                first_line += len(rows)
+            diff.reparsed.extend(range(new_start, new_stop))
+            changes = _diff_rows(
+                [
+                    row
+                    for table in previous.tables[old_start:old_stop]
+                    for row in table.rows
+                ],
+                [row for table in block for row in table.rows],
+                old_offsets[old_start],
+                offset,
+                previous.notes,
+            )
+            diff.changes.extend(changes)
+            touched.update(_positions(changes, offset))
+        tables.extend(block)
+        offset += sum(len(table.rows) for table in block)
+
+    if diff.renumbered_from is None and offset != old_offsets[-1]:
+        diff.renumbered_from = offset  # lines were only added or removed at the end
+    if diff.renumbered_from is not None:
+        touched.update(range(diff.renumbered_from, max(offset, old_offsets[-1])))
+    diff.fitts = fitts_for_lines(touched)
+
+    logger.info(
+        "reparsed changed tables",
+        reparsed=len(diff.reparsed),
+        reused=diff.reused,
+        changed_lines=len(diff.changes),
+        fitts=diff.fitts,
+    )
+    return TableSnapshot(tables, previous.notes), diff
+
+
+def _diff_rows(
+    old_rows: Sequence[TableRow],
+    new_rows: Sequence[TableRow],
+    old_start: int,
+    new_start: int,
+    notes: bool,
+) -> List[LineChange]:
+    """
+    Diff the rows of a run of replaced tables.
+
+    Args:
+        old_rows: Rows of the tables being replaced
+        new_rows: Rows of the tables replacing them
+        old_start: Old line number of the first old row
+        new_start: New line number of the first new row
+        notes: Whether the records carry a notes field
+
+    Returns:
+        Changes in order, pairing replaced rows as 'changed' where possible
+    """
+    changes = []
+    matcher = SequenceMatcher(None, old_rows, new_rows, False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for k in range(paired):
+            old_line, new_line = old_start + i1 + k, new_start + j1 + k
+            changes.append(
+                LineChange(
+                    "changed",
+                    old_line,
+                    new_line,
+                    _record(old_line, old_rows[i1 + k], notes),
+                    _record(new_line, new_rows[j1 + k], notes),
+                )
+            )
+        for i in range(i1 + paired, i2):
+            old_line = old_start + i
+            changes.append(
+                LineChange(
+                    "removed", old_line, None, old=_record(old_line, old_rows[i], notes)
+                )
+            )
+        for j in range(j1 + paired, j2):
+            new_line = new_start + j
+            changes.append(
+                LineChange(
+                    "added", None, new_line, new=_record(new_line, new_rows[j], notes)
+                )
+            )
+    return changes
+
+
+def _record(number: int, row: TableRow, notes: bool) -> Dict[str, Any]:
+    """Turn a table row into a line record like those in maintext.json."""
+    record: Dict[str, Any] = {"line": number, "OE": row[0], "ME": row[1]}
+    if notes:
+        record["notes"] = row[2]
+    return record
+
+
+def _positions(changes: Sequence[LineChange], fallback: int) -> List[int]:
+    """New line numbers where changes landed; removals count where they were."""
+    positions = []
+    for change in changes:
+        if change.new_line is not None:
+            positions.append(change.new_line)
+            fallback = change.new_line
+        else:
+            positions.append(fallback)
+    return positions
+
+
+def fitts_for_lines(lines: Set[int]) -> List[int]:
+    """
+    Find the fitts containing any of the given lines.
+
+    Args:
+        lines: Line numbers
+
+    Returns:
+        Sorted fitt ids, never including the placeholder fitt 24
+    """
+    fitts = {FITT_INDEX.fitt_of(line) for line in lines}
+    return sorted(fitt_id for fitt_id in fitts if fitt_id is not None)
+
+
+def parse_incremental(
+    html: str,
+    snapshot_path: str,
+    backend: str = DEFAULT_PARSER_BACKEND,
+    notes: bool = True,
+    workers: int = PARSE_WORKERS,
+) -> Tuple[LineStore, Optional[TableDiff]]:
+    """
+    Parse a document, reparsing only what changed since the saved snapshot.
+
+    The snapshot is replaced by one of this version.
+
+    Args:
+        html: HTML content to parse
+        snapshot_path: Where the previous version's snapshot is kept
+        backend: One of PARSER_BACKENDS
+        notes: Capture editorial note references
+        workers: Processes used when every table must be parsed
+
+    Returns:
+        The parsed lines, and the diff from the previous version, or None
+        if there was no usable snapshot to compare with
+    """
+    previous = TableSnapshot.load(snapshot_path)
+    if previous is None or previous.notes != notes:
+        snapshot, diff = TableSnapshot.build(html, backend, notes, workers), None
+    else:
+        snapshot, diff = reparse(html, previous, backend)
+    snapshot.save(snapshot_path)
+    return snapshot.lines(), diff
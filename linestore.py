@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Compact columnar storage for parsed Beowulf lines.
+
+A LineStore keeps line numbers in an int array and each text column as a
+single packed string with an offset table, instead of one dict per line.
+Fitt and range views share the store's columns without copying, and each
+line is exposed through a read-only mapping with the familiar 'line',
+'OE', 'ME' (and 'notes') keys, so code written against the list of dicts
+keeps working.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from numbering import FITT_INDEX
+
+# A list of line dicts or a LineStore; what the writers accept
+LineRecords = Sequence[Mapping[str, Any]]
+
+BASE_FIELDS: Tuple[str, ...] = ("line", "OE", "ME")
+
+
+class TextColumn:
+    """Strings packed end to end in one str, located by an offset table."""
+
+    __slots__ = ("_text", "_offsets", "_missing")
+
+    def __init__(self, values: Iterable[Optional[str]]) -> None:
+        """
+        Pack a column of strings.
+
+        Args:
+            values: Column values in line order; None is kept distinct from ""
+        """
+        parts = []
+        offsets = array("I", [0])
+        missing = bytearray()
+        position = 0
+        for value in values:
+            missing.append(value is None)
+            if value:
+                parts.append(value)
+                position += len(value)
+            offsets.append(position)
+        self._text = "".join(parts)
+        self._offsets = offsets
+        self._missing = missing if any(missing) else None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self._missing is not None and self._missing[index]:
+            return None
+        return self._text[self._offsets[index] : self._offsets[index + 1]]
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        return (_unpack_column, (self._text, self._offsets, self._missing))
+
+    def nbytes(self) -> int:
+        """
+        Estimate the memory held by the column.
+
+        Returns:
+            Approximate size in bytes of the packed text and offsets
+        """
+        size = sys.getsizeof(self._text) + sys.getsizeof(self._offsets)
+        if self._missing is not None:
+            size += sys.getsizeof(self._missing)
+        return size
+
+
+def _unpack_column(
+    text: str, offsets: array, missing: Optional[bytearray]
+) -> TextColumn:
+    """Rebuild a pickled TextColumn without repacking its strings."""
+    column = TextColumn(())
+    column._text = text
+    column._offsets = offsets
+    column._missing = missing
+    return column
+
+
+class LineRecord(Mapping):
+    """Read-only dict-like view of one line in a LineStore."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "LineStore", index: int) -> None:
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        store = self._store
+        if key == "line":
+            return store.numbers[self._index]
+        if key == "OE":
+            return store.oe[self._index]
+        if key == "ME":
+            return store.me[self._index]
+        if key == "notes" and store.notes is not None:
+            return store.notes[self._index]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.fields)
+
+    def __len__(self) -> int:
+        return len(self._store.fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Dict[str, Any]]]:
+        # Pickle as a plain dict rather than dragging the whole store along
+        return (dict, (dict(self),))
+
+
+class _LineSequence(Sequence):
+    """Behaviour shared by LineStore and LineView."""
+
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other)
+        )
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} of {len(self)} lines>"
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Copy the lines out as plain dicts.
+
+        Returns:
+            List of line data dictionaries
+        """
+        return [dict(record) for record in self]
+
+
+class LineStore(_LineSequence):
+    """Columnar, immutable store of parsed lines."""
+
+    __slots__ = ("numbers", "oe", "me", "notes")
+
+    def __init__(
+        self,
+        numbers: array,
+        oe: TextColumn,
+        me: TextColumn,
+        notes: Optional[TextColumn] = None,
+    ) -> None:
+        """
+        Initialize the store from prepared columns.
+
+        Args:
+            numbers: Line numbers as an array of ints
+            oe: Old English text column
+            me: Modern English text column
+            notes: Editorial notes column, or None if notes were not captured
+        """
+        self.numbers = numbers
+        self.oe = oe
+        self.me = me
+        self.notes = notes
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "LineStore":
+        """
+        Build a store from line dicts such as those in maintext.json.
+
+        Args:
+            records: Line data with 'line', 'OE', 'ME' and optionally 'notes'
+
+        Returns:
+            A new LineStore
+        """
+        builder = LineStoreBuilder()
+        for record in records:
+            builder.append(
+                record["line"], record["OE"], record["ME"], record.get("notes")
+            )
+            if "notes" in record:
+                builder.with_notes = True
+        return builder.build()
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Keys of each line record."""
+        if self.notes is None:
+            return BASE_FIELDS
+        return BASE_FIELDS + ("notes",)
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return LineView(self, start, max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return LineRecord(self, index)
+
+    def __iter__(self) -> Iterator[LineRecord]:
+        for index in range(len(self)):
+            yield LineRecord(self, index)
+
+    def view(self, start: int, stop: int) -> "LineView":
+        """
+        Get a zero-copy view of a range of lines.
+
+        Args:
+            start: First index, inclusive
+            stop: Last index, exclusive
+
+        Returns:
+            View over the range
+        """
+        return self[start:stop]
+
+    def fitt(self, fitt_num: int) -> "LineView":
+        """
+        Get a zero-copy view of one fitt's lines.
+
+        Args:
+            fitt_num: Index of the fitt in FITT_BOUNDARIES
+
+        Returns:
+            View over the fitt's lines
+
+        Raises:
+            IndexError: If there is no such fitt
+        """
+        fitt = FITT_INDEX.lines_of(fitt_num)
+        return self[fitt.start : fitt.stop]
+
+    def nbytes(self) -> int:
+        """
+        Estimate the memory held by the store's columns.
+
+        Returns:
+            Approximate size in bytes
+        """
+        size = sys.getsizeof(self.numbers)
+        size += self.oe.nbytes() + self.me.nbytes()
+        if self.notes is not None:
+            size += self.notes.nbytes()
+        return size
+
+
+class LineView(_LineSequence):
+    """Zero-copy window onto a contiguous range of a LineStore."""
+
+    __slots__ = ("store", "start", "stop")
+
+    def __init__(self, store: LineStore, start: int, stop: int) -> None:
+        """
+        Initialize the view.
+
+        Args:
+            store: Store the view reads from
+            start: First index in the store, inclusive
+            stop: Last index in the store, exclusive
+        """
+        self.store = store
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return LineView(
+                self.store, self.start + start, self.start + max(start, stop)
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return LineRecord(self.store, self.start + index)
+
+    def __iter__(self) -> Iterator[LineRecord]:
+        for index in range(self.start, self.stop):
+            yield LineRecord(self.store, index)
+
+    def __reduce__(self) -> Tuple[Any, Tuple[List[Dict[str, Any]]]]:
+        # Pickle only the viewed lines, e.g. when sent to a worker process
+        return (LineStore.from_records, (self.to_records(),))
+
+    @property
+    def numbers(self) -> memoryview:
+        """Line numbers of the view, sharing the store's array."""
+        return memoryview(self.store.numbers)[self.start : self.stop]
+
+
+class LineStoreBuilder:
+    """Accumulates lines one at a time, then packs them into a LineStore."""
+
+    def __init__(self, with_notes: bool = False) -> None:
+        """
+        Initialize an empty builder.
+
+        Args:
+            with_notes: Whether the built store should carry a notes column
+        """
+        self.with_notes = with_notes
+        self._numbers = array("i")
+        self._oe: List[str] = []
+        self._me: List[str] = []
+        self._notes: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def append(self, line: int, oe: str, me: str, notes: Optional[str] = None) -> None:
+        """
+        Add one line.
+
+        Args:
+            line: Line number
+            oe: Old English text
+            me: Modern English text
+            notes: Editorial note text, if any
+        """
+        self._numbers.append(line)
+        self._oe.append(oe)
+        self._me.append(me)
+        self._notes.append(notes)
+
+    def build(self) -> LineStore:
+        """
+        Pack the accumulated lines.
+
+        Returns:
+            A new LineStore
+        """
+        notes = TextColumn(self._notes) if self.with_notes else None
+        return LineStore(
+            array("i", self._numbers), TextColumn(self._oe), TextColumn(self._me), notes
+        )
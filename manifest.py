@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Incremental build manifest for the heorot pipeline outputs.
+
+The manifest records, for every artifact do_file writes, a digest of the
+inputs it was built from and a digest of the file that was written. An
+artifact is rebuilt only when its inputs changed or the file on disk no
+longer matches what was written.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+MANIFEST_VERSION = 1
+
+logger = structlog.get_logger()
+
+
+def digest(*parts: Any) -> str:
+    """
+    Hash JSON-serializable values into a stable hex digest.
+
+    Args:
+        parts: Values that together determine an artifact
+
+    Returns:
+        SHA-256 hex digest
+    """
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert line stores, views and records to JSON-friendly types."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Sequence):
+        return list(value)
+    return str(value)
+
+
+def file_digest(path: str) -> Optional[str]:
+    """
+    Hash the bytes of a file.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        SHA-256 hex digest, or None if the file does not exist
+    """
+    sha = hashlib.sha256()
+    try:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 16), b""):
+                sha.update(chunk)
+    except FileNotFoundError:
+        return None
+    return sha.hexdigest()
+
+
+class BuildManifest:
+    """Input and output digests for every artifact of a build."""
+
+    def __init__(self, path: str, artifacts: Optional[Dict[str, Dict]] = None):
+        """
+        Initialize the manifest.
+
+        Args:
+            path: Where the manifest is saved
+            artifacts: Previously recorded entries keyed by artifact path
+        """
+        self.path = path
+        self.artifacts: Dict[str, Dict[str, Optional[str]]] = artifacts or {}
+        self.inputs: Dict[str, str] = {}
+        self.built: List[str] = []
+        self.skipped: List[str] = []
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        """
+        Load a manifest, starting empty if it is missing or from another version.
+
+        Args:
+            path: Manifest file to read
+
+        Returns:
+            The loaded manifest
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return cls(path)
+        except json.JSONDecodeError:
+            logger.warning("ignoring unreadable build manifest", path=path)
+            return cls(path)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("artifacts", {}))
+
+    def needs_build(self, artifact: str, input_digest: str) -> bool:
+        """
+        Decide whether an artifact must be regenerated.
+
+        Fresh artifacts are added to the skipped list.
+
+        Args:
+            artifact: Output file path
+            input_digest: Digest of everything the artifact is built from
+
+        Returns:
+            True if the inputs changed or the file is missing or modified
+        """
+        entry = self.artifacts.get(artifact)
+        if (
+            entry is not None
+            and entry.get("inputs") == input_digest
+            and entry.get("output") == file_digest(artifact)
+        ):
+            self.skipped.append(artifact)
+            return False
+        return True
+
+    def record(self, artifact: str, input_digest: str) -> None:
+        """
+        Record an artifact that was just written.
+
+        Args:
+            artifact: Output file path
+            input_digest: Digest of everything the artifact was built from
+        """
+        self.artifacts[artifact] = {
+            "inputs": input_digest,
+            "output": file_digest(artifact),
+        }
+        self.built.append(artifact)
+
+    def clear(self) -> None:
+        """Forget every recorded artifact so the next build writes them all."""
+        self.artifacts = {}
+
+    def save(self) -> None:
+        """Write the manifest next to the artifacts it describes."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "inputs": self.inputs,
+            "artifacts": self.artifacts,
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=4, sort_keys=True)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Text normalization for Beowulf lines.
+
+Two layers live here. clean_cell and collapse_whitespace apply the rules
+the heorot parser uses on raw table cells. A Normalizer then maps clean
+text to comparable forms: optionally NFC-composed, and folded by one of
+the named FOLD_PROFILES, which fold diacritics, case and OE letter
+variants. A folded form is computed once per distinct line and cached, so
+matching the Heorot text against the other editions in archive/data/
+can reuse it.
+
+    match = get_normalizer("match")
+    match("Hwæt! Wé Gárdena")          # 'hwæt we gardena'
+    match.column(lines.oe)             # every OE line, folded in one pass
+"""
+
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+# Joins a column's values so it can be folded in a single pass; the fold
+# tables leave it alone, and clean text never contains it
+COLUMN_SEPARATOR = "\0"
+
+
+def collapse_whitespace(text: str) -> str:
+    """
+    Turn every run of whitespace, including &nbsp;, into one space and trim.
+
+    Args:
+        text: Raw text from HTML parsing
+
+    Returns:
+        Text with consistent spacing
+    """
+    if "&" in text:
+        text = text.replace("&nbsp;", " ")
+    # str.split() finds whitespace runs and drops the ends in one C pass
+    return " ".join(text.split())
+
+
+def clean_cell(raw: str) -> str:
+    """
+    Normalize the text of one OE or ME table cell.
+
+    Args:
+        raw: Text content of the cell's span
+
+    Returns:
+        Text with whitespace collapsed and '--' rendered as a space
+    """
+    text = collapse_whitespace(raw)
+    return text.replace("--", " ") if "--" in text else text
+
+
+@dataclass(frozen=True)
+class FoldProfile:
+    """Rules for folding text to a comparable form."""
+
+    name: str
+    marks: bool = False  # strip combining diacritics, so á and ā become a
+    lower: bool = False
+    punctuation: bool = False  # drop punctuation and join hyphenated words
+    letters: Mapping[str, str] = field(default_factory=dict)
+
+
+FOLD_PROFILES: Dict[str, FoldProfile] = {
+    profile.name: profile
+    for profile in (
+        FoldProfile("none"),
+        # Accents and macrons only; æ, þ, ð and ƿ are letters in their own right
+        FoldProfile("diacritics", marks=True),
+        # For lining up editions that differ in accents, case, spelling of
+        # the dental fricative and punctuation
+        FoldProfile(
+            "match",
+            marks=True,
+            lower=True,
+            punctuation=True,
+            letters={"ð": "þ", "Ð": "þ", "ƿ": "w", "Ƿ": "w"},
+        ),
+        # Full-text search: case, accents and length marks folded, so á, ā
+        # and a are one letter; search-thorn also makes ð and þ one letter
+        FoldProfile("search", marks=True, lower=True),
+        FoldProfile(
+            "search-thorn",
+            marks=True,
+            lower=True,
+            letters={"ð": "þ", "ƿ": "w"},
+        ),
+        # Plain ASCII letters, for search keys and file names
+        FoldProfile(
+            "ascii",
+            marks=True,
+            letters={
+                "æ": "ae",
+                "Æ": "AE",
+                "þ": "th",
+                "Þ": "TH",
+                "ð": "th",
+                "Ð": "TH",
+                "ƿ": "w",
+                "Ƿ": "W",
+                "ȝ": "g",
+                "Ȝ": "G",
+            },
+        ),
+    )
+}
+
+
+class _FoldTable(dict):
+    """str.translate table that works out each character's folding on first use."""
+
+    def __init__(self, profile: FoldProfile) -> None:
+        super().__init__()
+        self.profile = profile
+
+    def __missing__(self, code: int) -> Optional[str]:
+        char = chr(code)
+        self[code] = folded = self._fold(char)
+        return folded
+
+    def _fold(self, char: str) -> Optional[str]:
+        profile = self.profile
+        if char == COLUMN_SEPARATOR:
+            return char
+        category = unicodedata.category(char)
+        if profile.punctuation and category.startswith("P"):
+            return "" if category == "Pd" else " "  # Gar-Dena is Gardena
+        if profile.marks:
+            if category == "Mn":
+                return None
+            char = "".join(
+                part
+                for part in unicodedata.normalize("NFD", char)
+                if unicodedata.category(part) != "Mn"
+            )
+            char = unicodedata.normalize("NFC", char)  # ǣ keeps its æ
+        if profile.lower:
+            char = char.lower()
+        return "".join(profile.letters.get(part, part) for part in char)
+
+
+class Normalizer:
+    """Maps text to its normalized form, caching each distinct line."""
+
+    def __init__(self, profile: Union[str, FoldProfile] = "none", nfc: bool = False):
+        """
+        Set up the normalization rules.
+
+        Args:
+            profile: Name from FOLD_PROFILES, or a custom FoldProfile
+            nfc: Compose characters to Unicode NFC before folding
+
+        Raises:
+            ValueError: If the profile name is unknown
+        """
+        if isinstance(profile, str):
+            if profile not in FOLD_PROFILES:
+                raise ValueError(f"Unknown fold profile: {profile}")
+            profile = FOLD_PROFILES[profile]
+        self.profile = profile
+        self.nfc = nfc
+        self._table = _FoldTable(profile)
+        self._folds = bool(
+            profile.marks or profile.lower or profile.punctuation or profile.letters
+        )
+        self._cache: Dict[str, str] = {}
+
+    def __repr__(self) -> str:
+        return f"Normalizer({self.profile.name!r}, nfc={self.nfc})"
+
+    def __call__(self, text: str) -> str:
+        """
+        Normalize one string.
+
+        Args:
+            text: Clean text, e.g. one line's OE
+
+        Returns:
+            The normalized form
+        """
+        try:
+            return self._cache[text]
+        except KeyError:
+            self._cache[text] = normalized = self._tidy(self._apply(text))
+            return normalized
+
+    def column(self, values: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """
+        Normalize a whole column, such as LineStore.oe.
+
+        The values not yet cached are joined and normalized in one pass
+        over the joined text, then split apart again.
+
+        Args:
+            values: Column values; None passes through unchanged
+
+        Returns:
+            The normalized values, in order
+        """
+        values = list(values)
+        cache = self._cache
+        pending = list(
+            dict.fromkeys(
+                value
+                for value in values
+                if value is not None
+                and value not in cache
+                and COLUMN_SEPARATOR not in value
+            )
+        )
+        if pending:
+            folded = self._apply(COLUMN_SEPARATOR.join(pending))
+            cache.update(zip(pending, map(self._tidy, folded.split(COLUMN_SEPARATOR))))
+        return [None if value is None else self(value) for value in values]
+
+    def _apply(self, text: str) -> str:
+        """Run the NFC and folding passes over text."""
+        if self.nfc:
+            text = unicodedata.normalize("NFC", text)
+        if self._folds:
+            text = text.translate(self._table)
+        return text
+
+    def _tidy(self, text: str) -> str:
+        """Collapse the spaces left where punctuation was dropped."""
+        if self.profile.punctuation:
+            return " ".join(text.split())
+        return text
+
+    def cache_size(self) -> int:
+        """
+        Count the cached lines.
+
+        Returns:
+            Number of distinct strings normalized so far
+        """
+        return len(self._cache)
+
+
+@lru_cache(maxsize=None)
+def get_normalizer(profile: str = "none", nfc: bool = False) -> Normalizer:
+    """
+    Get the shared normalizer for a profile, so its cache is reused.
+
+    Args:
+        profile: Name from FOLD_PROFILES
+        nfc: Compose characters to Unicode NFC before folding
+
+    Returns:
+        The process-wide Normalizer for these settings
+    """
+    return Normalizer(profile, nfc)
@@ -3,10 +3,21 @@
 Beowulf fitt boundaries and line numbering constants.
 
 This module contains the fitt boundaries and line number markers
-for the Beowulf text, following the heorot.dk numbering system.
+for the Beowulf text, following the heorot.dk numbering system, and
+FITT_INDEX, which answers line-to-fitt and marker lookups from them.
 """
 
-from typing import Dict, List, Tuple, Final, TypedDict
+from bisect import bisect_left, bisect_right
+from typing import (
+    Dict,
+    Final,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 # Fitt boundaries: (start_line, end_line, fitt_name)
 # Note: Fitt 24 doesn't exist in Beowulf, but is included for easier calculations
@@ -150,3 +161,176 @@ LINE_NUMBER_MARKERS: Final[Dict[int, int]] = {
 #         number_markers[i + offset] = i + offset
 #
 # print(number_markers)
+
+
+# Index of the placeholder in FITT_BOUNDARIES; FittIndex leaves it out
+MISSING_FITT: Final[int] = 24
+
+
+class FittSlice(NamedTuple):
+    """The part of a line range that falls in one fitt."""
+
+    fitt: int
+    start: int  # first line, inclusive
+    stop: int  # last line, exclusive
+
+
+class FittIndex:
+    """
+    Fitt boundaries and line number markers as sorted arrays.
+
+    Lookups are binary searches over the fitts' first lines and the marker
+    lines, so no caller scans FITT_BOUNDARIES or has to skip the placeholder
+    fitt 24 itself.
+    """
+
+    def __init__(self,
+                 boundaries: Sequence[Tuple[int, int, str]] = FITT_BOUNDARIES,
+                 markers: Mapping[int, int] = LINE_NUMBER_MARKERS) -> None:
+        """
+        Build the index.
+
+        Args:
+            boundaries: (start, end, name) per fitt, with end inclusive
+            markers: Printed line number by line
+        """
+        fitts = sorted((start, end, fitt_id)
+                       for fitt_id, (start, end, _) in enumerate(boundaries)
+                       if fitt_id != MISSING_FITT)
+        self._starts = [start for start, _, _ in fitts]
+        self._ends = [end for _, end, _ in fitts]
+        self._ids = [fitt_id for _, _, fitt_id in fitts]
+        self._names = {fitt_id: name
+                       for fitt_id, (_, _, name) in enumerate(boundaries)
+                       if fitt_id != MISSING_FITT}
+        self._marker_lines = sorted(markers)
+        self._marker_numbers = [markers[line] for line in self._marker_lines]
+
+    @property
+    def fitt_ids(self) -> List[int]:
+        """Ids of the real fitts, in line order."""
+        return list(self._ids)
+
+    def __contains__(self, fitt_id: object) -> bool:
+        """Whether fitt_id names a real fitt."""
+        return fitt_id in self._ids
+
+    def fitt_of(self, line: int) -> Optional[int]:
+        """
+        Find the fitt a line belongs to.
+
+        Args:
+            line: Line number
+
+        Returns:
+            The fitt's index in FITT_BOUNDARIES, or None if no fitt holds the line
+        """
+        i = bisect_right(self._starts, line) - 1
+        if i < 0 or line > self._ends[i]:
+            return None
+        return self._ids[i]
+
+    def lines_of(self, fitt_id: int) -> FittSlice:
+        """
+        Find the lines of a fitt.
+
+        Args:
+            fitt_id: Index of the fitt in FITT_BOUNDARIES
+
+        Returns:
+            The fitt's first line and the line after its last
+
+        Raises:
+            IndexError: If fitt_id is not a real fitt
+        """
+        if fitt_id not in self:
+            raise IndexError(f'no such fitt: {fitt_id}')
+        i = self._ids.index(fitt_id)
+        return FittSlice(fitt_id, self._starts[i], self._ends[i] + 1)
+
+    def name_of(self, fitt_id: int) -> str:
+        """
+        Find the name of a fitt.
+
+        Args:
+            fitt_id: Index of the fitt in FITT_BOUNDARIES
+
+        Returns:
+            The fitt's heading, e.g. 'I'
+
+        Raises:
+            IndexError: If fitt_id is not a real fitt
+        """
+        if fitt_id not in self:
+            raise IndexError(f'no such fitt: {fitt_id}')
+        return self._names[fitt_id]
+
+    def split(self, start: int, stop: int) -> List[FittSlice]:
+        """
+        Split a line range at fitt boundaries.
+
+        Args:
+            start: First line number, inclusive
+            stop: Last line number, exclusive
+
+        Returns:
+            One FittSlice per fitt the range touches, in line order; lines in
+            no fitt, such as line 0, are left out
+        """
+        slices = []
+        i = max(bisect_right(self._starts, start) - 1, 0)
+        while i < len(self._starts) and self._starts[i] < stop:
+            lo = max(start, self._starts[i])
+            hi = min(stop, self._ends[i] + 1)
+            if lo < hi:
+                slices.append(FittSlice(self._ids[i], lo, hi))
+            i += 1
+        return slices
+
+    def previous_marker(self, line: int) -> Optional[Tuple[int, int]]:
+        """
+        Find the last line number marker at or before a line.
+
+        Args:
+            line: Line number
+
+        Returns:
+            (line, printed number), or None if there is no marker that early
+        """
+        i = bisect_right(self._marker_lines, line) - 1
+        if i < 0:
+            return None
+        return self._marker_lines[i], self._marker_numbers[i]
+
+    def next_marker(self, line: int) -> Optional[Tuple[int, int]]:
+        """
+        Find the first line number marker after a line.
+
+        Args:
+            line: Line number
+
+        Returns:
+            (line, printed number), or None if there is no later marker
+        """
+        i = bisect_right(self._marker_lines, line)
+        if i == len(self._marker_lines):
+            return None
+        return self._marker_lines[i], self._marker_numbers[i]
+
+    def markers(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        List the line number markers in a range of lines.
+
+        Args:
+            start: First line number, inclusive
+            stop: Last line number, exclusive
+
+        Returns:
+            (line, printed number) pairs in line order
+        """
+        lo = bisect_left(self._marker_lines, start)
+        hi = bisect_left(self._marker_lines, stop)
+        return list(zip(self._marker_lines[lo:hi], self._marker_numbers[lo:hi]))
+
+
+FITT_INDEX: Final[FittIndex] = FittIndex()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of parsed Beowulf line data.
+
+Parsed lines are stored under data/cache/, keyed by a hash of the HTML
+bytes and the parser version stamp, so a rerun on unchanged input can
+skip HTML parsing entirely. Other derived results, such as the variant
+readings, are kept with get_entry/put_entry in a subdirectory per
+namespace, each with its own size budget.
+"""
+
+import hashlib
+import os
+import pickle
+import time
+import zlib
+from typing import Any, List, Optional, Sequence
+
+import structlog
+
+# Defaults for the cache directory and eviction policy
+CACHE_DIR = "data/cache"
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds
+CACHE_SUFFIX = ".pkl.z"
+
+# Errors from loading an entry that is damaged, or that was pickled against
+# code that has since changed: a class moved or renamed, or a __reduce__
+# whose arguments no longer fit
+UNREADABLE_ERRORS = (
+    OSError,
+    EOFError,
+    zlib.error,
+    pickle.UnpicklingError,
+    AttributeError,
+    ImportError,
+    TypeError,
+    ValueError,
+)
+
+logger = structlog.get_logger()
+
+
+class ParseCache:
+    """Directory of compressed parse results with size and age eviction."""
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_age: float = CACHE_MAX_AGE,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Where cache entries are written
+            max_bytes: Total size the cache may grow to before eviction
+            max_age: Seconds since last use after which an entry is evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    @staticmethod
+    def key(html: str, parser_version: str) -> str:
+        """
+        Build the cache key for a document.
+
+        Args:
+            html: HTML content that was parsed
+            parser_version: Stamp identifying the parse rules
+
+        Returns:
+            Hex digest naming the cache entry
+        """
+        digest = hashlib.sha256(html.encode("utf-8"))
+        digest.update(b"\0" + parser_version.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        Get the file path for a cache key.
+
+        Args:
+            key: Cache key from ParseCache.key
+
+        Returns:
+            Path of the entry inside the cache directory
+        """
+        return os.path.join(self.directory, f"{key}{CACHE_SUFFIX}")
+
+    def get(self, html: str, parser_version: str) -> Optional[Sequence[Any]]:
+        """
+        Look up the parse result for a document.
+
+        Args:
+            html: HTML content to look up
+            parser_version: Stamp identifying the parse rules
+
+        Returns:
+            The cached lines, or None on a miss or unreadable entry
+        """
+        path = self.path(self.key(html, parser_version))
+        lines = self._load(path, "parse cache")
+        if lines is not None:
+            logger.info("parse cache hit", path=path, linecount=len(lines))
+        return lines
+
+    def put(self, html: str, parser_version: str, lines: Sequence[Any]) -> str:
+        """
+        Store the parse result for a document and apply the eviction policy.
+
+        Args:
+            html: HTML content that was parsed
+            parser_version: Stamp identifying the parse rules
+            lines: Parse output to store
+
+        Returns:
+            Path of the written entry
+        """
+        path = self.path(self.key(html, parser_version))
+        size = self._store(path, lines)
+        logger.info("stored parse cache entry", path=path, size=size)
+        self.evict(keep=path)
+        return path
+
+    def entry_path(self, namespace: str, key: str) -> str:
+        """
+        Get the file path of a keyed entry.
+
+        Args:
+            namespace: Kind of result, e.g. 'variants'; each has its own
+                subdirectory and size budget
+            key: Hex digest of everything the result depends on
+
+        Returns:
+            Path of the entry inside the namespace's directory
+        """
+        return os.path.join(self.directory, namespace, f"{key}{CACHE_SUFFIX}")
+
+    def get_entry(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Look up a result other than a parse, by a key of its inputs.
+
+        Args:
+            namespace: Kind of result, e.g. 'variants'
+            key: Hex digest of everything the result depends on
+
+        Returns:
+            The cached result, or None on a miss or unreadable entry
+        """
+        path = self.entry_path(namespace, key)
+        value = self._load(path, f"{namespace} cache")
+        if value is not None:
+            logger.info(f"{namespace} cache hit", path=path)
+        return value
+
+    def put_entry(self, namespace: str, key: str, value: Any) -> str:
+        """
+        Store a result other than a parse and apply the eviction policy to
+        its namespace.
+
+        Args:
+            namespace: Kind of result, e.g. 'variants'
+            key: Hex digest of everything the result depends on
+            value: Result to store
+
+        Returns:
+            Path of the written entry
+        """
+        path = self.entry_path(namespace, key)
+        size = self._store(path, value)
+        logger.info(f"stored {namespace} cache entry", path=path, size=size)
+        self._evict(os.path.dirname(path), keep=path)
+        return path
+
+    def _load(self, path: str, kind: str) -> Optional[Any]:
+        """Read an entry, removing it if it cannot be read."""
+        try:
+            with open(path, "rb") as file:
+                value = pickle.loads(zlib.decompress(file.read()))
+        except FileNotFoundError:
+            logger.info(f"{kind} miss", path=path)
+            return None
+        except UNREADABLE_ERRORS:
+            logger.warning(f"discarding unreadable {kind} entry", path=path)
+            self._remove(path)
+            return None
+
+        os.utime(path)  # mark as recently used for eviction
+        return value
+
+    @staticmethod
+    def _store(path: str, value: Any) -> int:
+        """Write an entry; returns its compressed size."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+        # Write beside the entry and rename so readers never see partial data
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(payload)
+        os.replace(temp_path, path)
+        return len(payload)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Remove expired entries, then the least recently used until under budget.
+
+        Args:
+            keep: Entry that must survive, typically the one just written
+
+        Returns:
+            Paths of the removed entries
+        """
+        return self._evict(self.directory, keep)
+
+    def _evict(self, directory: str, keep: Optional[str] = None) -> List[str]:
+        """Apply the eviction policy to the entries directly in one directory."""
+        if not os.path.isdir(directory):
+            return []
+
+        now = time.time()
+        entries = []
+        for name in os.listdir(directory):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        removed = []
+        total = 0
+        # Newest first, so the oldest entries are the ones that overflow
+        for mtime, size, path in sorted(entries, reverse=True):
+            expired = now - mtime > self.max_age
+            if path != keep and (expired or total + size > self.max_bytes):
+                self._remove(path)
+                removed.append(path)
+            else:
+                total += size
+
+        if removed:
+            logger.info(
+                "evicted cache entries", directory=directory, count=len(removed)
+            )
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Delete a cache entry, ignoring one that is already gone."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Trigram full-text search over the OE and ME lines.
+
+The index maps every trigram of every line's folded text to the lines it
+occurs in. A query is folded the same way, the lines holding all of its
+trigrams are looked up, and only those are checked for the query itself,
+so a search touches a handful of lines instead of all of them. Matches
+are whole words: a phrase must start and end at word boundaries, and a
+prefix query only needs to start at one.
+
+Folding ignores case, accents and length marks, so Gárdena, Gārdena and
+GARDENA all find each other; with thorn=True ð and þ (and ƿ and w) are
+treated as one letter too. The other editions in archive/data can be
+indexed alongside Heorot's text, each under its own name.
+
+The build writes data/fitts/<filestem>.search next to the corpus, and
+<filestem>.editions.search with the editions as well; loading one reads a
+few arrays and no text is refolded until a line is checked.
+
+    index = SearchIndex.load("data/fitts/maintext.search")
+    for hit in index.search("gardena"):
+        print(hit.line, highlight(hit.text, hit.spans))
+
+Layout (little-endian):
+
+    header     magic b"VXBS", version u16, field count u16, document count
+               u32, trigram count u32, posting count u32
+    fields     field names as strings
+    documents  field index i8 per document, then line number i32 per document
+    texts      document texts as strings
+    trigrams   the sorted trigrams as strings
+    postings   start of each trigram's postings i32, plus the total, then
+               the document numbers i32
+
+Each run of strings is the end offset u32 of each string, then the
+concatenated UTF-8.
+"""
+
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from linestore import LineRecords
+from normalize import Normalizer, get_normalizer
+
+MAGIC = b"VXBS"
+# Bump when the file layout or the folding changes
+SEARCH_VERSION = 2
+
+HEADER = struct.Struct("<4sHHIII")
+
+# Fold profiles for plain and thorn-insensitive matching; the trigrams are
+# taken from the coarser one so a single index serves both
+PROFILE = "search"
+THORN_PROFILE = "search-thorn"
+
+# Line columns indexed from heorot.parse
+LINE_FIELDS = ("OE", "ME")
+
+# Documents of the shortest posting list first intersected with the others
+# at once; later chunks double, so a limited search stops soon and a full
+# one still leaves most of the work to a few set operations
+CHUNK = 64
+
+# Candidate lines stop being narrowed at a trigram found in more than this
+# many times as many lines as are left; checking those lines is cheaper
+COMMON = 4
+
+HIGHLIGHT = ("«", "»")
+
+Span = Tuple[int, int]
+
+
+class Hit(NamedTuple):
+    """A line that matched a query."""
+
+    field: str  # 'OE', 'ME' or an edition name
+    line: int
+    text: str
+    spans: Tuple[Span, ...]  # (start, stop) of each match in text
+
+
+def _keyed(folded: str) -> str:
+    """Blank out everything but letters and digits, for taking trigrams."""
+    return "".join(char if char.isalnum() else " " for char in folded)
+
+
+def _trigrams(keyed: str) -> Set[str]:
+    """The distinct trigrams of a keyed string."""
+    return {keyed[i : i + 3] for i in range(len(keyed) - 2)}
+
+
+def _origins(text: str, fold: Normalizer) -> List[int]:
+    """
+    Map positions in a folded line back to the original text.
+
+    Returns:
+        For each folded character, the index of the character it came
+        from, followed by len(text)
+    """
+    origins = []
+    for index, char in enumerate(text):
+        origins.extend([index] * len(fold(char)))
+    origins.append(len(text))
+    return origins
+
+
+def _little_endian(values: array) -> bytes:
+    """The bytes of an array, in little-endian order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pack_strings(strings: Iterable[str]) -> bytes:
+    """Encode strings as their end offsets followed by their UTF-8."""
+    ends = array("I")
+    text = bytearray()
+    for string in strings:
+        text += string.encode("utf-8")
+        ends.append(len(text))
+    return _little_endian(ends) + text
+
+
+class _Unpacker:
+    """Reads the sections of an index file in order."""
+
+    def __init__(self, data: bytes, path: str) -> None:
+        self.data = memoryview(data)
+        self.path = path
+        self.offset = HEADER.size
+
+    def _take(self, size: int) -> memoryview:
+        """The next size bytes."""
+        if self.offset + size > len(self.data):
+            raise ValueError(f"{self.path} is a truncated search index")
+        section = self.data[self.offset : self.offset + size]
+        self.offset += size
+        return section
+
+    def array(self, typecode: str, count: int) -> array:
+        """The next count values of an array."""
+        values = array(typecode)
+        values.frombytes(self._take(values.itemsize * count))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def strings(self, count: int) -> List[str]:
+        """The next count strings."""
+        ends = self.array("I", count)
+        text = self._take(ends[-1] if count else 0)
+        starts = [0, *ends[:-1]]
+        return [str(text[start:end], "utf-8") for start, end in zip(starts, ends)]
+
+
+def highlight(
+    text: str, spans: Iterable[Span], marks: Tuple[str, str] = HIGHLIGHT
+) -> str:
+    """
+    Mark the matched spans of a line.
+
+    Args:
+        text: The line's text
+        spans: (start, stop) of each match, in order and not overlapping
+        marks: Strings to put before and after each match
+
+    Returns:
+        The text with every span wrapped in marks
+    """
+    parts = []
+    last = 0
+    for start, stop in spans:
+        parts += [text[last:start], marks[0], text[start:stop], marks[1]]
+        last = stop
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+class SearchIndex:
+    """Trigram inverted index over lines of text."""
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        columns: array,
+        numbers: array,
+        texts: Sequence[str],
+        trigrams: Sequence[str],
+        offsets: array,
+        postings: array,
+    ) -> None:
+        """
+        Set up an index from its arrays; use build() or load() to make one.
+
+        Args:
+            fields: Names of the indexed columns and editions
+            columns: For each document, its index in fields
+            numbers: For each document, its line number
+            texts: For each document, its text
+            trigrams: Every trigram in the index, sorted
+            offsets: Where each trigram's documents start in postings, plus
+                the total at the end
+            postings: Document numbers, ascending within each trigram
+        """
+        self.fields = tuple(fields)
+        self.columns = columns
+        self.numbers = numbers
+        self.texts = list(texts)
+        self.trigrams = list(trigrams)
+        self.offsets = offsets
+        self.postings = postings
+        self._slots: Dict[str, int] = {
+            trigram: slot for slot, trigram in enumerate(self.trigrams)
+        }
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __repr__(self) -> str:
+        return f"<SearchIndex: {len(self)} lines, {len(self.trigrams)} trigrams>"
+
+    @classmethod
+    def build(
+        cls,
+        lines: LineRecords,
+        editions: Optional[Mapping[str, Iterable[Mapping]]] = None,
+    ) -> "SearchIndex":
+        """
+        Index parsed lines and, optionally, other editions.
+
+        Args:
+            lines: Line data from heorot.parse; its OE and ME are indexed
+            editions: Line records by edition name, such as
+                editions.load_editions(); each edition's OE is indexed
+
+        Returns:
+            The index
+        """
+        documents: List[Tuple[int, int, str]] = []
+        for record in lines:
+            for column, field in enumerate(LINE_FIELDS):
+                if record[field]:
+                    documents.append((column, record["line"], record[field]))
+        fields = list(LINE_FIELDS)
+        for name, edition in (editions or {}).items():
+            fields.append(name)
+            documents.extend(
+                (len(fields) - 1, record["line"], record["OE"])
+                for record in getattr(edition, "lines", edition)
+                if record["OE"]
+            )
+
+        fold = get_normalizer(THORN_PROFILE)
+        by_trigram: Dict[str, List[int]] = {}
+        keys = fold.column(text for _, _, text in documents)
+        for document, folded in enumerate(keys):
+            for trigram in _trigrams(f" {_keyed(folded)} "):
+                by_trigram.setdefault(trigram, []).append(document)
+
+        trigrams = sorted(by_trigram)
+        offsets = array("i", [0])
+        postings = array("i")
+        for trigram in trigrams:
+            postings.extend(by_trigram[trigram])
+            offsets.append(len(postings))
+        return cls(
+            fields,
+            array("b", (column for column, _, _ in documents)),
+            array("i", (number for _, number, _ in documents)),
+            [text for _, _, text in documents],
+            trigrams,
+            offsets,
+            postings,
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a file.
+
+        Args:
+            path: Output file path
+        """
+        header = HEADER.pack(
+            MAGIC,
+            SEARCH_VERSION,
+            len(self.fields),
+            len(self),
+            len(self.trigrams),
+            len(self.postings),
+        )
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(header)
+            file.write(_pack_strings(self.fields))
+            file.write(_little_endian(self.columns))
+            file.write(_little_endian(self.numbers))
+            file.write(_pack_strings(self.texts))
+            file.write(_pack_strings(self.trigrams))
+            file.write(_little_endian(self.offsets))
+            file.write(_little_endian(self.postings))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchIndex":
+        """
+        Read an index written by save().
+
+        Args:
+            path: Index file path
+
+        Returns:
+            The index
+
+        Raises:
+            ValueError: If the file is not an index of this version
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is not a version {SEARCH_VERSION} search index")
+        magic, version, fields, documents, trigrams, postings = HEADER.unpack_from(
+            data, 0
+        )
+        if magic != MAGIC or version != SEARCH_VERSION:
+            raise ValueError(f"{path} is not a version {SEARCH_VERSION} search index")
+
+        unpacker = _Unpacker(data, path)
+        return cls(
+            unpacker.strings(fields),
+            unpacker.array("b", documents),
+            unpacker.array("i", documents),
+            unpacker.strings(documents),
+            unpacker.strings(trigrams),
+            unpacker.array("i", trigrams + 1),
+            unpacker.array("i", postings),
+        )
+
+    def _postings(self, trigram: str) -> Tuple[int, int]:
+        """Where a trigram's documents start and stop in postings."""
+        slot = self._slots.get(trigram)
+        if slot is None:
+            return 0, 0
+        return self.offsets[slot], self.offsets[slot + 1]
+
+    def _candidates(self, keyed: str) -> Iterator[int]:
+        """
+        Documents that hold every trigram of a keyed query, ascending.
+
+        The shortest posting list is taken in growing chunks, and each chunk
+        is intersected smallest-first with the stretch of every other list
+        between its first and last document, so a search that stops early
+        has only read as far as it needed.
+        """
+        runs = sorted(
+            map(self._postings, _trigrams(keyed)), key=lambda run: run[1] - run[0]
+        )
+        if not runs:  # too short to have a trigram: check everything
+            yield from range(len(self))
+            return
+        postings = self.postings
+        (first, last), others = runs[0], [list(run) for run in runs[1:]]
+        start, size = first, CHUNK
+        while start < last:
+            chunk = postings[start : min(start + size, last)]
+            start, size = start + size, 2 * size
+            found = set(chunk)
+            for run in others:
+                low = bisect_left(postings, chunk[0], run[0], run[1])
+                high = bisect_right(postings, chunk[-1], low, run[1])
+                run[0] = high  # later chunks start past this one
+                if not found or high - low > COMMON * len(found):
+                    break
+                found.intersection_update(postings[low:high])
+            yield from sorted(found)
+
+    def search(
+        self,
+        query: str,
+        prefix: bool = False,
+        thorn: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Hit]:
+        """
+        Find the lines containing a word or phrase.
+
+        Args:
+            query: Words to find, in any case and with or without accents
+            prefix: Let the last word of the query be the start of a longer word
+            thorn: Treat ð and þ, and ƿ and w, as the same letter
+            fields: Only search these columns or editions; None for all
+            limit: Stop after this many hits; None for all
+
+        Returns:
+            The matching lines, in index order (OE, ME, then each edition,
+            by line), with the position of every match
+
+        Raises:
+            ValueError: If a field is not in the index
+        """
+        fold = get_normalizer(THORN_PROFILE if thorn else PROFILE)
+        needle = fold(" ".join(query.split()))
+        if not needle:
+            return []
+        keyed = _keyed(get_normalizer(THORN_PROFILE)(needle))
+        pattern = re.escape(needle)
+        # a word character at either end of the query must not run on into
+        # a longer word, except at the end of a prefix query
+        if needle[0].isalnum():
+            keyed, pattern = " " + keyed, r"(?<!\w)" + pattern
+        if not prefix and needle[-1].isalnum():
+            keyed, pattern = keyed + " ", pattern + r"(?!\w)"
+        finditer = re.compile(pattern).finditer
+        wanted = None
+        if fields is not None:
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise ValueError(f"Not in the index: {', '.join(sorted(unknown))}")
+            wanted = {self.fields.index(field) for field in fields}
+
+        hits: List[Hit] = []
+        columns, texts = self.columns, self.texts
+        for document in self._candidates(keyed):
+            column = columns[document]
+            if wanted is not None and column not in wanted:
+                continue
+            text = texts[document]
+            folded = fold(text)
+            spans = tuple([match.span() for match in finditer(folded)])
+            if not spans:
+                continue
+            if len(folded) != len(text):
+                origins = _origins(text, fold)
+                spans = tuple((origins[start], origins[stop]) for start, stop in spans)
+            hits.append(Hit(self.fields[column], self.numbers[document], text, spans))
+            if limit is not None and len(hits) >= limit:
+                break
+        return hits
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Streaming sinks for the heorot pipeline.
+
+Each sink takes line records one at a time, as parse_stream yields
+them, and writes its output as the data arrives instead of waiting for the
+whole poem. The ASS sink holds at most one fitt and writes each fitt's file
+as soon as the fitt's last line in FITT_BOUNDARIES has gone past.
+
+    with JsonLinesSink("out.jsonl") as jsonl, CsvSink("out.csv") as table:
+        feed(parse_stream(html), [jsonl, table])
+"""
+
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import IO, Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import structlog
+
+from heorot import (
+    ASS_PARAMS,
+    DEFAULT_PARSER_BACKEND,
+    fetch_and_store,
+    load_ass_header,
+    parse_stream,
+    write_fitt_ass,
+)
+from numbering import FITT_BOUNDARIES, FITT_INDEX
+from timing import stage
+
+logger = structlog.get_logger()
+
+# stream_file's outputs, kept apart from the data/fitts and data/subtitles
+# files that do_file tracks in its build manifest
+STREAM_DIR = "data/stream"
+
+
+class Sink(ABC):
+    """Base class for a consumer of line records."""
+
+    @abstractmethod
+    def write(self, line: Mapping[str, Any]) -> None:
+        """
+        Consume one line record.
+
+        Args:
+            line: Line data with 'line', 'OE' and 'ME' keys
+        """
+
+    def close(self) -> None:
+        """Finish writing; called once after the last line."""
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class JsonLinesSink(Sink):
+    """Writes one JSON object per line of the poem."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the output file.
+
+        Args:
+            path: Output file path, conventionally ending in .jsonl
+        """
+        self.path = path
+        self._file: IO[str] = open(path, "w", encoding="utf-8")
+
+    def write(self, line: Mapping[str, Any]) -> None:
+        self._file.write(json.dumps(dict(line), ensure_ascii=False))
+        self._file.write("\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CsvSink(Sink):
+    """Writes CSV rows with a header taken from the first record's keys."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the output file.
+
+        Args:
+            path: Output file path
+        """
+        self.path = path
+        self._file: IO[str] = open(path, "w", newline="", encoding="utf-8")
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, line: Mapping[str, Any]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(line.keys()))
+            self._writer.writeheader()
+        self._writer.writerow(line)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class AssSink(Sink):
+    """Buffers the current fitt and writes its subtitle file once it ends."""
+
+    def __init__(
+        self,
+        output_file: Optional[str] = None,
+        fitt_ids: Optional[Iterable[int]] = None,
+    ) -> None:
+        """
+        Load the subtitle template.
+
+        Args:
+            output_file: Path template with a {fitt_id} field; defaults to
+                ASS_PARAMS["output_file"]
+            fitt_ids: Fitts to write; defaults to all of them
+        """
+        self.output_file = output_file or ASS_PARAMS["output_file"]
+        if fitt_ids is None:
+            fitt_ids = FITT_INDEX.fitt_ids
+        # the (0, 0) placeholder fitt 24 must not match line 0
+        self._starts: Dict[int, int] = {
+            FITT_BOUNDARIES[fitt_id][0]: fitt_id
+            for fitt_id in fitt_ids
+            if fitt_id in FITT_INDEX
+        }
+        self._header = load_ass_header()
+        self._fitt_id: Optional[int] = None
+        self._buffer: List[Mapping[str, Any]] = []
+        self.written: List[int] = []
+
+    def write(self, line: Mapping[str, Any]) -> None:
+        number = line["line"]
+        if self._fitt_id is None:
+            if number not in self._starts:
+                return  # outside the fitts being written
+            self._fitt_id = self._starts[number]
+
+        self._buffer.append(dict(line))
+        if number == FITT_BOUNDARIES[self._fitt_id][1]:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write the buffered fitt and start looking for the next one."""
+        fitt_id = self._fitt_id
+        assert fitt_id is not None
+        with stage("ass_fitt", fitt_id=fitt_id, lines=len(self._buffer)) as span:
+            span.fields["events"] = write_fitt_ass(
+                self._header,
+                fitt_id,
+                FITT_BOUNDARIES[fitt_id],
+                self._buffer,
+                self.output_file,
+            )
+        self.written.append(fitt_id)
+        self._fitt_id = None
+        self._buffer = []
+
+    def close(self) -> None:
+        if self._buffer:
+            logger.warning(
+                "input ended inside a fitt, not writing it",
+                fitt_id=self._fitt_id,
+                last_line=self._buffer[-1]["line"],
+            )
+            self._buffer = []
+
+
+def feed(lines: Iterable[Mapping[str, Any]], sinks: Sequence[Sink]) -> int:
+    """
+    Pass every line record to every sink, in order.
+
+    Args:
+        lines: Line records, typically from parse_stream
+        sinks: Consumers of the records
+
+    Returns:
+        Number of records fed
+    """
+    count = 0
+    for line in lines:
+        for sink in sinks:
+            sink.write(line)
+        count += 1
+    return count
+
+
+def stream_file(
+    filestem: str,
+    url: str,
+    backend: str = DEFAULT_PARSER_BACKEND,
+    fitt_ids: Optional[Iterable[int]] = None,
+    notes: bool = True,
+) -> int:
+    """
+    Fetch, parse and write JSON Lines, CSV and ASS output in one pass.
+
+    Unlike heorot.do_file this keeps no more than one fitt in memory and
+    always writes every output. It does not consult the build manifest, so
+    it writes under STREAM_DIR rather than over the files the manifest
+    tracks.
+
+    Args:
+        filestem: Base name for output files
+        url: URL to fetch HTML content from
+        backend: HTML parser backend, one of PARSER_BACKENDS
+        fitt_ids: Fitts to write subtitle files for; defaults to all of them
+        notes: Include editorial note references in the line outputs
+
+    Returns:
+        Number of lines written
+    """
+    with stage("fetch", refresh=False) as span:
+        html = fetch_and_store(url, f"data/fitts/{filestem}.html")
+        span.fields["chars"] = len(html)
+
+    os.makedirs(STREAM_DIR, exist_ok=True)
+    with stage("stream", backend=backend) as span:
+        with (
+            JsonLinesSink(f"{STREAM_DIR}/{filestem}.jsonl") as jsonl,
+            CsvSink(f"{STREAM_DIR}/{filestem}.csv") as table,
+            AssSink(f"{STREAM_DIR}/fitt_{{fitt_id}}.ass", fitt_ids) as subtitles,
+        ):
+            count = feed(parse_stream(html, backend, notes), [jsonl, table, subtitles])
+        span.fields["lines"] = count
+        span.fields["fitts"] = len(subtitles.written)
+    logger.info("streamed the file", filestem=filestem, linecount=count)
+    return count
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Fixtures shared by the test modules.
+"""
+
+import json
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def beowulf_data():
+    """Load Beowulf text data for testing."""
+    with open("data/fitts/maintext.json", "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for cross-edition line numbering.
+"""
+
+import pytest
+
+from voxbeowulf.alignment import (
+    EDITIONS,
+    Alignment,
+    NumberingMapper,
+    get_alignment,
+    get_mapper,
+    read_aligned,
+    token_code,
+    token_id,
+)
+
+OTHER_EDITIONS = [edition for edition in EDITIONS if edition != "heorot"]
+
+
+@pytest.fixture(scope="module")
+def mapper():
+    """The mapper built from the committed aligned.txt."""
+    return get_mapper()
+
+
+def test_reads_every_row():
+    """Every row should have five identifiers and five forms."""
+    rows = list(read_aligned())
+    assert len(rows) == 17302
+    assert rows[0] == ["0001a1"] * 5 + ["Hwæt!", "Hwæt!", "Hwæt!", "HWÆT:", "Hwæt,"]
+
+
+def _edition_text(edition):
+    """Read an edition's text file, applying the alignment.md rules."""
+
+    def half(text):
+        words = [word for word in text.split(" ") if word and word != "@"]
+        return " ".join(words).replace("_", " ")
+
+    lines = {}
+    with open(f"archive/data/{edition}.txt", "r", encoding="utf-8") as f:
+        for text in f:
+            number, _, text = text.rstrip("\n").partition(" ")
+            on, _, off = text.partition("     ")
+            lines[int(number)] = half(on) + ("     " + half(off) if half(off) else "")
+    return lines
+
+
+@pytest.mark.parametrize("edition", EDITIONS)
+def test_text_reconstructs_each_edition(edition):
+    """Every edition's lines should come back from its aligned forms."""
+    alignment = get_alignment()
+    expected = _edition_text(edition)
+    text = alignment.text(edition, 0, alignment.line_count(edition) + 1)
+    assert {number: text.get(number, "") for number in expected} == expected
+
+
+def test_text_by_range():
+    """A range should give only its own lines, with gaps and joins resolved."""
+    alignment = get_alignment()
+    assert alignment.text("perseus", 9, 10) == {
+        9: "oð þæt him ǣghwylc     ymbsittendra"
+    }
+    assert alignment.text("mit", 389, 392) == {
+        389: 'Deniga leodum."',
+        390: "     word inne abead:",
+        391: '"Eow het secgan     sigedrihten min,',
+    }
+    assert alignment.text("heorot", 4000, 4010) == {}
+
+
+def test_lookup_by_token():
+    """Any edition's token should find its aligned counterparts."""
+    alignment = get_alignment()
+    assert len(alignment) == 17302
+    row = alignment.lookup("mit", "0009a2")
+    assert row.forms["mit"] == "him"
+    assert row.ids["heorot"] == "0009a3"
+    # þæt is the second word of Heorot's oð_þæt
+    assert alignment.lookup("heorot", "0009a2").forms["mit"] == "oðþæt"
+    assert alignment.lookup("heorot", "0009b1").forms["perseus"] is None
+    assert alignment.lookup("perseus", "0009b1").forms["heorot"] == "ymbsittendra"
+    assert alignment.lookup("heorot", "0009a9") is None
+    with pytest.raises(ValueError):
+        alignment.lookup("heorot", "9a2")
+
+
+def test_token_codes_keep_order():
+    """Interned identifiers should round-trip and sort like the identifiers."""
+    ids = ["0001a1", "0009a2", "0009a3", "0009b1", "0010a1", "3184b2"]
+    codes = [token_code(token) for token in ids]
+    assert codes == sorted(codes)
+    assert [token_id(code) for code in codes] == ids
+
+
+def test_documented_offsets(mapper):
+    """The examples in alignment.md should translate as described there."""
+    # ebeowulf joins lines 389 and 390, and runs behind until it splits
+    # lines of its own from 1167 on
+    assert [mapper.from_heorot("ebeowulf", line) for line in (389, 390, 391)] == [
+        389,
+        389,
+        390,
+    ]
+    assert mapper.from_heorot("ebeowulf", 909) == 908
+    assert mapper.to_heorot("ebeowulf", 908) == 909
+    assert [mapper.from_heorot("ebeowulf", line) for line in (1166, 1167, 3182)] == [
+        1166,
+        1168,
+        3184,
+    ]
+    # Heorot starts line 516 with the word the others end line 515 on
+    assert mapper.from_heorot("mit", 516) == 515
+    assert mapper.translate(908, "ebeowulf", "perseus") == 909
+    assert mapper.line_counts["ebeowulf"] == 3184
+
+
+def test_round_trips(mapper):
+    """Only lines where an edition moves a line break should fail to round-trip."""
+    for edition in OTHER_EDITIONS:
+        moved = [
+            line
+            for line in range(1, 3183)
+            if mapper.to_heorot(edition, mapper.from_heorot(edition, line)) != line
+        ]
+        assert 516 in moved and len(moved) < 20
+
+
+def test_missing_lines_and_editions(mapper):
+    """Lines outside an edition give None; unknown editions raise."""
+    assert mapper.from_heorot("mit", 0) is None
+    assert mapper.from_heorot("mit", 3183) is None
+    assert mapper.to_heorot("heorot", 12) == 12
+    with pytest.raises(ValueError):
+        mapper.from_heorot("klaeber", 1)
+
+
+def test_gaps_fall_back_to_the_source_edition():
+    """A line whose tokens are all gaps elsewhere still maps to its position."""
+    mapper = NumberingMapper(
+        Alignment(
+            [
+                ["0001a1"] * 5 + ["a"] * 5,
+                [
+                    "0001b1",
+                    "0001b1",
+                    "0002a1",
+                    "0001b1",
+                    "0001b1",
+                    "@",
+                    "@",
+                    "b",
+                    "@",
+                    "@",
+                ],
+                ["0002a1", "0002a1", "0003a1", "0002a1", "0002a1"] + ["c"] * 5,
+            ]
+        )
+    )
+    assert mapper.from_heorot("mit", 2) == 1
+    assert mapper.from_heorot("mit", 3) == 2
+    assert mapper.to_heorot("mit", 2) == 3
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for ASS subtitle generation.
+"""
+
+import os
+
+import pysubs2
+import pytest
+
+from voxbeowulf.heorot import (
+    ASS_PARAMS,
+    SECONDS_PER_LINE,
+    ass_timestamp,
+    get_fitt,
+    write_ass,
+)
+from voxbeowulf.numbering import FITT_BOUNDARIES, LINE_NUMBER_MARKERS, MISSING_FITT
+
+
+def _read_all(directory):
+    """Read every generated subtitle file in a directory."""
+    contents = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            contents[name] = f.read()
+    return contents
+
+
+def test_parallel_matches_sequential(beowulf_data, tmp_path):
+    """A process pool should write the same bytes as the sequential path."""
+    sequential = tmp_path / "sequential"
+    parallel = tmp_path / "parallel"
+    sequential.mkdir()
+    parallel.mkdir()
+
+    write_ass(beowulf_data, workers=1, output_file=f"{sequential}/fitt_{{fitt_id}}.ass")
+    write_ass(beowulf_data, workers=2, output_file=f"{parallel}/fitt_{{fitt_id}}.ass")
+
+    expected = _read_all(sequential)
+    assert len(expected) == 43, "Every fitt except 24 should get a file"
+    assert "fitt_24.ass" not in expected
+    assert _read_all(parallel) == expected
+
+
+def _render_with_pysubs2(fitt_id, fitt):
+    """Render a fitt the way write_ass did with pysubs2 events."""
+    subs = pysubs2.load(ASS_PARAMS["blank_template"], encoding="UTF-8")
+    subs.clear()
+    subs.info["Fitt"] = str(fitt_id)
+    subs.info["First Line"] = fitt[0]["line"]
+    subs.info["Last Line"] = fitt[-1]["line"]
+
+    def event(text, start, style):
+        return pysubs2.SSAEvent(
+            start=pysubs2.make_time(s=start),
+            end=pysubs2.make_time(s=start + SECONDS_PER_LINE),
+            style=ASS_PARAMS[style],
+            name=style,
+            text=text,
+        )
+
+    for index, line in enumerate(fitt):
+        start = index * SECONDS_PER_LINE
+        subs.append(event(line["OE"], start, "original_style"))
+        subs.append(event(line["ME"], start, "modern_style"))
+        subs.append(event(line["line"], start, "all_number_style"))
+        if LINE_NUMBER_MARKERS.get(line["line"]):
+            marker = LINE_NUMBER_MARKERS[line["line"]]
+            subs.append(event(marker, start, "big_number_style"))
+        if line["line"] == FITT_BOUNDARIES[fitt_id][0]:
+            subs.append(event(FITT_BOUNDARIES[fitt_id][2], start, "fitt_heading_style"))
+    return subs.to_string("ass")
+
+
+@pytest.mark.parametrize("fitt_id", [0, 12, 43])
+def test_matches_pysubs2_output(beowulf_data, tmp_path, fitt_id):
+    """The direct writer should produce exactly what pysubs2 would save."""
+    write_ass(
+        beowulf_data, fitt_ids=[fitt_id], output_file=f"{tmp_path}/fitt_{{fitt_id}}.ass"
+    )
+    fitt = get_fitt(fitt_id, beowulf_data)
+    with open(tmp_path / f"fitt_{fitt_id}.ass", "r", encoding="utf-8") as f:
+        assert f.read() == _render_with_pysubs2(fitt_id, fitt)
+
+
+def test_get_fitt_rejects_the_placeholder(beowulf_data):
+    """Fitt 24 is not a fitt, so get_fitt should not return any lines for it."""
+    assert get_fitt(25, beowulf_data)[0]["line"] == FITT_BOUNDARIES[25][0]
+    with pytest.raises(IndexError):
+        get_fitt(MISSING_FITT, beowulf_data)
+
+
+def test_matches_committed_subtitles(beowulf_data, tmp_path):
+    """Every fitt should match the golden files in data/subtitles."""
+    write_ass(beowulf_data, output_file=f"{tmp_path}/fitt_{{fitt_id}}.ass")
+
+    for name, content in _read_all(tmp_path).items():
+        with open(os.path.join("data", "subtitles", name), "rb") as f:
+            golden = f.read()
+        # the committed files have had trailing whitespace stripped
+        stripped = b"\n".join(row.rstrip() for row in content.split(b"\n"))
+        assert stripped == golden, name
+
+
+@pytest.mark.parametrize("ms", [0, 4, 5, 994, 995, 4000, 59999, 3599995, 35999990])
+def test_timestamps_match_pysubs2(ms):
+    """Timestamps should round to centiseconds exactly as pysubs2 does."""
+    expected = pysubs2.formats.substation.SubstationFormat.ms_to_timestamp(ms)
+    assert ass_timestamp(ms / 1000) == expected
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Smoke tests for the benchmark suite.
+"""
+
+import os
+
+from voxbeowulf.benchmark import (
+    MEMORY_BUDGET_FILE,
+    Benchmark,
+    MemoryResult,
+    check_budget,
+    format_memory_report,
+    format_report,
+    load_baseline,
+    load_budget,
+    measure,
+    measure_memory,
+    percentile,
+    run_benchmarks,
+    run_memory_benchmarks,
+    save_baseline,
+    save_budget,
+)
+
+
+def test_percentile_nearest_rank():
+    """p95 of 1..20 should be 19 and a single sample should be its own p95."""
+    samples = list(range(1, 21))
+    assert percentile(samples, 0.95) == 19
+    assert percentile([3.0], 0.95) == 3.0
+
+
+def test_measure_reports_stats():
+    """measure should time every run and trace allocations once."""
+    calls = []
+    result = measure(Benchmark("append", lambda: calls.append(list(range(100)))), 3)
+    assert result.runs == 3
+    assert len(calls) == 5  # warm-up, three timed runs, one traced run
+    assert result.minimum <= result.median <= result.p95
+    assert result.peak_bytes > 0
+
+
+def test_pipeline_stage_in_scratch_tree(tmp_path):
+    """Pipeline benchmarks should run without touching the committed data."""
+    before = os.path.getmtime("data/fitts/maintext.json")
+    results = run_benchmarks(repeat=1, only=["get_fitt", "write_json"])
+    assert [result.name for result in results] == ["get_fitt", "write_json"]
+    assert os.path.getmtime("data/fitts/maintext.json") == before
+
+    baseline_path = str(tmp_path / "baseline.json")
+    save_baseline(results, baseline_path)
+    report = format_report(results, load_baseline(baseline_path))
+    assert "get_fitt" in report and "x" in report
+
+
+def test_measure_memory_finds_the_allocator():
+    """The traced peak and top site should point at the allocating line."""
+    held = []
+    result = measure_memory(Benchmark("grow", lambda: held.append(bytearray(2**22))))
+    assert result.traced_bytes >= 2**22
+    assert result.top[0].size >= 2**22
+    assert "test_benchmark.py" in result.top[0].location
+
+
+def test_memory_budget_round_trip(tmp_path):
+    """A saved budget should pass the run it came from and catch growth."""
+    results = run_memory_benchmarks(only=["get_fitt", "write_json"], top=3)
+    assert [result.name for result in results] == ["get_fitt", "write_json"]
+    assert all(len(result.top) <= 3 for result in results)
+
+    path = str(tmp_path / "budget.json")
+    save_budget(results, path)
+    budget = load_budget(path)
+    assert check_budget(results, budget) == []
+    assert "write_json" in format_memory_report(results, budget)
+
+    grown = MemoryResult("write_json", None, budget["write_json"]["traced_bytes"] + 1)
+    [failure] = check_budget([grown], budget)
+    assert failure.startswith("write_json: traced_bytes")
+
+
+def test_committed_budget_covers_every_stage():
+    """Every pipeline benchmark should have a committed memory budget."""
+    budget = load_budget(MEMORY_BUDGET_FILE)
+    for name in ("parse[html.parser]", "write_json", "write_ass", "run[cold]"):
+        assert budget[name]["traced_bytes"] > 0
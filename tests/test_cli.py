@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for the voxbeowulf command-line interface.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from voxbeowulf.cli import main
+from voxbeowulf.search import SearchIndex
+
+REPO = os.path.dirname(os.path.dirname(__file__))
+
+
+def test_lookup_line(capsys):
+    """A line lookup should print the line number, OE, ME and any notes."""
+    assert main(["lookup", "line", "1066"]) == 0
+    oe, me, notes = capsys.readouterr().out.splitlines()
+    assert oe.startswith("1066  ðonne healgamen")
+    assert me.strip() == "when a hall-performance Hrothgar's bard"
+    assert notes.strip() == "[1066-1162]"
+
+
+def test_lookup_fitt_json_matches_export(capsys):
+    """A fitt lookup with --json should print the exported records."""
+    with open("data/fitts/maintext.json", "r", encoding="utf-8") as f:
+        lines = json.load(f)
+
+    assert main(["lookup", "fitt", "12", "--json"]) == 0
+    records = json.loads(capsys.readouterr().out)
+    assert records == lines[records[0]["line"] : records[-1]["line"] + 1]
+
+
+def test_lookup_out_of_range(capsys):
+    """Unknown lines should fail with a message instead of a traceback."""
+    assert main(["lookup", "line", "5000"]) == 1
+    assert "no such line: 5000" in capsys.readouterr().err
+
+
+def test_lookup_rejects_unknown_fitt(capsys):
+    """Fitt 24 and negative ids are not fitts, so the lookup should fail."""
+    for fitt_id in ("24", "-1", "44"):
+        assert main(["lookup", "fitt", fitt_id]) == 2
+        assert f"no such fitt: {fitt_id}" in capsys.readouterr().err
+
+
+def test_lookup_skips_heavy_imports():
+    """A lookup should not import the pipeline or its HTML and HTTP stacks."""
+    script = (
+        "import sys, cli; cli.main(['lookup', 'line', '1066']); "
+        "print(sorted({'bs4', 'heorot', 'pysubs2', 'requests', 'structlog'} "
+        "& set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+def test_pipeline_commands_skip_build_imports():
+    """Commands other than build should not import the build's output stack."""
+    script = (
+        "import sys, cli; cli.main(['ass', '--fitt', '24']); "
+        "print(sorted({'corpus', 'database', 'editions', 'search', 'sqlite3', "
+        "'validation'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+def test_ass_rejects_unknown_fitt(capsys):
+    """There is no fitt 24, so asking for it should fail before parsing."""
+    assert main(["ass", "--fitt", "24"]) == 2
+    assert "no such fitt: 24" in capsys.readouterr().err
+
+
+def test_export_csv(tmp_path, monkeypatch):
+    """export csv should write the combined CSV to the requested path."""
+    os.makedirs(tmp_path / "data" / "fitts")
+    shutil.copy(
+        os.path.join(REPO, "data", "fitts", "maintext.html"),
+        tmp_path / "data" / "fitts",
+    )
+    monkeypatch.chdir(tmp_path)
+
+    assert main(["export", "csv", "--no-cache", "-o", "lines.csv"]) == 0
+    with open("lines.csv", "r", encoding="utf-8") as f:
+        rows = f.read().splitlines()
+    assert rows[0] == "line,OE,ME,notes"
+    assert len(rows) == 3184
+
+
+def test_diff_reports_changed_lines(tmp_path, capsys):
+    """diff should print each changed line and the fitts to rebuild."""
+    with open(os.path.join(REPO, "data", "fitts", "maintext.html"), "rb") as f:
+        html = f.read()
+    (tmp_path / "old.html").write_bytes(html)
+    (tmp_path / "new.html").write_bytes(html.replace(b"Hw\xc3\xa6t", b"Hwaet", 1))
+
+    assert main(["diff", str(tmp_path / "old.html"), str(tmp_path / "new.html")]) == 0
+    output = capsys.readouterr().out.splitlines()
+    assert output[0].startswith("-1     Hwæt")
+    assert any(row.startswith("+1     Hwaet") for row in output)
+    assert output[-1] == "fitts to rebuild: 0"
+
+
+def test_invalid_parse_fails_the_command(tmp_path, monkeypatch, capsys):
+    """A parse that breaks an integrity rule should stop before writing."""
+    os.makedirs(tmp_path / "data" / "fitts")
+    with open(os.path.join(REPO, "data", "fitts", "maintext.html"), "rb") as f:
+        html = f.read()
+    # drop the last table, losing the end of the poem
+    last_table = html.rindex(b'<table border="0" cellpadding="0" cellspacing="0"')
+    html = html[:last_table]
+    (tmp_path / "data" / "fitts" / "maintext.html").write_bytes(html)
+    monkeypatch.chdir(tmp_path)
+
+    assert main(["export", "json", "--no-cache", "--backend", "selectolax"]) == 1
+    assert "integrity violation" in capsys.readouterr().err
+    assert not os.path.exists("data/fitts/maintext.json")
+
+
+def test_variants_json(capsys):
+    """variants --json should print each differing token with its kinds."""
+    assert main(["variants", "909", "--no-cache", "--json"]) == 0
+    records = json.loads(capsys.readouterr().out)
+    to = next(record for record in records if record["token"] == "0909b1")
+    assert to["kinds"] == ["diacritics", "caesura"]
+    assert to["readings"]["heorot"] == "tó"
+
+
+def test_search_marks_matches(beowulf_data, tmp_path, capsys):
+    """search should print each matching line with the matches marked."""
+    index = str(tmp_path / "maintext.search")
+    SearchIndex.build(beowulf_data).save(index)
+
+    assert main(["search", "in", "GEARDAGUM", "--index", index]) == 0
+    assert capsys.readouterr().out == "1     OE Hwæt! Wé Gárdena «in géardagum»\n"
+
+    args = ["search", "hroþgar", "--thorn", "--json", "--limit", "1"]
+    assert main(args + ["--index", index]) == 0
+    (record,) = json.loads(capsys.readouterr().out)
+    assert record["line"] == 61 and record["spans"] == [[13, 20]]
+
+    assert main(["search", "beowulf", "--editions", "--index", index]) == 2
+    assert "does not index the editions" in capsys.readouterr().err
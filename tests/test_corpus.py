@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped binary corpus.
+"""
+
+import pytest
+
+from voxbeowulf.corpus import CorpusReader, write_corpus
+from voxbeowulf.numbering import FITT_BOUNDARIES
+
+
+def test_committed_corpus_matches_json(beowulf_data):
+    """The committed maintext.corpus should hold exactly the JSON lines."""
+    with CorpusReader("data/fitts/maintext.corpus") as corpus:
+        assert len(corpus) == len(beowulf_data)
+        assert corpus.range(0, len(corpus)) == beowulf_data
+
+
+def test_line_and_fitt_lookup(beowulf_data, tmp_path):
+    """Single lines and fitts should come straight from the mapped file."""
+    path = str(tmp_path / "lines.corpus")
+    write_corpus(beowulf_data, path)
+
+    with CorpusReader(path) as corpus:
+        assert corpus.line(1066) == beowulf_data[1066]
+        assert corpus[3182] == beowulf_data[3182]
+        start, end, _ = FITT_BOUNDARIES[12]
+        assert corpus.fitt(12) == beowulf_data[start : end + 1]
+        with pytest.raises(IndexError):
+            corpus.line(3183)
+        for fitt_id in (24, -1):
+            with pytest.raises(IndexError):
+                corpus.fitt(fitt_id)
+
+
+def test_notes_column(tmp_path):
+    """Notes should round-trip, keeping None distinct from empty text."""
+    lines = [
+        {"line": 0, "OE": "", "ME": "", "notes": None},
+        {"line": 1, "OE": "Hwæt!", "ME": "Listen!", "notes": ""},
+        {"line": 2, "OE": "þéodcyninga", "ME": "of those clan-kings", "notes": "r2"},
+    ]
+    path = str(tmp_path / "notes.corpus")
+    write_corpus(lines, path)
+    with CorpusReader(path) as corpus:
+        assert corpus.has_notes
+        assert corpus.range(0, 10) == lines
+
+
+def test_rejects_unnumbered_lines(tmp_path):
+    """Lines must be numbered from 0 so the entry table is indexed by line."""
+    with pytest.raises(ValueError):
+        write_corpus([{"line": 1, "OE": "", "ME": ""}], str(tmp_path / "x.corpus"))
+
+
+def test_rejects_other_files(tmp_path):
+    """Opening a file that is not a corpus should raise ValueError."""
+    path = tmp_path / "not.corpus"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        CorpusReader(str(path))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite corpus database.
+"""
+
+import sqlite3
+
+import pytest
+
+from voxbeowulf.database import CorpusDatabase, write_database
+from voxbeowulf.numbering import FITT_BOUNDARIES, LINE_NUMBER_MARKERS
+
+
+@pytest.fixture(scope="module")
+def database(beowulf_data, tmp_path_factory):
+    """A database written from the committed JSON."""
+    path = str(tmp_path_factory.mktemp("db") / "maintext.sqlite")
+    write_database(beowulf_data, path)
+    with CorpusDatabase(path) as db:
+        yield db
+
+
+def test_lines_round_trip(beowulf_data, database):
+    """Every line should come back exactly as it is in the JSON."""
+    assert len(database) == len(beowulf_data)
+    assert database.has_notes
+    assert database.range(0, len(beowulf_data)) == beowulf_data
+
+
+def test_line_and_fitt_lookup(beowulf_data, database):
+    """Point, range and fitt queries should match slices of the JSON."""
+    assert database.line(1066) == beowulf_data[1066]
+    assert database.range(1320, 1325) == beowulf_data[1320:1325]
+    start, end, name = FITT_BOUNDARIES[12]
+    assert database.fitt(12) == beowulf_data[start : end + 1]
+    assert database.fitt_of(start) == 12
+    assert database.fitt_of(0) is None
+    assert (12, name, start, end) in database.fitts()
+
+    with pytest.raises(IndexError):
+        database.line(3183)
+    with pytest.raises(IndexError):
+        database.fitt(24)
+
+
+def test_markers(database):
+    """Markers should be the numbering.py markers, filtered by line range."""
+    assert database.markers() == sorted(LINE_NUMBER_MARKERS.items())
+    assert database.markers(1790, 1800) == [(1792, 1792), (1797, 1797)]
+
+
+def test_search_ignores_accents_and_case(database):
+    """Search should match folded whole words in OE or ME."""
+    assert [line["line"] for line in database.search("GÁR-DENA")] == [1]
+    assert database.search("garden") == []
+    hits = database.search("Hróþgár", limit=3)
+    assert len(hits) == 3
+    assert all("Hróþgár" in line["OE"] or "Hrothgar" in line["ME"] for line in hits)
+
+
+def test_search_without_full_text_index(database):
+    """The plain column scan should agree with the FTS5 index."""
+    indexed = database.search("gardena")
+    database.full_text = False
+    try:
+        assert database.search("gardena") == indexed
+        assert database.search("garden") == []
+    finally:
+        database.full_text = True
+
+
+def test_rejects_other_files(tmp_path):
+    """Opening a database of another schema should raise ValueError."""
+    path = str(tmp_path / "other.sqlite")
+    sqlite3.connect(path).close()
+    with pytest.raises(ValueError):
+        CorpusDatabase(path)
+    with pytest.raises(FileNotFoundError):
+        CorpusDatabase(str(tmp_path / "missing.sqlite"))
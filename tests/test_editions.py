@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-edition loader.
+"""
+
+import pytest
+
+from voxbeowulf import editions as editions_module
+from voxbeowulf.alignment import CAESURA, EDITIONS, get_alignment
+from voxbeowulf.editions import EDITION_NAMES, load_editions, parse_edition
+from voxbeowulf.parse_cache import ParseCache
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """Every edition, loaded in this process."""
+    return load_editions(workers=1)
+
+
+def test_loads_every_edition(corpus):
+    """Each edition should keep all of its lines, sparse numbering included."""
+    assert list(corpus) == list(EDITION_NAMES)
+    assert {name: len(edition) for name, edition in corpus.items()} == {
+        "heorot": 3182,
+        "mit": 3182,
+        "mcmaster": 3182,
+        "perseus": 3182,
+        "ebeowulf": 3184,
+        "oldenglishaerobics": 1649,
+    }
+    assert corpus["heorot"].lines[0] == {
+        "line": 1,
+        "OE": "Hwæt! Wé Gárdena in géardagum",
+        "ME": "",
+    }
+    assert corpus.line("ebeowulf", 3184)["OE"] == "leodum liðost, ⁊ lofgeornost."
+    assert 114 in corpus["oldenglishaerobics"]
+    assert 115 not in corpus["oldenglishaerobics"]
+    assert 3183 not in corpus["heorot"]
+    with pytest.raises(IndexError):
+        corpus.line("heorot", 3183)
+    with pytest.raises(KeyError):
+        corpus.line("klaeber", 1)
+
+
+def test_halves(corpus):
+    """Lines should split at the caesura, with joins and gaps resolved."""
+    assert corpus.halves("perseus", 9) == ("oð þæt him ǣghwylc", "ymbsittendra")
+    assert corpus.halves("perseus", 909) == ("sē þe him bealwa tō", "bōte gelȳfde,")
+    assert corpus.halves("mit", 389) == ('Deniga leodum."', "")
+    assert corpus.halves("mit", 390) == ("", "word inne abead:")
+    assert corpus.line("mit", 390)["OE"] == "word inne abead:"
+    assert corpus["perseus"].words(9) == [
+        ("oð_þæt", 0),
+        ("him", 0),
+        ("ǣghwylc", 0),
+        ("ymbsittendra", 1),
+    ]
+
+
+def test_irregular_lines():
+    """A line without a caesura is all on-half; a bad number is an error."""
+    edition = parse_edition("test", "1 a_b @ c\n3 d     @ @\n")
+    assert edition.halves(1) == ("a b c", "")
+    assert edition.halves(3) == ("d", "")
+    assert edition.words(1) == [("a_b", 0), ("c", 0)]
+    assert 2 not in edition
+    with pytest.raises(ValueError):
+        parse_edition("test", "x a     b\n")
+
+
+@pytest.mark.parametrize("edition", EDITIONS)
+def test_matches_alignment(corpus, edition):
+    """The loader should agree with the text rebuilt from aligned.txt."""
+    aligned = get_alignment().text(edition, 0, 4000)
+    for number in corpus[edition].lines.numbers:
+        on, _, off = aligned.get(number, "").partition(CAESURA)
+        assert corpus.halves(edition, number) == (on, off)
+
+
+def test_parallel_matches_sequential(corpus):
+    """Loading in worker processes should give the same lines."""
+    parallel = load_editions(workers=2)
+    for name, edition in corpus.items():
+        assert parallel[name].lines == edition.lines
+        assert parallel[name].caesuras == edition.caesuras
+
+
+def test_cached_by_input_hash(corpus, tmp_path, monkeypatch):
+    """A second load of the same files should come from the cache."""
+    cache = ParseCache(str(tmp_path))
+    load_editions(cache=cache)
+
+    def fail(name, path=None):
+        raise AssertionError("reloaded a cached edition")
+
+    monkeypatch.setattr(editions_module, "load_edition", fail)
+    cached = load_editions(cache=cache)
+    assert cached.halves("perseus", 909) == corpus.halves("perseus", 909)
+    assert cached["ebeowulf"].lines == corpus["ebeowulf"].lines
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for fetch_and_store against a local stand-in for heorot.dk.
+"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from voxbeowulf.heorot import fetch_and_store
+
+PAGE = "<html><body>Hwæt! Wé Gárdena</body></html>"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serve PAGE gzip-compressed with an ETag, honouring If-None-Match."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if server.failures:
+            server.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = f'"v{server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        body = gzip.compress(server.page.encode("utf-8"))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Wed, 01 Jan 2025 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep test output quiet
+
+
+@pytest.fixture
+def stand_in():
+    """Run the stand-in server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.page = PAGE
+    server.version = 1
+    server.failures = 0
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/beowulf.html"
+
+
+def test_first_fetch_stores_page(stand_in, tmp_path):
+    """A missing file should be downloaded, decompressed and stored."""
+    filename = tmp_path / "page.html"
+    assert fetch_and_store(_url(stand_in), str(filename)) == PAGE
+    assert filename.read_text(encoding="utf-8") == PAGE
+    assert "gzip" in stand_in.requests[0]["Accept-Encoding"]
+
+
+def test_stored_copy_skips_request(stand_in, tmp_path):
+    """Without refresh, a stored copy should be used without any request."""
+    filename = tmp_path / "page.html"
+    filename.write_text("stored", encoding="utf-8")
+    assert fetch_and_store(_url(stand_in), str(filename)) == "stored"
+    assert stand_in.requests == []
+
+
+def test_refresh_revalidates_with_etag(stand_in, tmp_path):
+    """Refreshing an unchanged page should send If-None-Match and keep the copy."""
+    filename = tmp_path / "page.html"
+    fetch_and_store(_url(stand_in), str(filename))
+
+    assert fetch_and_store(_url(stand_in), str(filename), refresh=True) == PAGE
+    revalidation = stand_in.requests[-1]
+    assert revalidation["If-None-Match"] == '"v1"'
+    assert revalidation["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def test_refresh_replaces_changed_page(stand_in, tmp_path):
+    """Refreshing after an upstream change should store the new version."""
+    filename = tmp_path / "page.html"
+    fetch_and_store(_url(stand_in), str(filename))
+
+    stand_in.page = PAGE + "<!-- edited -->"
+    stand_in.version = 2
+    assert fetch_and_store(_url(stand_in), str(filename), refresh=True) == stand_in.page
+    assert filename.read_text(encoding="utf-8") == stand_in.page
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".part"] == []
+
+
+def test_retries_transient_errors(stand_in, tmp_path):
+    """A transient 503 should be retried by the shared session."""
+    stand_in.failures = 1
+    filename = tmp_path / "page.html"
+    assert fetch_and_store(_url(stand_in), str(filename)) == PAGE
+    assert len(stand_in.requests) == 2
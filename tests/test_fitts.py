@@ -6,21 +6,11 @@ Collection of validation rules and data integrity checks for ensuring
 the quality and consistency of Beowulf text data.
 """
 
-import json
 from typing import Dict, List, Optional, Self, TypedDict
 
-import pytest
-
 from voxbeowulf.numbering import FITT_BOUNDARIES
 
 
-@pytest.fixture
-def beowulf_data():
-    """Load Beowulf text data for testing."""
-    with open("data/fitts/maintext.json", "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 def test_line_numbering_sequential(beowulf_data):
     """Line numbers should be sequential starting from 0."""
     for i, line_data in enumerate(beowulf_data):
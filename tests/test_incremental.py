@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for table-level incremental reparsing.
+"""
+
+import zlib
+
+import pytest
+
+from voxbeowulf.heorot import available_backends, parse, split_tables
+from voxbeowulf.incremental import TableSnapshot, parse_incremental, reparse
+
+BACKEND = available_backends()[-1]
+
+
+@pytest.fixture(scope="module")
+def html():
+    """Load the committed heorot.dk HTML."""
+    with open("data/fitts/maintext.html", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def snapshot(html):
+    """Snapshot of the committed HTML."""
+    return TableSnapshot.build(html, BACKEND)
+
+
+def test_tables_reassemble_the_full_parse(html, snapshot):
+    """Parsing table by table should number the lines exactly as parse does."""
+    assert len(split_tables(html)) == 41
+    assert snapshot.lines() == parse(html, BACKEND)
+
+
+def test_edit_reparses_one_table(html, snapshot):
+    """A changed word should reparse only its table and report its fitt."""
+    edited = html.replace("Hwæt", "Hwaet", 1)
+    updated, diff = reparse(edited, snapshot, BACKEND)
+
+    assert diff.reparsed == [0]
+    assert diff.reused == 40
+    assert diff.renumbered_from is None
+    [change] = diff.changes
+    assert (change.kind, change.old_line, change.new_line) == ("changed", 1, 1)
+    assert change.new["OE"].startswith("Hwaet")
+    assert diff.fitts == [0]
+    assert updated.lines() == parse(edited, BACKEND)
+
+
+def test_inserted_row_renumbers_downstream(html, snapshot):
+    """An added line should shift every later line and report later fitts."""
+    line = html.index("'Ne frín þú")
+    row_start = html.rindex("<tr>", 0, line)
+    row = html[row_start : html.index("<tr>", line)].replace("Ne frín", "Ne fræn")
+    edited = html[:row_start] + row + html[row_start:]
+    updated, diff = reparse(edited, snapshot, BACKEND)
+
+    assert diff.reparsed == [20]
+    [change] = diff.changes
+    assert change.kind == "added"
+    assert change.new["OE"].startswith("'Ne fræn þú")
+    assert change.new_line == 1322
+    assert diff.renumbered_from == snapshot.offsets()[21] + 1
+    assert diff.fitts == list(range(20, 24)) + list(range(25, 44))
+    assert updated.lines() == parse(edited, BACKEND)
+    assert len(updated.lines()) == len(snapshot.lines()) + 1
+
+
+def test_parse_incremental_saves_snapshot(html, tmp_path):
+    """The first parse has nothing to diff; the next one reuses the snapshot."""
+    path = str(tmp_path / "tables.snapshot")
+    lines, diff = parse_incremental(html, path, BACKEND)
+    assert diff is None
+    assert lines == parse(html, BACKEND)
+
+    lines, diff = parse_incremental(html, path, BACKEND)
+    assert not diff
+    assert diff.reused == 41
+    assert TableSnapshot.load(path) == TableSnapshot.build(html, BACKEND)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"not a snapshot",
+        zlib.compress(b"cno_such_module\nTableSnapshot\n."),
+        zlib.compress(b"cos\nno_such_class\n."),
+    ],
+)
+def test_unreadable_snapshot_is_ignored(tmp_path, payload):
+    """A damaged or outdated snapshot should be treated as missing and removed."""
+    path = tmp_path / "tables.snapshot"
+    path.write_bytes(payload)
+    assert TableSnapshot.load(str(path)) is None
+    assert not path.exists()
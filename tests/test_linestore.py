@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar LineStore.
+"""
+
+import json
+import pickle
+import sys
+
+import pytest
+
+from voxbeowulf.linestore import LineStore, LineView
+from voxbeowulf.numbering import FITT_BOUNDARIES
+
+
+@pytest.fixture(scope="module")
+def store(beowulf_data):
+    """Pack the committed lines into a LineStore."""
+    return LineStore.from_records(beowulf_data)
+
+
+def test_round_trip(store, beowulf_data):
+    """A store should compare equal to, and unpack to, the source records."""
+    assert store == beowulf_data
+    assert store.to_records() == beowulf_data
+    assert json.loads(json.dumps(store.to_records())) == beowulf_data
+
+
+def test_records_behave_like_dicts(store, beowulf_data):
+    """Line records should support the dict access existing callers use."""
+    record = store[1]
+    assert record["line"] == 1
+    assert record["OE"] == beowulf_data[1]["OE"]
+    assert list(record.keys()) == ["line", "OE", "ME", "notes"]
+    assert record == beowulf_data[1]
+    assert store[-1]["line"] == 3182
+    assert record["notes"] is None
+    with pytest.raises(KeyError):
+        record["fitt"]
+
+
+def test_fitt_view_is_zero_copy(store, beowulf_data):
+    """Fitt views should share the store and match a list slice."""
+    start, end, _ = FITT_BOUNDARIES[3]
+    view = store.fitt(3)
+    assert isinstance(view, LineView)
+    assert view.store is store
+    assert view == beowulf_data[start : end + 1]
+    assert view[1:3] == beowulf_data[start + 1 : start + 3]
+    assert list(view.numbers) == list(range(start, end + 1))
+
+
+def test_no_fitt_24(store):
+    """The sentinel fitt 24 and out-of-range ids are not fitts."""
+    for fitt_id in (24, -1, 44):
+        with pytest.raises(IndexError):
+            store.fitt(fitt_id)
+
+
+def test_notes_column_keeps_none(store):
+    """A notes column should distinguish missing notes from empty ones."""
+    with_notes = LineStore.from_records(
+        [
+            {"line": 0, "OE": "", "ME": "", "notes": None},
+            {"line": 1, "OE": "a", "ME": "b", "notes": ""},
+            {"line": 2, "OE": "c", "ME": "d", "notes": "see r2"},
+        ]
+    )
+    assert [record["notes"] for record in with_notes] == [None, "", "see r2"]
+    assert "notes" in with_notes[0]
+
+
+def test_pickling(store):
+    """Stores should pickle whole; views should pickle only their lines."""
+    assert pickle.loads(pickle.dumps(store)) == store
+    view = store.fitt(1)
+    restored = pickle.loads(pickle.dumps(view))
+    assert restored == view
+    assert len(pickle.dumps(view)) < len(pickle.dumps(store))
+
+
+def test_smaller_than_dicts(store, beowulf_data):
+    """The packed columns should take a fraction of the dict list's memory."""
+    dict_bytes = sys.getsizeof(beowulf_data) + sum(
+        sys.getsizeof(record) + sum(sys.getsizeof(v) for v in record.values())
+        for record in beowulf_data
+    )
+    assert store.nbytes() * 2 < dict_bytes
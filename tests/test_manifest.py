@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental build manifest.
+"""
+
+import os
+import shutil
+
+from voxbeowulf.heorot import do_file
+from voxbeowulf.manifest import BuildManifest, digest
+
+REPO_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def test_needs_build_until_recorded(tmp_path):
+    """An artifact should be fresh only once recorded with the same inputs."""
+    artifact = tmp_path / "out.txt"
+    artifact.write_text("hello")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+
+    assert manifest.needs_build(str(artifact), digest("a"))
+    manifest.record(str(artifact), digest("a"))
+    assert not manifest.needs_build(str(artifact), digest("a"))
+    assert manifest.needs_build(str(artifact), digest("b"))
+
+
+def test_modified_output_is_stale(tmp_path):
+    """Editing an output by hand should force it to be rebuilt."""
+    artifact = tmp_path / "out.txt"
+    artifact.write_text("hello")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    manifest.record(str(artifact), digest("a"))
+    manifest.save()
+
+    artifact.write_text("edited")
+    reloaded = BuildManifest.load(str(tmp_path / "manifest.json"))
+    assert reloaded.needs_build(str(artifact), digest("a"))
+
+
+def test_do_file_skips_fresh_outputs(tmp_path, monkeypatch):
+    """A rerun should rebuild only the outputs that went stale."""
+    os.makedirs(tmp_path / "data" / "fitts")
+    os.makedirs(tmp_path / "data" / "subtitles")
+    shutil.copy(os.path.join(REPO_DATA, "blank.ass"), tmp_path / "data")
+    shutil.copy(
+        os.path.join(REPO_DATA, "fitts", "maintext.html"), tmp_path / "data" / "fitts"
+    )
+    monkeypatch.chdir(tmp_path)
+
+    do_file("maintext", "http://localhost/unused")
+    first_mtime = os.path.getmtime("data/fitts/maintext.json")
+    os.remove("data/subtitles/fitt_7.ass")
+
+    manifest = do_file("maintext", "http://localhost/unused")
+    assert manifest.built == ["data/subtitles/fitt_7.ass"]
+    assert len(manifest.skipped) == 46
+    assert os.path.exists("data/subtitles/fitt_7.ass")
+    assert os.path.getmtime("data/fitts/maintext.json") == first_mtime
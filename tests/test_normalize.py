@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the normalization engine.
+"""
+
+import re
+import unicodedata
+
+import pytest
+
+from voxbeowulf.normalize import (
+    FOLD_PROFILES,
+    Normalizer,
+    clean_cell,
+    collapse_whitespace,
+    get_normalizer,
+)
+
+CELLS = [
+    "Hwæt!   Wé\nGárdena &nbsp;&nbsp;&nbsp;&nbsp; in géardagum",
+    "Béowulf wæs\nbréme \xa0\xa0\xa0\xa0 --blaéd wíde sprang--",
+    "--the dark death-shade-- \n      \xa0\xa0\xa0\xa0 warriors old and young;",
+    "  \t ",
+    "",
+]
+
+
+@pytest.mark.parametrize("raw", CELLS)
+def test_clean_cell_matches_the_old_rules(raw):
+    """The one-pass cell rule should equal the replace, re.sub and strip chain."""
+    old = re.sub(r"\s+", " ", raw.replace("&nbsp;", " ")).strip()
+    assert collapse_whitespace(raw) == old
+    assert clean_cell(raw) == old.replace("--", " ")
+
+
+def test_match_profile_lines_up_editions():
+    """The same line in three editions should fold to one form."""
+    match = get_normalizer("match")
+    assert {
+        match("Hwæt! Wé Gárdena     in géardagum"),
+        match("HWÆT: WE GAR-DENA     IN GEARDAGUM"),
+        match("Hwæt, wē Gār-Dena in gēardagum,"),
+    } == {"hwæt we gardena in geardagum"}
+    assert match("hú ðá æþelingas") == "hu þa æþelingas"
+
+
+def test_fold_profiles():
+    """Each profile should fold only what it names."""
+    text = "Denigea léodum· ǣr ȳð"
+    assert Normalizer("none")(text) == text
+    assert Normalizer("diacritics")(text) == "Denigea leodum· ær yð"
+    assert Normalizer("ascii")(text) == "Denigea leodum· aer yth"
+    assert Normalizer("search")(text) == "denigea leodum· ær yð"
+    assert Normalizer("search-thorn")(text) == "denigea leodum· ær yþ"
+    assert set(FOLD_PROFILES) == {
+        "none",
+        "diacritics",
+        "match",
+        "search",
+        "search-thorn",
+        "ascii",
+    }
+
+    with pytest.raises(ValueError):
+        Normalizer("klingon")
+
+
+def test_nfc_composes_before_folding():
+    """Decomposed input should give the same result as composed input."""
+    decomposed = unicodedata.normalize("NFD", "géardagum")
+    assert Normalizer(nfc=True)(decomposed) == "géardagum"
+    assert Normalizer("diacritics")(decomposed) == "geardagum"
+
+
+def test_column_matches_single_values_and_caches():
+    """A column folded in one pass should equal folding each value alone."""
+    values = ["Hwæt! Wé", None, "Gár-Dena", "Hwæt! Wé", "þrym gefrúnon·"]
+    column = Normalizer("match")
+    single = Normalizer("match")
+    assert column.column(values) == [
+        None if value is None else single(value) for value in values
+    ]
+    assert column.cache_size() == 3
+    assert get_normalizer("match") is get_normalizer("match")
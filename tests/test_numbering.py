@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the fitt interval index.
+"""
+
+import pytest
+
+from voxbeowulf.numbering import (
+    FITT_BOUNDARIES,
+    FITT_INDEX,
+    LINE_NUMBER_MARKERS,
+    MISSING_FITT,
+    FittIndex,
+    FittSlice,
+)
+
+
+def _scan_fitt_of(line):
+    """The linear scan the index replaces."""
+    for fitt_id, (start, end, _) in enumerate(FITT_BOUNDARIES):
+        if fitt_id != MISSING_FITT and start <= line <= end:
+            return fitt_id
+    return None
+
+
+def test_fitt_of_matches_a_linear_scan():
+    """Every line should land in the same fitt as a scan of the boundaries."""
+    for line in range(-1, 3185):
+        assert FITT_INDEX.fitt_of(line) == _scan_fitt_of(line)
+    assert FITT_INDEX.fitt_of(0) is None
+
+
+def test_placeholder_fitt_is_left_out():
+    """Fitt 24 should be neither listed nor contained."""
+    assert MISSING_FITT not in FITT_INDEX
+    assert FITT_INDEX.fitt_ids == [
+        fitt_id for fitt_id in range(len(FITT_BOUNDARIES)) if fitt_id != MISSING_FITT
+    ]
+    assert 12 in FITT_INDEX and 44 not in FITT_INDEX and -1 not in FITT_INDEX
+    assert FITT_INDEX.lines_of(25) == FittSlice(25, 1651, 1740)
+    assert FITT_INDEX.name_of(25) == FITT_BOUNDARIES[25][2]
+    for fitt_id in (MISSING_FITT, 44, -1):
+        with pytest.raises(IndexError):
+            FITT_INDEX.lines_of(fitt_id)
+        with pytest.raises(IndexError):
+            FITT_INDEX.name_of(fitt_id)
+
+
+def test_split_across_fitts():
+    """Ranges should split at fitt boundaries, skipping lines in no fitt."""
+    assert FITT_INDEX.split(0, 60) == [FittSlice(0, 1, 53), FittSlice(1, 53, 60)]
+    # the range spans the gap in numbering where fitt 24 would be
+    assert FITT_INDEX.split(1640, 1660) == [
+        FittSlice(23, 1640, 1651),
+        FittSlice(25, 1651, 1660),
+    ]
+    assert FITT_INDEX.split(800, 810) == [FittSlice(12, 800, 810)]
+    assert FITT_INDEX.split(3180, 4000) == [FittSlice(43, 3180, 3183)]
+    assert FITT_INDEX.split(10, 10) == []
+
+    whole = FITT_INDEX.split(0, 3183)
+    assert [piece.fitt for piece in whole] == FITT_INDEX.fitt_ids
+    assert sum(piece.stop - piece.start for piece in whole) == 3182
+
+
+def test_marker_lookup():
+    """Markers should be found around any line, including the offset quirks."""
+    assert FITT_INDEX.previous_marker(4) is None
+    assert FITT_INDEX.previous_marker(5) == (5, 5)
+    assert FITT_INDEX.next_marker(5) == (10, 10)
+    assert FITT_INDEX.previous_marker(390) == (385, 385)
+    assert FITT_INDEX.next_marker(385) == (391, 391)
+    assert FITT_INDEX.next_marker(3178) is None
+    assert FITT_INDEX.markers(1790, 1800) == [(1792, 1792), (1797, 1797)]
+    assert FITT_INDEX.markers(0, 3183) == sorted(LINE_NUMBER_MARKERS.items())
+
+
+def test_custom_boundaries():
+    """An index can be built over other boundaries and markers."""
+    index = FittIndex([(1, 3, "a"), (4, 9, "b")], {2: 7})
+    lines = (0, 1, 3, 4, 9, 10)
+    assert [index.fitt_of(line) for line in lines] == [None, 0, 0, 1, 1, None]
+    assert index.split(2, 6) == [FittSlice(0, 2, 4), FittSlice(1, 4, 6)]
+    assert index.next_marker(0) == (2, 7)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed parse cache.
+"""
+
+import os
+import time
+import zlib
+
+import pytest
+
+from voxbeowulf.parse_cache import CACHE_SUFFIX, ParseCache
+
+LINES = [
+    {"line": 0, "OE": "", "ME": ""},
+    {"line": 1, "OE": "Hwæt! Wé Gárdena in géardagum", "ME": "Listen!"},
+]
+
+
+def test_round_trip(tmp_path):
+    """A stored result should come back unchanged for the same HTML."""
+    cache = ParseCache(str(tmp_path))
+    cache.put("<html>a</html>", "1", LINES)
+    assert cache.get("<html>a</html>", "1") == LINES
+
+
+def test_miss_on_changed_html_or_version(tmp_path):
+    """Changing the HTML or the parser version should miss."""
+    cache = ParseCache(str(tmp_path))
+    cache.put("<html>a</html>", "1", LINES)
+    assert cache.get("<html>b</html>", "1") is None
+    assert cache.get("<html>a</html>", "2") is None
+
+
+def test_corrupt_entry_discarded(tmp_path):
+    """An unreadable entry should be treated as a miss and removed."""
+    cache = ParseCache(str(tmp_path))
+    path = cache.put("<html>a</html>", "1", LINES)
+    with open(path, "wb") as f:
+        f.write(b"not zlib")
+    assert cache.get("<html>a</html>", "1") is None
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize(
+    "stale",
+    [
+        b"cno_such_module\nLineStore\n.",  # module gone
+        b"cos\nno_such_class\n.",  # class gone
+        b"cos\ngetcwd\n(I1\ntR.",  # constructor takes other arguments
+    ],
+)
+def test_stale_pickle_discarded(tmp_path, stale):
+    """An entry pickled against older code should be a miss and removed."""
+    cache = ParseCache(str(tmp_path))
+    path = cache.put("<html>a</html>", "1", LINES)
+    with open(path, "wb") as f:
+        f.write(zlib.compress(stale))
+    assert cache.get("<html>a</html>", "1") is None
+    assert not os.path.exists(path)
+
+    path = cache.put_entry("variants", "key", LINES)
+    with open(path, "wb") as f:
+        f.write(zlib.compress(stale))
+    assert cache.get_entry("variants", "key") is None
+    assert not os.path.exists(path)
+
+
+def test_evicts_oldest_over_budget(tmp_path):
+    """Entries beyond the size budget should be evicted oldest first."""
+    cache = ParseCache(str(tmp_path))
+    old = cache.put("<html>old</html>", "1", LINES)
+    past = time.time() - 60
+    os.utime(old, (past, past))
+
+    cache.max_bytes = os.path.getsize(old) + 1
+    new = cache.put("<html>new</html>", "1", LINES)
+    assert not os.path.exists(old)
+    assert os.path.exists(new)
+
+
+def test_evicts_expired(tmp_path):
+    """Entries unused for longer than max_age should be evicted."""
+    cache = ParseCache(str(tmp_path), max_age=3600)
+    stale = cache.put("<html>stale</html>", "1", LINES)
+    past = time.time() - 7200
+    os.utime(stale, (past, past))
+
+    assert cache.evict() == [stale]
+    assert not any(name.endswith(CACHE_SUFFIX) for name in os.listdir(tmp_path))
+
+
+def test_keyed_entries(tmp_path):
+    """Other results should round-trip apart from parses and each other."""
+    cache = ParseCache(str(tmp_path))
+    path = cache.put_entry("variants", "abc123", {"9": []})
+    assert cache.get_entry("variants", "abc123") == {"9": []}
+    assert cache.get_entry("editions", "abc123") is None
+    assert cache.get("abc123", "1") is None
+    assert os.path.dirname(path) == str(tmp_path / "variants")
+
+
+def test_keyed_entries_have_their_own_budget(tmp_path):
+    """Filling a namespace should not evict parse results."""
+    cache = ParseCache(str(tmp_path))
+    parsed = cache.put("<html>a</html>", "1", LINES)
+    cache.max_bytes = 1
+    first = cache.put_entry("variants", "first", LINES)
+    past = time.time() - 60
+    os.utime(first, (past, past))
+    second = cache.put_entry("variants", "second", LINES)
+    assert os.path.exists(parsed) and os.path.exists(second)
+    assert not os.path.exists(first)
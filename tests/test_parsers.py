@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Parity checks for the heorot.parse HTML backends.
+
+Every installed backend must reproduce the html.parser output record for
+record, so the fastest one can be used without the data drifting.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from voxbeowulf import heorot
+from voxbeowulf.heorot import (
+    available_backends,
+    compare_backends,
+    parse,
+    parse_parallel,
+)
+
+REPO = os.path.dirname(os.path.dirname(__file__))
+
+
+@pytest.fixture(scope="module")
+def maintext_html():
+    """Load the committed heorot.dk HTML."""
+    with open("data/fitts/maintext.html", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def reference_lines(maintext_html):
+    """Lines parsed with the pure-Python backend."""
+    return parse(maintext_html, "html.parser")
+
+
+def test_reference_matches_committed_json(reference_lines):
+    """html.parser output should match the committed maintext.json."""
+    with open("data/fitts/maintext.json", "r", encoding="utf-8") as f:
+        assert reference_lines == json.load(f)
+
+
+@pytest.mark.parametrize("backend", ["lxml", "selectolax"])
+def test_backend_parity(backend, maintext_html, reference_lines):
+    """Each optional backend should yield all 3183 records unchanged."""
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+
+    lines = parse(maintext_html, backend)
+    assert len(lines) == 3183
+    for expected, actual in zip(reference_lines, lines):
+        assert actual == expected, f"Line {expected['line']} differs under {backend}"
+
+
+def test_first_line_translation(reference_lines):
+    """Line 1 should not pick up the translation of the last line in its table."""
+    assert reference_lines[1]["ME"].startswith("Listen!")
+
+
+def test_unknown_backend_rejected():
+    """An unknown backend name should raise ValueError."""
+    with pytest.raises(ValueError):
+        parse("<html></html>", "html5lib")
+
+
+def test_compare_backends_times_each(maintext_html):
+    """compare_backends should report a timing for every available backend."""
+    timings = compare_backends(maintext_html)
+    assert set(timings) == set(available_backends())
+
+
+def test_notes_captured_on_their_rows(reference_lines):
+    """Note references should land on their rows without disturbing the text."""
+    notes = {line["line"]: line["notes"] for line in reference_lines if line["notes"]}
+    assert len(notes) == 23
+    assert notes[26] == "26-52"
+    assert notes[1177] == "1177-87"
+    # the note div at 1177 wraps this row's ME span
+    assert reference_lines[1177]["ME"] == "the bright ring-hall; enjoy, while you may,"
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_notes_can_be_skipped(backend, maintext_html, reference_lines):
+    """Without notes the lines should be the same but for the notes key."""
+    lines = parse(maintext_html, backend, notes=False)
+    assert lines.fields == ("line", "OE", "ME")
+    assert lines == [
+        {key: line[key] for key in ("line", "OE", "ME")} for line in reference_lines
+    ]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_parallel_parse_parity(backend, maintext_html, reference_lines):
+    """Parsing tables in a process pool should match the serial parse."""
+    lines = parse_parallel(maintext_html, backend, workers=2)
+    assert lines.fields == reference_lines.fields
+    assert lines == reference_lines
+
+
+class _DebugRecorder:
+    """Stands in for heorot's logger, keeping each debug event."""
+
+    def __init__(self):
+        self.events = []
+
+    def debug(self, event, **fields):
+        self.events.append(dict(fields, event=event))
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("workers", [1, 2])
+def test_long_rows_logged_by_poem_line(backend, workers, maintext_html, monkeypatch):
+    """Long rows should be logged with their line in the poem, not the table."""
+    recorder = _DebugRecorder()
+    monkeypatch.setattr(heorot, "logger", recorder)
+    parse_parallel(maintext_html, backend, workers=workers)
+    assert [
+        event["line"] for event in recorder.events if event["event"] == "long row found"
+    ] == [662, 1893, 2275, 2289, 2291, 2564, 3151]
+
+
+def test_parse_is_quiet_by_default():
+    """A library caller that has not set up logging should see no debug events."""
+    script = (
+        "import heorot; "
+        "heorot.parse(open('data/fitts/maintext.html', encoding='utf-8').read())"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert (result.stdout, result.stderr) == ("", "")
+
+
+def test_parallel_parse_keeps_dedupe(maintext_html):
+    """A repeated row should still be dropped when its table is parsed alone."""
+    line = maintext_html.index("'Ne frín þú")
+    row_start = maintext_html.rindex("<tr>", 0, line)
+    row = maintext_html[row_start : maintext_html.index("<tr>", line)]
+    doubled = maintext_html[:row_start] + row + maintext_html[row_start:]
+    backend = available_backends()[-1]
+
+    assert parse_parallel(doubled, backend, workers=2) == parse(doubled, backend)
+    assert len(parse(doubled, backend)) == 3183
+
+
+def test_parallel_parse_rejects_unknown_backend():
+    """An unknown backend should fail before any process starts."""
+    with pytest.raises(ValueError):
+        parse_parallel("<html></html>", "html5lib", workers=2)
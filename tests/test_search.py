@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the trigram search index.
+"""
+
+import re
+import unicodedata
+
+import pytest
+
+from voxbeowulf.editions import load_editions
+from voxbeowulf.normalize import get_normalizer
+from voxbeowulf.search import SearchIndex, highlight
+
+
+@pytest.fixture(scope="module")
+def index(beowulf_data):
+    """An index of the committed JSON's OE and ME."""
+    return SearchIndex.build(beowulf_data)
+
+
+def _found(hits):
+    """(field, line, highlighted text) of each hit."""
+    return [(hit.field, hit.line, highlight(hit.text, hit.spans)) for hit in hits]
+
+
+def test_accents_and_case_are_ignored(index):
+    """Any spelling of the accents should find the same words."""
+    expected = [("OE", 1, "Hwæt! Wé «Gárdena» in géardagum")]
+    assert _found(index.search("gardena")) == expected
+    assert _found(index.search("GĀRDENA")) == expected
+    decomposed = unicodedata.normalize("NFD", "Gárdena")
+    assert _found(index.search(decomposed)) == expected
+
+
+def test_phrases_match_whole_words(index):
+    """A phrase should match across words, but not inside a longer word."""
+    assert _found(index.search("in  géardagum")) == [
+        ("OE", 1, "Hwæt! Wé Gárdena «in géardagum»")
+    ]
+    assert index.search("geard") == []
+    assert _found(index.search("spear-danes", fields=["ME"]))[0] == (
+        "ME",
+        1,
+        "Listen! We  of the «Spear-Danes» in the days of yore,",
+    )
+
+
+def test_prefix(index):
+    """A prefix query should match the start of a longer word."""
+    hits = index.search("geard", prefix=True)
+    assert ("OE", 1, "Hwæt! Wé Gárdena in «géard»agum") in _found(hits)
+    assert all(hit.field == "OE" for hit in hits)
+    assert index.search("dagum", prefix=True, fields=["OE"])[0].line != 1
+
+
+def test_thorn_folding_is_optional(index):
+    """ð and þ should only match each other when asked to."""
+    plain = {hit.line for hit in index.search("hróþgár")}
+    thorn = {hit.line for hit in index.search("hróþgár", thorn=True)}
+    assert 152 in plain and 61 not in plain
+    assert plain < thorn and 61 in thorn
+
+
+def test_every_match_is_highlighted(index):
+    """Each occurrence on a line should get its own span."""
+    hit = next(hit for hit in index.search("ond", fields=["OE"]) if len(hit.spans) > 1)
+    assert {hit.text[start:stop] for start, stop in hit.spans} == {"ond"}
+
+
+@pytest.mark.parametrize("query", ["wé", "a", "beowulf", "hróðgár", "þæt wæs"])
+def test_agrees_with_a_scan(index, beowulf_data, query):
+    """The trigram lookup should find exactly the lines a full scan finds."""
+    fold = get_normalizer("search")
+    pattern = re.compile(r"(?<!\w)" + re.escape(fold(query)) + r"(?!\w)")
+    expected = [
+        record["line"] for record in beowulf_data if pattern.search(fold(record["OE"]))
+    ]
+    assert [hit.line for hit in index.search(query, fields=["OE"])] == expected
+
+
+def test_limit_and_unknown_fields(index):
+    """limit should stop the search; an unknown field is an error."""
+    assert len(index.search("beowulf", limit=3)) == 3
+    assert index.search("and the", limit=10) == index.search("and the")[:10]
+    assert index.search("the", limit=200) == index.search("the")[:200]
+    assert index.search(" ") == []
+    with pytest.raises(ValueError):
+        index.search("beowulf", fields=["klaeber"])
+
+
+def test_save_and_load(index, tmp_path):
+    """A saved index should load and answer like the original."""
+    path = str(tmp_path / "maintext.search")
+    index.save(path)
+    loaded = SearchIndex.load(path)
+    assert loaded.search("beowulf") == index.search("beowulf")
+
+    (tmp_path / "other").write_bytes(b"not an index")
+    with pytest.raises(ValueError):
+        SearchIndex.load(str(tmp_path / "other"))
+
+    with open(path, "rb") as f:
+        (tmp_path / "truncated").write_bytes(f.read()[:-1])
+    with pytest.raises(ValueError):
+        SearchIndex.load(str(tmp_path / "truncated"))
+
+
+def test_editions(beowulf_data, tmp_path):
+    """Other editions should be searchable under their own names."""
+    index = SearchIndex.build(beowulf_data, load_editions())
+    found = {hit.field: hit for hit in index.search("ymbsittendra")}
+    assert set(found) == {
+        "OE",
+        "heorot",
+        "mit",
+        "mcmaster",
+        "perseus",
+        "ebeowulf",
+        "oldenglishaerobics",
+    }
+    assert found["ebeowulf"].line == 9
+    assert index.search("ǣghwylc", fields=["perseus"])[0].line == 9
+
+    path = str(tmp_path / "maintext.editions.search")
+    index.save(path)
+    assert SearchIndex.load(path).search("ǣghwylc", fields=["perseus"])[0].line == 9
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming parse and its sinks.
+"""
+
+import itertools
+import json
+import os
+import shutil
+
+import pytest
+
+from voxbeowulf import heorot
+from voxbeowulf.heorot import (
+    available_backends,
+    parse,
+    parse_stream,
+    write_ass,
+    write_csv,
+)
+from voxbeowulf.streaming import (
+    AssSink,
+    CsvSink,
+    JsonLinesSink,
+    Sink,
+    feed,
+    stream_file,
+)
+
+REPO = os.path.dirname(os.path.dirname(__file__))
+
+
+@pytest.fixture(scope="module")
+def html():
+    """Load the committed heorot.dk HTML."""
+    with open("data/fitts/maintext.html", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parse_stream_matches_parse(html):
+    """Streaming should yield exactly the records parse returns."""
+    backend = available_backends()[-1]
+    assert list(parse_stream(html, backend)) == parse(html, backend)
+
+
+def test_parse_stream_rejects_unknown_backend(html):
+    """An unknown backend should fail as soon as the stream starts."""
+    with pytest.raises(ValueError):
+        next(parse_stream(html, "regex"))
+
+
+def test_parse_stream_yields_each_table_before_parsing_the_next(html, monkeypatch):
+    """The first lines should come out after parsing only the first table."""
+    parsed = []
+
+    def parse_table(table, backend, notes, first_line):
+        parsed.append(table)
+        return real_parse_table(table, backend, notes, first_line)
+
+    real_parse_table = heorot.parse_table
+    monkeypatch.setattr(heorot, "parse_table", parse_table)
+    stream = parse_stream(html, available_backends()[-1])
+    assert next(stream)["line"] == 0
+    assert next(stream)["line"] == 1
+    assert len(parsed) == 1
+    assert sum(1 for _ in stream) == 3181
+    assert len(parsed) == len(heorot.split_tables(html))
+
+
+def test_sink_needs_write():
+    """A sink that does not implement write cannot be created."""
+    with pytest.raises(TypeError):
+        Sink()
+
+
+def test_line_sinks(beowulf_data, tmp_path):
+    """JSON Lines and CSV sinks should hold every record in order."""
+    write_csv(beowulf_data, str(tmp_path / "expected.csv"))
+    with (
+        JsonLinesSink(str(tmp_path / "lines.jsonl")) as jsonl,
+        CsvSink(str(tmp_path / "lines.csv")) as table,
+    ):
+        assert feed(beowulf_data, [jsonl, table]) == len(beowulf_data)
+
+    with open(tmp_path / "lines.jsonl", "r", encoding="utf-8") as f:
+        assert [json.loads(row) for row in f] == beowulf_data
+    assert (tmp_path / "lines.csv").read_bytes() == (
+        tmp_path / "expected.csv"
+    ).read_bytes()
+
+
+def test_ass_sink_matches_write_ass(beowulf_data, tmp_path):
+    """Streamed subtitle files should be identical to write_ass output."""
+    (tmp_path / "batch").mkdir()
+    (tmp_path / "stream").mkdir()
+    write_ass(beowulf_data, output_file=f"{tmp_path}/batch/fitt_{{fitt_id}}.ass")
+    with AssSink(output_file=f"{tmp_path}/stream/fitt_{{fitt_id}}.ass") as sink:
+        feed(beowulf_data, [sink])
+
+    assert len(sink.written) == 43
+    for name in os.listdir(tmp_path / "batch"):
+        batch = (tmp_path / "batch" / name).read_bytes()
+        assert (tmp_path / "stream" / name).read_bytes() == batch, name
+
+
+def test_ass_sink_flushes_each_fitt_at_its_last_line(beowulf_data, tmp_path):
+    """A fitt's file should exist as soon as its last line has been fed."""
+    output_file = f"{tmp_path}/fitt_{{fitt_id}}.ass"
+    with AssSink(output_file=output_file) as sink:
+        feed(itertools.islice(beowulf_data, 52), [sink])
+        assert sink.written == []
+        feed(beowulf_data[52:54], [sink])
+        assert sink.written == [0]
+        assert os.path.exists(output_file.format(fitt_id=0))
+        assert not os.path.exists(output_file.format(fitt_id=1))
+
+    # the stream stopped inside fitt 1, so it is never written
+    assert not os.path.exists(output_file.format(fitt_id=1))
+
+
+def test_stream_file_leaves_the_build_outputs_alone(tmp_path, monkeypatch):
+    """stream_file should write to its own paths, not the manifest's."""
+    os.makedirs(tmp_path / "data" / "fitts")
+    os.makedirs(tmp_path / "data" / "subtitles")
+    for name in ("fitts/maintext.html", "blank.ass"):
+        shutil.copy(os.path.join(REPO, "data", name), tmp_path / "data" / name)
+    monkeypatch.chdir(tmp_path)
+
+    assert stream_file("maintext", "unused://", fitt_ids=[1]) == 3183
+    assert sorted(os.listdir("data/stream")) == [
+        "fitt_1.ass",
+        "maintext.csv",
+        "maintext.jsonl",
+    ]
+    assert os.listdir("data/fitts") == ["maintext.html"]
+    assert os.listdir("data/subtitles") == []
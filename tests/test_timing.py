@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage timing and profiling.
+"""
+
+import json
+import os
+
+from voxbeowulf import timing
+
+
+def test_stage_records_timing_and_fields():
+    """A stage should record wall and CPU time plus the fields it was given."""
+    timing.reset_spans()
+    with timing.stage("parse", backend="lxml") as span:
+        span.fields["lines"] = 3183
+        sum(range(10000))
+
+    spans = timing.collected_spans()
+    assert [s.name for s in spans] == ["parse"]
+    assert spans[0].fields == {"backend": "lxml", "lines": 3183}
+    assert spans[0].wall > 0
+    assert spans[0].cpu >= 0
+
+
+def test_unrecorded_stage_can_be_recorded_later():
+    """Worker spans are kept only once the parent records them."""
+    timing.reset_spans()
+    with timing.stage("ass_fitt", record=False, fitt_id=3) as span:
+        pass
+    assert timing.collected_spans() == []
+
+    timing.record_span(span)
+    assert timing.collected_spans() == [span]
+
+
+def test_timing_summary_aggregates_by_stage():
+    """The summary should total counts per stage but not identifiers."""
+    spans = [
+        timing.Span("ass_fitt", {"fitt_id": 1, "events": 10}, wall=0.5, cpu=0.25),
+        timing.Span("ass_fitt", {"fitt_id": 2, "events": 20}, wall=1.5, cpu=0.75),
+        timing.Span("parse", {"cached": True, "lines": 5}, wall=2.0, cpu=1.0),
+    ]
+    summary = timing.timing_summary(spans)
+
+    assert summary["stages"]["ass_fitt"] == {
+        "count": 2,
+        "wall_seconds": 2.0,
+        "cpu_seconds": 1.0,
+        "events": 30,
+    }
+    assert summary["stages"]["parse"]["lines"] == 5
+    assert "cached" not in summary["stages"]["parse"]
+    assert len(summary["spans"]) == 3
+
+
+def test_profiled_writes_reports(tmp_path):
+    """profiled() should dump pstats, a text report and the timing summary."""
+    output_dir = str(tmp_path / "profile")
+    with timing.profiled(output_dir):
+        with timing.stage("write_json", lines=2):
+            json.dumps([{"line": 0}, {"line": 1}])
+
+    assert sorted(os.listdir(output_dir)) == [
+        "pipeline.pstats",
+        "pipeline.txt",
+        "timings.json",
+    ]
+    with open(os.path.join(output_dir, "timings.json"), encoding="utf-8") as file:
+        timings = json.load(file)
+    assert timings["stages"]["write_json"]["count"] == 1
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the corpus validation rules.
+"""
+
+import copy
+
+import pytest
+
+from voxbeowulf.numbering import FITT_BOUNDARIES
+from voxbeowulf.validation import ValidationError, check, validate
+
+
+def test_committed_lines_are_valid(beowulf_data):
+    """The committed JSON should break no rule."""
+    assert validate(beowulf_data) == []
+    check(beowulf_data)
+
+
+def test_line_rules(beowulf_data):
+    """Numbering, field and empty-text problems should name their lines."""
+    lines = copy.deepcopy(beowulf_data)
+    lines[10]["line"] = 11
+    del lines[20]["ME"]
+    lines[30]["OE"] = "  "
+    lines[2229]["OE"] = "restored"
+
+    found = {(violation.rule, violation.line) for violation in validate(lines)}
+    assert found == {
+        ("numbering", 10),
+        ("fields", 20),
+        ("empty_text", 30),
+        ("empty_text", 2229),
+    }
+
+
+def test_fitt_gaps_and_overlaps(beowulf_data):
+    """Coverage should be checked as intervals, reporting gaps and overlaps."""
+    boundaries = list(FITT_BOUNDARIES)
+    gap_start, end, name = boundaries[3]
+    boundaries[3] = (gap_start + 2, end, name)
+    overlap, end, name = boundaries[10]
+    boundaries[10] = (overlap - 1, end, name)
+
+    found = [
+        (violation.rule, violation.message)
+        for violation in validate(beowulf_data, boundaries)
+    ]
+    assert found == [
+        ("fitt_coverage", f"lines {gap_start}-{gap_start + 1} are in no fitt"),
+        ("fitt_coverage", f"fitt 10 overlaps lines {overlap - 1}-{overlap - 1}"),
+    ]
+
+
+def test_fitts_must_fit_the_lines(beowulf_data):
+    """Extra lines past the last fitt should be reported as uncovered."""
+    lines = beowulf_data + [{"line": 3183, "OE": "extra", "ME": "extra"}]
+    [violation] = validate(lines)
+    assert violation.rule == "fitt_coverage"
+    assert violation.message == "lines 3183-3183 are in no fitt"
+
+
+def test_check_raises_with_every_violation(beowulf_data):
+    """check should raise ValidationError carrying the structured violations."""
+    lines = copy.deepcopy(beowulf_data)
+    lines[5]["OE"] = ""
+    lines[6]["ME"] = ""
+    with pytest.raises(ValidationError) as error:
+        check(lines)
+    assert [violation.line for violation in error.value.violations] == [5, 6]
+    assert "2 integrity violation(s)" in str(error.value)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the variant readings engine.
+"""
+
+import pytest
+
+from voxbeowulf import variants as variants_module
+from voxbeowulf.parse_cache import ParseCache
+from voxbeowulf.variants import VARIANT_EDITIONS, form_kinds, variant_readings
+
+
+@pytest.fixture(scope="module")
+def variants():
+    """Variants of every line, computed in this process."""
+    return variant_readings(workers=1)
+
+
+def _kinds(variants, line):
+    """Kinds of each variant on a line, by Heorot token."""
+    return {variant.token: variant.kinds for variant in variants[line]}
+
+
+@pytest.mark.parametrize(
+    "first, second, kinds",
+    [
+        ("Hwæt!", "Hwæt!", []),
+        ("oðþæt", "oð_þæt", ["split"]),
+        ("Gār-Dena", "Gardena", ["punctuation", "case", "diacritics"]),
+        ("GEARDAGUM", "géardagum", ["case", "diacritics"]),
+        ("ðá", "þa", ["spelling", "diacritics"]),
+        ("aéghwylc", "ǣghwylc", ["spelling"]),
+        ("⁊", "ond", ["spelling"]),
+        ("wylm·", "wylmum.", ["lexical"]),
+    ],
+)
+def test_form_kinds(first, second, kinds):
+    """Each difference should be named by the fold that removes it."""
+    assert form_kinds(first, second) == kinds
+    assert form_kinds(second, first) == kinds
+
+
+def test_every_line_has_an_entry(variants):
+    """Every Heorot line should be precomputed, even with no variants."""
+    assert sorted(variants) == list(range(1, 3183))
+    assert variants[19] == []
+    # Heorot has no line 2229; Perseus marks the loss with dots
+    assert all(variant.readings["heorot"] is None for variant in variants[2229])
+
+
+def test_documented_variants(variants):
+    """The examples in alignment.md should come out with their kinds."""
+    line_9 = {variant.token: variant for variant in variants[9]}
+    assert line_9["0009a1"].kinds == ("split",)
+    assert line_9["0009a1"].readings["mit"] == "oðþæt"
+    assert line_9["0009b1"].readings["perseus"] is None
+    assert "gap" in line_9["0009b1"].kinds
+    assert set(line_9["0009a1"].readings) == set(VARIANT_EDITIONS)
+
+    assert _kinds(variants, 909)["0909b1"] == ("diacritics", "caesura")
+    assert "line_break" in _kinds(variants, 516)["0516a1"]
+
+
+def test_sixth_edition_is_matched_by_line(variants):
+    """oldenglishaerobics readings should land on the right Heorot tokens."""
+    line_9 = {variant.token: variant.readings for variant in variants[9]}
+    assert line_9["0009a4"]["oldenglishaerobics"] == "ǣġhwylċ"
+    assert line_9["0009b1"]["oldenglishaerobics"] == "þāra"
+    # lines the edition does not include leave it out
+    assert all("oldenglishaerobics" not in v.readings for v in variants[909])
+
+
+def test_parallel_matches_sequential(variants):
+    """Sharding by fitt across processes should not change the result."""
+    assert variant_readings(workers=2) == variants
+
+
+def test_cached_by_input_hash(variants, tmp_path, monkeypatch):
+    """A second run on the same inputs should come from the cache."""
+    cache = ParseCache(str(tmp_path))
+    assert variant_readings(cache=cache) == variants
+
+    def fail(job):
+        raise AssertionError("recomputed a cached result")
+
+    monkeypatch.setattr(variants_module, "_shard", fail)
+    assert variant_readings(cache=cache) == variants
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing and profiling for the heorot pipeline.
+
+Pipeline stages run inside stage() spans, which log their wall time, CPU
+time and item counts as structlog events and keep them for a summary.
+profiled() additionally runs a block under cProfile and writes the pstats
+dump alongside a JSON timing summary.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List
+
+import structlog
+
+logger = structlog.get_logger()
+
+PROFILE_DIR = "profile"
+PROFILE_STATS_FILE = "pipeline.pstats"
+PROFILE_REPORT_FILE = "pipeline.txt"
+TIMINGS_FILE = "timings.json"
+
+
+@dataclass
+class Span:
+    """Timing of one run of a pipeline stage."""
+
+    name: str
+    fields: Dict[str, Any] = field(default_factory=dict)
+    wall: float = 0.0
+    cpu: float = 0.0
+
+
+# Spans recorded in this process since the last reset_spans()
+_spans: List[Span] = []
+
+
+@contextmanager
+def stage(name: str, record: bool = True, **fields: Any) -> Iterator[Span]:
+    """
+    Time a pipeline stage.
+
+    The caller can add counts to span.fields before the block ends.
+
+    Args:
+        name: Stage name, e.g. 'parse' or 'ass_fitt'
+        record: Log and keep the span when the block ends; pass False in
+            worker processes and hand the span back to the parent instead
+        fields: Initial fields to log with the span
+
+    Yields:
+        The span being timed
+    """
+    span = Span(name, dict(fields))
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield span
+    finally:
+        span.wall = time.perf_counter() - wall_start
+        span.cpu = time.process_time() - cpu_start
+        if record:
+            record_span(span)
+
+
+def record_span(span: Span) -> None:
+    """
+    Log a finished span and keep it for the timing summary.
+
+    Args:
+        span: Span timed here or returned from a worker process
+    """
+    _spans.append(span)
+    logger.info(
+        "stage timing",
+        stage=span.name,
+        wall_ms=round(span.wall * 1000, 3),
+        cpu_ms=round(span.cpu * 1000, 3),
+        **span.fields,
+    )
+
+
+def collected_spans() -> List[Span]:
+    """
+    Get the spans recorded so far.
+
+    Returns:
+        Spans in the order they finished
+    """
+    return list(_spans)
+
+
+def reset_spans() -> None:
+    """Forget all recorded spans."""
+    _spans.clear()
+
+
+def timing_summary(spans: List[Span]) -> Dict[str, Any]:
+    """
+    Aggregate spans by stage name.
+
+    Args:
+        spans: Recorded spans
+
+    Returns:
+        Per-stage totals of count, wall and CPU seconds and numeric fields,
+        plus the individual spans
+    """
+    stages: Dict[str, Dict[str, Any]] = {}
+    for span in spans:
+        totals = stages.setdefault(
+            span.name, {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+        )
+        totals["count"] += 1
+        totals["wall_seconds"] += span.wall
+        totals["cpu_seconds"] += span.cpu
+        for key, value in span.fields.items():
+            if key.endswith("_id") or isinstance(value, bool):
+                continue  # identifiers and switches are not counts
+            if isinstance(value, (int, float)):
+                totals[key] = totals.get(key, 0) + value
+    return {"stages": stages, "spans": [asdict(span) for span in spans]}
+
+
+@contextmanager
+def profiled(output_dir: str = PROFILE_DIR) -> Iterator[cProfile.Profile]:
+    """
+    Run a block under cProfile and write profile and timing reports.
+
+    Writes pipeline.pstats (for pstats or snakeviz), pipeline.txt (the top
+    functions by cumulative time) and timings.json (the timing summary of
+    the spans recorded during the block).
+
+    Args:
+        output_dir: Directory for the reports
+
+    Yields:
+        The active profiler
+    """
+    reset_spans()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(output_dir, exist_ok=True)
+
+        stats_path = os.path.join(output_dir, PROFILE_STATS_FILE)
+        profiler.dump_stats(stats_path)
+        with open(
+            os.path.join(output_dir, PROFILE_REPORT_FILE), "w", encoding="utf-8"
+        ) as report:
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(
+                40
+            )
+
+        timings_path = os.path.join(output_dir, TIMINGS_FILE)
+        with open(timings_path, "w", encoding="utf-8") as timings:
+            json.dump(timing_summary(collected_spans()), timings, indent=4)
+        logger.info("wrote profile", stats=stats_path, timings=timings_path)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Integrity rules for parsed Beowulf lines.
+
+validate() checks every line record in a single pass, and checks the fitt
+boundaries as sorted intervals, so each build can afford to run it right
+after parsing instead of leaving the checks to the test suite. Problems
+come back as Violation records; check() logs them and raises
+ValidationError, stopping the build before bad data is written.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import structlog
+
+from linestore import LineRecords
+from numbering import FITT_BOUNDARIES, FittIndex
+from timing import stage
+
+logger = structlog.get_logger()
+
+REQUIRED_FIELDS = ("line", "OE", "ME")
+
+# Lines with no text: 0 keeps the numbering 1-based, and 2229 is missing
+# from the manuscript
+EMPTY_LINES = frozenset({0, 2229})
+
+# Violations logged in full before the rest are only counted
+LOGGED_VIOLATIONS = 20
+
+
+@dataclass(frozen=True)
+class Violation:
+    """One broken integrity rule."""
+
+    rule: str
+    message: str
+    line: Optional[int] = None
+    fitt: Optional[int] = None
+
+
+class ValidationError(ValueError):
+    """Raised when parsed lines break integrity rules."""
+
+    def __init__(self, violations: Sequence[Violation]) -> None:
+        self.violations = list(violations)
+        first = self.violations[0].message if self.violations else "no violations"
+        super().__init__(
+            f"{len(self.violations)} integrity violation(s), first: {first}"
+        )
+
+
+def validate(
+    lines: LineRecords,
+    fitt_boundaries: Sequence[Tuple[int, int, str]] = FITT_BOUNDARIES,
+) -> List[Violation]:
+    """
+    Check parsed lines and fitt boundaries against every integrity rule.
+
+    Args:
+        lines: Line data numbered 0, 1, 2, ...
+        fitt_boundaries: (start, end, name) per fitt; the placeholder fitt,
+            which FittIndex leaves out, is ignored
+
+    Returns:
+        Violations in the order found; empty if the data is sound
+    """
+    violations = _validate_lines(lines)
+    violations += _validate_fitts(len(lines), fitt_boundaries)
+    return violations
+
+
+def _validate_lines(lines: LineRecords) -> List[Violation]:
+    """Check numbering, fields and text of every line in one pass."""
+    violations = []
+    for index, record in enumerate(lines):
+        missing = [key for key in REQUIRED_FIELDS if key not in record]
+        if missing:
+            violations.append(
+                Violation(
+                    "fields", f"line {index} is missing {', '.join(missing)}", index
+                )
+            )
+            continue
+
+        if record["line"] != index:
+            violations.append(
+                Violation(
+                    "numbering",
+                    f"entry {index} is numbered {record['line']}",
+                    index,
+                )
+            )
+
+        oe, me = record["OE"], record["ME"]
+        if not isinstance(oe, str) or not isinstance(me, str):
+            violations.append(
+                Violation("fields", f"line {index} text is not a string", index)
+            )
+        elif index in EMPTY_LINES:
+            if oe.strip() or me.strip():
+                violations.append(
+                    Violation("empty_text", f"line {index} should have no text", index)
+                )
+        else:
+            for key, text in (("OE", oe), ("ME", me)):
+                if not text.strip():
+                    violations.append(
+                        Violation(
+                            "empty_text", f"line {index} has empty {key} text", index
+                        )
+                    )
+    return violations
+
+
+def _validate_fitts(
+    count: int, fitt_boundaries: Sequence[Tuple[int, int, str]]
+) -> List[Violation]:
+    """
+    Check that the fitts tile lines 1 to count - 1 exactly, in order.
+
+    The intervals are compared with their neighbours once sorted, so gaps
+    and overlaps are found without listing every covered line.
+    """
+    violations = []
+    last_line = count - 1
+    intervals = []
+    index = FittIndex(fitt_boundaries)
+    for fitt_id in sorted(index.fitt_ids):
+        fitt = index.lines_of(fitt_id)
+        start, end, name = fitt.start, fitt.stop - 1, fitt_boundaries[fitt_id][2]
+        if start > end:
+            violations.append(
+                Violation(
+                    "fitt_bounds",
+                    f"fitt {fitt_id} ({name}) starts at {start} after its end {end}",
+                    fitt=fitt_id,
+                )
+            )
+            continue
+        if start < 1 or end > last_line:
+            violations.append(
+                Violation(
+                    "fitt_bounds",
+                    f"fitt {fitt_id} ({name}) spans {start}-{end}, "
+                    f"outside lines 1-{last_line}",
+                    fitt=fitt_id,
+                )
+            )
+        intervals.append((start, end, fitt_id))
+
+    ids_in_line_order = [fitt_id for _, _, fitt_id in sorted(intervals)]
+    if ids_in_line_order != sorted(ids_in_line_order):
+        violations.append(
+            Violation("fitt_order", "fitts are not numbered in line order")
+        )
+
+    covered = 0  # last line covered so far
+    for start, end, fitt_id in sorted(intervals):
+        if start > covered + 1:
+            violations.append(
+                Violation(
+                    "fitt_coverage",
+                    f"lines {covered + 1}-{start - 1} are in no fitt",
+                    covered + 1,
+                )
+            )
+        elif start <= covered:
+            violations.append(
+                Violation(
+                    "fitt_coverage",
+                    f"fitt {fitt_id} overlaps lines {start}-{min(end, covered)}",
+                    start,
+                    fitt_id,
+                )
+            )
+        covered = max(covered, end)
+    if covered < last_line:
+        violations.append(
+            Violation(
+                "fitt_coverage",
+                f"lines {covered + 1}-{last_line} are in no fitt",
+                covered + 1,
+            )
+        )
+    return violations
+
+
+def check(lines: LineRecords) -> None:
+    """
+    Validate parsed lines, logging and raising if any rule is broken.
+
+    Args:
+        lines: Line data numbered 0, 1, 2, ...
+
+    Raises:
+        ValidationError: If there are any violations
+    """
+    with stage("validate", lines=len(lines)) as span:
+        violations = validate(lines)
+        span.fields["violations"] = len(violations)
+    if not violations:
+        return
+
+    for violation in violations[:LOGGED_VIOLATIONS]:
+        logger.error(
+            "integrity violation",
+            rule=violation.rule,
+            message=violation.message,
+            line=violation.line,
+            fitt=violation.fitt,
+        )
+    if len(violations) > LOGGED_VIOLATIONS:
+        logger.error(
+            "more integrity violations", count=len(violations) - LOGGED_VIOLATIONS
+        )
+    raise ValidationError(violations)
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Variant readings of every Heorot line across the Old English editions.
+
+For each token alignment in archive/data/aligned.txt, the readings of
+mit, mcmaster, heorot, ebeowulf and perseus are compared, along with
+oldenglishaerobics, which aligned.txt does not cover: its words are
+matched to Heorot's within each line. A row whose readings are not all
+the same becomes a Variant, labelled with the kinds of difference found:
+
+    gap          an edition has nothing for the token
+    lexical      the words differ even once every fold below is applied
+    split        the same letters are split into words differently, oðþæt
+                 against oð_þæt
+    spelling     ð against þ, ƿ against w, Heorot's aé for ǣ, or ⁊ for ond
+    punctuation  punctuation or hyphenation differs
+    case         capitalization differs
+    diacritics   accents, macrons or dots differ
+    caesura      an edition puts the token in the other half-line
+    line_break   an edition puts the token on a different line
+
+The form kinds are the folds that the two readings need to become equal:
+a fold counts if leaving it out of the full set keeps them apart.
+
+variant_readings() computes all of them, sharded by fitt across a process
+pool, and keeps the result in the cache under a hash of the input
+files, so an apparatus view can read every line's variants without
+diffing anything on request.
+
+    variants = variant_readings()
+    for variant in variants[9]:
+        print(variant.token, variant.kinds, variant.readings)
+"""
+
+import itertools
+import os
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from alignment import (
+    ALIGNED_FILE,
+    EDITIONS,
+    JOIN,
+    Alignment,
+    get_alignment,
+)
+from editions import Edition, load_edition
+from manifest import digest, file_digest
+from normalize import FOLD_PROFILES, FoldProfile, Normalizer
+from numbering import FITT_INDEX
+from parse_cache import ParseCache
+from timing import stage
+
+# Bump when the comparison rules change, so cached results are recomputed
+VARIANTS_VERSION = "1"
+
+VARIANT_WORKERS = int(os.environ.get("VOXBEOWULF_VARIANT_WORKERS", "1"))
+
+# The sixth edition, matched to Heorot line by line since aligned.txt lacks it
+EXTRA_EDITION = "oldenglishaerobics"
+EXTRA_FILE = "archive/data/oldenglishaerobics.txt"
+VARIANT_EDITIONS = EDITIONS + (EXTRA_EDITION,)
+
+KINDS = (
+    "gap",
+    "lexical",
+    "split",
+    "spelling",
+    "punctuation",
+    "case",
+    "diacritics",
+    "caesura",
+    "line_break",
+)
+
+# The folds behind the form kinds, as changes to the 'match' profile
+_MATCH = FOLD_PROFILES["match"]
+_FOLDS = {
+    "spelling": {"letters": {}},
+    "punctuation": {"punctuation": False},
+    "case": {"lower": False},
+    "diacritics": {"marks": False},
+}
+
+# Spellings folded with ð and ƿ: Heorot writes a long æ as aé, where the
+# other editions have ǣ or æ, and ebeowulf keeps the scribes' ⁊ for ond
+_SPELLINGS = {"aé": "ǣ", "Aé": "Ǣ", "AÉ": "Ǣ", "⁊": "ond"}
+
+# Readings by edition for one row; None is a gap
+Readings = Dict[str, Optional[str]]
+
+
+class Variant(NamedTuple):
+    """The differing readings of one token alignment."""
+
+    line: int  # Heorot line
+    token: str  # Heorot token identifier, or its position where Heorot has a gap
+    readings: Readings  # editions without the line are left out
+    kinds: Tuple[str, ...]  # in KINDS order
+
+
+@lru_cache(maxsize=None)
+def _folder(skip: Optional[str]) -> Normalizer:
+    """Normalizer applying every fold except one."""
+    changes = _FOLDS.get(skip, {})
+    profile = FoldProfile(
+        f"variants-{skip}",
+        marks=changes.get("marks", _MATCH.marks),
+        lower=changes.get("lower", _MATCH.lower),
+        punctuation=changes.get("punctuation", _MATCH.punctuation),
+        letters=changes.get("letters", _MATCH.letters),
+    )
+    return Normalizer(profile, nfc=True)
+
+
+def _fold(form: str, skip: Optional[str] = None) -> str:
+    """Fold a reading with every fold except skip, 'split' included."""
+    if skip == "split":
+        return JOIN.join(_fold(part) for part in form.split(JOIN))
+    if skip != "spelling":
+        form = unicodedata.normalize("NFC", form)
+        for spelling, letters in _SPELLINGS.items():
+            if spelling in form:
+                form = form.replace(spelling, letters)
+    return _folder(skip)(form).replace(JOIN, "").replace(" ", "")
+
+
+def form_kinds(first: str, second: str) -> List[str]:
+    """
+    Name the differences between two readings of a token.
+
+    Args:
+        first: One reading
+        second: Another reading
+
+    Returns:
+        The form kinds from KINDS, in order; empty if the readings are equal
+    """
+    if unicodedata.normalize("NFC", first) == unicodedata.normalize("NFC", second):
+        return []
+    if _fold(first) != _fold(second):
+        return ["lexical"]
+    return [
+        kind
+        for kind in ("split",) + tuple(_FOLDS)
+        if _fold(first, kind) != _fold(second, kind)
+    ]
+
+
+@lru_cache(maxsize=None)
+def _edition(path: str) -> Edition:
+    """The extra edition, loaded once per process."""
+    return load_edition(EXTRA_EDITION, path)
+
+
+def _match_line(
+    units: Sequence[Tuple[int, str]], words: Sequence[Tuple[str, int]]
+) -> Dict[int, Tuple[str, int]]:
+    """
+    Match an edition line's words to Heorot's tokens on the same line.
+
+    Args:
+        units: (row, Heorot form) of each Heorot token on the line
+        words: (word, half-line) of the edition's line
+
+    Returns:
+        (reading, half-line) by row; words with no Heorot counterpart are
+        joined onto the reading before them, and unmatched rows are left out
+    """
+    matcher = SequenceMatcher(
+        None,
+        [_fold(form) for _, form in units],
+        [_fold(word) for word, _ in words],
+        autojunk=False,
+    )
+    readings: Dict[int, Tuple[str, int]] = {}
+    last = None
+    for _, i1, i2, j1, j2 in matcher.get_opcodes():
+        paired = min(i2 - i1, j2 - j1)
+        for offset in range(paired):
+            last = units[i1 + offset][0]
+            readings[last] = words[j1 + offset]
+        extra = words[j1 + paired : j2]
+        if extra:
+            if last is None:  # words before Heorot's first token
+                last = units[0][0]
+                readings[last] = extra[0]
+                extra = extra[1:]
+            word, half = readings[last]
+            readings[last] = (JOIN.join([word] + [word for word, _ in extra]), half)
+    return readings
+
+
+def _offsets(alignment: Alignment, rows: range, edition: str) -> Dict[int, int]:
+    """Most common line offset from Heorot to an edition, per Heorot line."""
+    counts: Dict[int, Counter] = {}
+    for row in rows:
+        if (
+            alignment.form("heorot", row) is None
+            or alignment.form(edition, row) is None
+        ):
+            continue
+        line, _ = alignment.place("heorot", row)
+        counts.setdefault(line, Counter())[alignment.place(edition, row)[0] - line] += 1
+    return {line: count.most_common(1)[0][0] for line, count in counts.items()}
+
+
+def line_variants(
+    start: int,
+    stop: int,
+    aligned_path: str = ALIGNED_FILE,
+    extra_path: str = EXTRA_FILE,
+) -> Dict[int, List[Variant]]:
+    """
+    Find the variants of a range of Heorot lines.
+
+    Args:
+        start: First Heorot line, inclusive
+        stop: Last Heorot line, exclusive
+        aligned_path: aligned.txt file
+        extra_path: Text file of the edition aligned.txt lacks
+
+    Returns:
+        Variants by Heorot line, with an entry, maybe empty, for every line
+    """
+    alignment = get_alignment(aligned_path)
+    extra_edition = _edition(extra_path)
+    rows = alignment.rows("heorot", start, stop)
+    others = [edition for edition in EDITIONS if edition != "heorot"]
+    offsets = {edition: _offsets(alignment, rows, edition) for edition in others}
+
+    by_line: Dict[int, List[int]] = {line: [] for line in range(start, stop)}
+    for row in rows:
+        by_line[alignment.place("heorot", row)[0]].append(row)
+
+    variants: Dict[int, List[Variant]] = {}
+    for line, line_rows in by_line.items():
+        extra: Dict[int, Tuple[str, int]] = {}
+        units = [
+            (row, form)
+            for row in line_rows
+            for form in [alignment.form("heorot", row)]
+            if form is not None
+        ]
+        if line in extra_edition and units:
+            extra = _match_line(units, extra_edition.words(line))
+
+        found = []
+        for row in line_rows:
+            readings: Readings = {
+                edition: alignment.form(edition, row) for edition in EDITIONS
+            }
+            heorot_form = readings["heorot"]
+            _, heorot_half = alignment.place("heorot", row)
+            kinds = set()
+            if heorot_form is not None:
+                for edition in others:
+                    if readings[edition] is None:
+                        continue
+                    edition_line, half = alignment.place(edition, row)
+                    if edition_line - line != offsets[edition].get(line, 0):
+                        kinds.add("line_break")
+                    elif half != heorot_half:
+                        kinds.add("caesura")
+                if line in extra_edition:
+                    word, half = extra.get(row, (None, heorot_half))
+                    readings[EXTRA_EDITION] = word
+                    if half != heorot_half:
+                        kinds.add("caesura")
+
+            present = set(readings.values())
+            if None in present:
+                kinds.add("gap")
+                present.discard(None)
+            for first, second in itertools.combinations(sorted(present), 2):
+                kinds.update(form_kinds(first, second))
+            if kinds:
+                found.append(
+                    Variant(
+                        line,
+                        alignment.row(row).ids["heorot"],
+                        readings,
+                        tuple(kind for kind in KINDS if kind in kinds),
+                    )
+                )
+        variants[line] = found
+    return variants
+
+
+def _shard(job: Tuple[int, int, str, str]) -> Dict[int, List[Variant]]:
+    """Compute one fitt's variants in a worker process."""
+    start, stop, aligned_path, extra_path = job
+    return line_variants(start, stop, aligned_path, extra_path)
+
+
+def variant_readings(
+    aligned_path: str = ALIGNED_FILE,
+    extra_path: str = EXTRA_FILE,
+    workers: int = VARIANT_WORKERS,
+    cache: Optional[ParseCache] = None,
+) -> Dict[int, List[Variant]]:
+    """
+    Find the variants of every Heorot line, one fitt per job.
+
+    Args:
+        aligned_path: aligned.txt file
+        extra_path: Text file of the edition aligned.txt lacks
+        workers: Number of processes to use; 0 means one per CPU
+        cache: Where to look up and store the result; None to always compute
+
+    Returns:
+        Variants by Heorot line, with an entry, maybe empty, for every line
+    """
+    key = digest(VARIANTS_VERSION, file_digest(aligned_path), file_digest(extra_path))
+    if cache is not None:
+        cached = cache.get_entry("variants", key)
+        if cached is not None:
+            return dict(cached)
+
+    line_count = get_alignment(aligned_path).line_count("heorot")
+    jobs = [
+        (piece.start, piece.stop, aligned_path, extra_path)
+        for piece in FITT_INDEX.split(1, line_count + 1)
+    ]
+    processes = workers or os.cpu_count() or 1
+    with stage("variants", fitts=len(jobs), workers=processes) as span:
+        if processes == 1:
+            shards = [_shard(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                shards = list(pool.map(_shard, jobs))
+        variants: Dict[int, List[Variant]] = {}
+        for shard in shards:
+            variants.update(shard)
+        span.fields["variants"] = sum(map(len, variants.values()))
+
+    if cache is not None:
+        cache.put_entry("variants", key, list(variants.items()))
+    return variants